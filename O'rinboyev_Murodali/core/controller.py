@@ -1,3 +1,10 @@
+import json
+from itertools import chain, groupby, islice
+
+from core.device_registry import DeviceRegistry
+from core.factories.device_factory import DeviceFactory
+
+
 class SingletonMeta(type):
     _instances = {}
 
@@ -10,53 +17,111 @@ class SingletonMeta(type):
 class SmartCityController(metaclass=SingletonMeta):
     def __init__(self):
         if not hasattr(self, '_initialized'):
-            self._devices = []
-            self._subsystems = {
-                'transport': [],
-                'lighting': [],
-                'security': [],
-                'energy': []
-            }
+            self.registry = DeviceRegistry()
+            self._devices = self.registry.devices
+            self._subsystems = self.registry.by_subsystem
             self._initialized = True
             print("🏗️ SmartCity Controller initialized (Singleton)")
 
     def create_device(self, device_type, location):
-        from core.factories.device_factory import DeviceFactory
-
         device = DeviceFactory.create_device(device_type, location)
-        self._devices.append(device)
-
-        # Categorize device
-        if device_type in ['traffic_light', 'public_transport']:
-            self._subsystems['transport'].append(device)
-        elif device_type == 'street_light':
-            self._subsystems['lighting'].append(device)
-        elif device_type == 'camera':
-            self._subsystems['security'].append(device)
-        elif device_type == 'solar_panel':
-            self._subsystems['energy'].append(device)
-
+        self.registry.add(device_type.lower(), device)
         return device
 
-    def get_system_status(self):
+    def create_devices(self, specs):
+        """
+        Bulk creation from (device_type, location) pairs.
+        All specs are validated before any device is created; devices are
+        returned and registered in spec order.
+        """
+        specs = list(specs)
+        for device_type in {device_type for device_type, _ in specs}:
+            DeviceFactory.device_class(device_type)
+        for number, (_, location) in enumerate(specs, 1):
+            if not isinstance(location, str) or not location.strip():
+                raise ValueError(f"Spec {number}: location must be a non-empty string")
+
+        # Consecutive specs of one type are built and registered as a batch,
+        # so devices keep the order of the specs
+        created = []
+        for device_type, run in groupby(specs, key=lambda spec: spec[0].lower()):
+            devices = DeviceFactory.create_devices(device_type, [location for _, location in run])
+            self.registry.add_many(device_type, devices)
+            created.extend(devices)
+        return created
+
+    def find_devices(self, device_type=None, subsystem=None, location_prefix=None):
+        return self.registry.find(device_type, subsystem, location_prefix)
+
+    def iter_status(self, subsystem=None, device_type=None, location_prefix=None,
+                    offset=0, limit=None):
+        """Lazily yield DeviceStatus tuples; only the requested slice is built"""
+        statuses = self.registry.iter_status(device_type, subsystem, location_prefix)
+        stop = None if limit is None else offset + limit
+        return islice(statuses, offset, stop)
+
+    def status_page(self, page=1, page_size=50, **filters):
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be positive")
+        return list(self.iter_status(offset=(page - 1) * page_size, limit=page_size,
+                                     **filters))
+
+    def status_summary(self, subsystem=None):
+        return self.registry.status_summary(subsystem)
+
+    def write_status_ndjson(self, stream, **filters):
+        """Write one JSON object per device; returns the number of lines"""
+        count = 0
+        for status in self.iter_status(**filters):
+            stream.write(json.dumps(status._asdict()) + "\n")
+            count += 1
+        return count
+
+    def get_system_status(self, subsystem=None, page=None, page_size=50, summary_only=False):
+        """
+        Print device status. Without a page every matching device is listed;
+        summary_only prints counts per state and formats no device at all.
+        """
+        if summary_only:
+            print("\n📍 Device Summary:")
+            for name, states in self.status_summary(subsystem).items():
+                if states:
+                    counts = ", ".join(f"{state}: {count}" for state, count in sorted(states.items()))
+                    print(f"  {name.upper()}: {sum(states.values())} ({counts})")
+            print(f"\n📊 Total devices: {len(self._devices)}")
+            return
+
+        groups = [(name, devices) for name, devices in self._subsystems.items()
+                  if subsystem is None or name == subsystem]
+        listed = chain.from_iterable(((name, device) for device in devices)
+                                     for name, devices in groups)
+        if page is not None:
+            if page < 1 or page_size < 1:
+                raise ValueError("page and page_size must be positive")
+            listed = islice(listed, (page - 1) * page_size, page * page_size)
 
         print("\n📍 Active Devices:")
 
-        for subsystem, devices in self._subsystems.items():
-            if devices:
-                print(f"\n  {subsystem.upper()}:")
-                for device in devices:
-                    print(f"    • {device.get_info()}")
+        current = None
+        for name, device in listed:
+            if name != current:
+                print(f"\n  {name.upper()}:")
+                current = name
+            print(f"    • {device.get_info()}")
 
+        if page is not None:
+            total = sum(len(devices) for _, devices in groups)
+            print(f"\n📄 Page {page} of {max(1, -(-total // page_size))}")
         print(f"\n📊 Total devices: {len(self._devices)}")
 
-    def generate_report(self):
+    def generate_report(self, subsystem=None):
 
         print("\n🏙️ SmartCity System Report")
         print(f"Total Devices: {len(self._devices)}")
         print(f"\nSubsystem Breakdown:")
 
-        for subsystem, devices in self._subsystems.items():
-            print(f"  • {subsystem.capitalize()}: {len(devices)} devices")
+        for name, devices in self._subsystems.items():
+            if subsystem is None or name == subsystem:
+                print(f"  • {name.capitalize()}: {len(devices)} devices")
 
-        print("\n✅ All systems operational")
\ No newline at end of file
+        print("\n✅ All systems operational")
@@ -0,0 +1,101 @@
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+
+SUBSYSTEM_BY_TYPE = {
+    'traffic_light': 'transport',
+    'public_transport': 'transport',
+    'street_light': 'lighting',
+    'camera': 'security',
+    'solar_panel': 'energy'
+}
+
+# Compact per-device status; "value" is the state's main figure
+# (brightness, cycle time, passengers, resolution or output in W)
+DeviceStatus = namedtuple('DeviceStatus', 'subsystem device_type location state value')
+
+
+class DeviceRegistry:
+    """Devices indexed by type, subsystem and location prefix"""
+
+    def __init__(self):
+        self.devices = []
+        self.by_type = {device_type: [] for device_type in SUBSYSTEM_BY_TYPE}
+        self.by_subsystem = {
+            'transport': [],
+            'lighting': [],
+            'security': [],
+            'energy': []
+        }
+        self._types = {}  # id(device) -> device type
+        self._locations = []  # (location, position), sorted on the next lookup
+        self._sorted = True
+
+    def __len__(self):
+        return len(self.devices)
+
+    def add(self, device_type, device):
+        self.add_many(device_type, [device])
+
+    def add_many(self, device_type, devices):
+        """Register devices of one (lowercase) type"""
+        start = len(self.devices)
+        self.devices.extend(devices)
+        self.by_type[device_type].extend(devices)
+        self.by_subsystem[SUBSYSTEM_BY_TYPE[device_type]].extend(devices)
+        self._types.update(dict.fromkeys(map(id, devices), device_type))
+        self._locations.extend((device.location, position)
+                               for position, device in enumerate(devices, start))
+        self._sorted = False
+
+    def at_location(self, prefix):
+        """Devices whose location starts with prefix, in registration order"""
+        if not self._sorted:
+            self._locations.sort()
+            self._sorted = True
+        locations = self._locations
+        index = bisect_left(locations, (prefix,))
+        positions = []
+        while index < len(locations) and locations[index][0].startswith(prefix):
+            positions.append(locations[index][1])
+            index += 1
+        positions.sort()
+        devices = self.devices
+        return [devices[position] for position in positions]
+
+    def find(self, device_type=None, subsystem=None, location_prefix=None):
+        """Devices matching every given criterion, in registration order"""
+        return list(self.iter_find(device_type, subsystem, location_prefix))
+
+    def iter_find(self, device_type=None, subsystem=None, location_prefix=None):
+        if device_type is not None:
+            device_type = device_type.lower()
+        candidates = self.devices
+        if device_type is not None:
+            candidates = self.by_type.get(device_type, [])
+        elif subsystem is not None:
+            candidates = self.by_subsystem.get(subsystem, [])
+        if location_prefix is not None and len(candidates) > 64:
+            candidates = self.at_location(location_prefix)
+
+        types = self._types
+        return (device for device in candidates
+                if (device_type is None or types[id(device)] == device_type)
+                and (subsystem is None or SUBSYSTEM_BY_TYPE[types[id(device)]] == subsystem)
+                and (location_prefix is None or device.location.startswith(location_prefix)))
+
+    def iter_status(self, device_type=None, subsystem=None, location_prefix=None):
+        """Yield a DeviceStatus per matching device, without formatting anything"""
+        types = self._types
+        for device in self.iter_find(device_type, subsystem, location_prefix):
+            kind = types[id(device)]
+            state, value = device.status_fields()
+            yield DeviceStatus(SUBSYSTEM_BY_TYPE[kind], kind, device.location, state, value)
+
+    def status_summary(self, subsystem=None):
+        """Device counts per subsystem and state"""
+        summary = {}
+        for name, devices in self.by_subsystem.items():
+            if subsystem is None or name == subsystem:
+                summary[name] = Counter(device.status_fields()[0] for device in devices)
+        return summary
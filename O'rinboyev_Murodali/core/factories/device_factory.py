@@ -6,24 +6,31 @@ from modules.energy.energy_system import SolarPanel
 
 class DeviceFactory:
 
+    DEVICE_MAP = {
+        'traffic_light': TrafficLight,
+        'public_transport': PublicTransport,
+        'street_light': StreetLight,
+        'camera': Camera,
+        'solar_panel': SolarPanel
+    }
 
     @staticmethod
-    def create_device(device_type, location):
-
-        device_map = {
-            'traffic_light': TrafficLight,
-            'public_transport': PublicTransport,
-            'street_light': StreetLight,
-            'camera': Camera,
-            'solar_panel': SolarPanel
-        }
-
-        device_class = device_map.get(device_type.lower())
+    def device_class(device_type):
+        device_class = DeviceFactory.DEVICE_MAP.get(device_type.lower())
 
         if device_class is None:
             raise ValueError(f"Unknown device type: {device_type}")
 
-        return device_class(location)
+        return device_class
+
+    @staticmethod
+    def create_device(device_type, location):
+        return DeviceFactory.device_class(device_type)(location)
+
+    @staticmethod
+    def create_devices(device_type, locations):
+        device_class = DeviceFactory.device_class(device_type)
+        return [device_class(location) for location in locations]
 
 
 class AbstractDeviceFactory:
@@ -1,3 +1,9 @@
+import math
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+
 class Device:
     def __init__(self, location):
         self.location = location
@@ -6,30 +12,244 @@ class Device:
     def get_info(self):
         return f"{self.__class__.__name__} at {self.location}"
 
+    def status_fields(self):
+        return self.status, None
+
 
 class SolarPanel(Device):
     def __init__(self, location):
         super().__init__(location)
         self.capacity = 250  # Watts
         self.efficiency = 0.85
+        self.orientation = 180  # azimuth in degrees, 180 = facing south
         self.current_output = 0
 
     def generate_power(self, sunlight_intensity):
         """Calculate power generation based on sunlight"""
-        self.current_output = self.capacity * self.efficiency * (sunlight_intensity / 100)
+        self.current_output = (self.capacity * self.efficiency * orientation_factor(self.orientation)
+                               * (sunlight_intensity / 100))
         return self.current_output
 
+    def status_fields(self):
+        return self.status, self.current_output
+
     def get_info(self):
         return f"☀️ Solar Panel at {self.location} - Capacity: {self.capacity}W, Output: {self.current_output:.1f}W"
 
 
+def orientation_factor(azimuth):
+    """Share of peak output for a panel facing azimuth (1.0 south, 0.7 north)"""
+    return 0.85 + 0.15 * math.cos(math.radians(azimuth - 180))
+
+
+# Result of PanelBank.charge_battery; energies in kWh
+BatteryRun = namedtuple('BatteryRun', 'levels charged spilled unmet')
+
+
+class PanelSpec:
+    """Flyweight: parameters shared by every panel of one model, created once per model"""
+    __slots__ = ('capacity', 'efficiency', 'orientation', 'weight')
+    _specs = {}
+
+    def __init__(self, capacity, efficiency, orientation):
+        self.capacity = capacity
+        self.efficiency = efficiency
+        self.orientation = orientation
+        self.weight = capacity * efficiency * orientation_factor(orientation)
+
+    @classmethod
+    def get(cls, capacity=250, efficiency=0.85, orientation=180):
+        key = (capacity, efficiency, orientation)
+        spec = cls._specs.get(key)
+        if spec is None:
+            spec = cls._specs[key] = cls(*key)
+        return spec
+
+
+def _panel_weight(panel):
+    if panel.status != "active":
+        return 0.0
+    return panel.capacity * panel.efficiency * orientation_factor(panel.orientation)
+
+
+class PanelBank:
+    """
+    The panels of a station, stored as runs of identical panels that share
+    one PanelSpec. Only panels that deviate from their spec (faults, custom
+    settings) get a SolarPanel object of their own, kept in overrides;
+    any other panel is created on access, location string included.
+    Irradiance uses the SolarPanel convention: percent of full sunlight.
+    """
+
+    def __init__(self, location="Unknown"):
+        self.location = location
+        self.overrides = {}  # panel index -> SolarPanel with its own state
+        self._specs = []     # spec of each run
+        self._starts = []    # first panel index of each run
+        self._count = 0
+        self._base = 0.0     # combined weight of all runs, overrides ignored
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for run, spec in enumerate(self._specs):
+            stop = self._starts[run + 1] if run + 1 < len(self._starts) else self._count
+            for index in range(self._starts[run], stop):
+                yield self.overrides.get(index) or self._make_panel(index, spec)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("panel index out of range")
+        return self.overrides.get(index) or self._make_panel(index, self._spec_at(index))
+
+    def _spec_at(self, index):
+        return self._specs[bisect_right(self._starts, index) - 1]
+
+    def _make_panel(self, index, spec):
+        panel = SolarPanel(self.panel_location(index))
+        panel.capacity = spec.capacity
+        panel.efficiency = spec.efficiency
+        panel.orientation = spec.orientation
+        return panel
+
+    def panel_location(self, index):
+        return f"{self.location} - Panel {index + 1}"
+
+    def add(self, capacity=250, efficiency=0.85, orientation=180):
+        self.add_many(1, capacity, efficiency, orientation)
+
+    def add_many(self, count, capacity=250, efficiency=0.85, orientation=180):
+        spec = PanelSpec.get(capacity, efficiency, orientation)
+        if not self._specs or self._specs[-1] is not spec:
+            self._specs.append(spec)
+            self._starts.append(self._count)
+        self._count += count
+        self._base += spec.weight * count
+
+    def append(self, panel):
+        """Add an existing SolarPanel; it keeps its own state"""
+        index = self._count
+        self.add(panel.capacity, panel.efficiency, panel.orientation)
+        self.overrides[index] = panel
+
+    def detach(self, index):
+        """Give panel index its own state and return it for changes"""
+        panel = self[index]
+        if index < 0:
+            index += self._count
+        self.overrides[index] = panel
+        return panel
+
+    def set_fault(self, index):
+        panel = self.detach(index)
+        panel.status = "fault"
+        return panel
+
+    def _column(self, name):
+        column = array('d')
+        for run, spec in enumerate(self._specs):
+            stop = self._starts[run + 1] if run + 1 < len(self._starts) else self._count
+            column.extend(array('d', [getattr(spec, name)]) * (stop - self._starts[run]))
+        return column
+
+    @property
+    def capacity(self):
+        return self._column('capacity')
+
+    @property
+    def efficiency(self):
+        return self._column('efficiency')
+
+    @property
+    def orientation(self):
+        return self._column('orientation')
+
+    def _weights(self):
+        weights = self._column('weight')
+        for index, panel in self.overrides.items():
+            weights[index] = _panel_weight(panel)
+        return weights
+
+    @property
+    def peak_output(self):
+        """Combined output in W at full sunlight"""
+        return self._base + sum(_panel_weight(panel) - self._spec_at(index).weight
+                                for index, panel in self.overrides.items())
+
+    def generate_power(self, irradiance, per_panel=False):
+        """
+        Output in W for one irradiance value or a time series of them.
+        Aggregate output is one multiplication per time step; per_panel
+        returns one array per time step (or a single array for a value).
+        """
+        if per_panel:
+            weights = self._weights()
+            if isinstance(irradiance, (int, float)):
+                scale = irradiance / 100
+                return array('d', (weight * scale for weight in weights))
+            return [array('d', (weight * value / 100 for weight in weights))
+                    for value in irradiance]
+        peak = self.peak_output
+        if isinstance(irradiance, (int, float)):
+            return peak * irradiance / 100
+        peak /= 100
+        return array('d', (peak * value for value in irradiance))
+
+    def energy(self, irradiance, step_hours=1.0, per_panel=False):
+        """Energy in kWh produced over an irradiance series"""
+        exposure = sum(irradiance) / 100 * step_hours / 1000
+        if per_panel:
+            return array('d', (weight * exposure for weight in self._weights()))
+        return self.peak_output * exposure
+
+    def charge_battery(self, irradiance, capacity_kwh, load_kw=0.0, step_hours=1.0, level_kwh=0.0):
+        """
+        Run a battery of capacity_kwh through an irradiance series.
+        Surplus over load_kw charges the battery, a deficit drains it;
+        energy that does not fit is spilled, demand it cannot cover is unmet.
+        """
+        levels = array('d')
+        charged = spilled = unmet = 0.0
+        peak = self.peak_output / 100000  # kW per irradiance percent
+        for value in irradiance:
+            surplus = (peak * value - load_kw) * step_hours
+            if surplus >= 0:
+                stored = min(surplus, capacity_kwh - level_kwh)
+                charged += stored
+                spilled += surplus - stored
+                level_kwh += stored
+            else:
+                drawn = min(-surplus, level_kwh)
+                unmet += -surplus - drawn
+                level_kwh -= drawn
+            levels.append(level_kwh)
+        return BatteryRun(levels, charged, spilled, unmet)
+
+
 class EnergyStation:
     def __init__(self):
-        self.solar_panels = []
+        self.panel_bank = PanelBank()
         self.battery_storage = None
+        self.battery_level = 0.0  # kWh
         self.monitoring_system = None
         self.grid_connection = None
-        self.location = "Unknown"
+
+    @property
+    def location(self):
+        return self.panel_bank.location
+
+    @location.setter
+    def location(self, location):
+        self.panel_bank.location = location
+
+    @property
+    def solar_panels(self):
+        return self.panel_bank
 
     def __str__(self):
         info = [f"\n⚡ Energy Station at {self.location}"]
@@ -46,6 +266,19 @@ class EnergyStation:
 
         return "\n".join(info)
 
+    def generate_power(self, irradiance, per_panel=False):
+        return self.panel_bank.generate_power(irradiance, per_panel)
+
+    def charge_battery(self, irradiance, load_kw=0.0, step_hours=1.0):
+        """Battery levels over an irradiance series, starting from the current charge"""
+        if not self.battery_storage:
+            raise ValueError("Station has no battery storage")
+        run = self.panel_bank.charge_battery(irradiance, self.battery_storage, load_kw,
+                                             step_hours, self.battery_level)
+        if run.levels:
+            self.battery_level = run.levels[-1]
+        return run
+
 
 class EnergyStationBuilder:
     def __init__(self):
@@ -55,15 +288,12 @@ class EnergyStationBuilder:
         self._station.location = location
         return self
 
-    def add_solar_panel(self, capacity=250):
-        panel = SolarPanel(f"{self._station.location} - Panel {len(self._station.solar_panels) + 1}")
-        panel.capacity = capacity
-        self._station.solar_panels.append(panel)
+    def add_solar_panel(self, capacity=250, orientation=180):
+        self._station.panel_bank.add(capacity, orientation=orientation)
         return self
 
-    def add_multiple_panels(self, count, capacity=250):
-        for _ in range(count):
-            self.add_solar_panel(capacity)
+    def add_multiple_panels(self, count, capacity=250, orientation=180):
+        self._station.panel_bank.add_many(count, capacity, orientation=orientation)
         return self
 
     def add_battery_storage(self, capacity_kwh):
@@ -116,6 +346,17 @@ class EnergyStationDirector:
                 .add_grid_connection("High-voltage")
                 .build())
 
+    @staticmethod
+    def build_solar_farm(location, panel_count=1_000_000):
+        builder = EnergyStationBuilder()
+        return (builder
+                .set_location(location)
+                .add_multiple_panels(panel_count, 500)
+                .add_battery_storage(100_000)
+                .add_monitoring_system("Industrial IoT")
+                .add_grid_connection("High-voltage")
+                .build())
+
 
 # Example usage demonstrating builder pattern
 def demo_builder():
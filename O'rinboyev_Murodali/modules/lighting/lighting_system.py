@@ -1,3 +1,11 @@
+import time
+from array import array
+from bisect import bisect_right
+
+
+MAX_WATTS = 50  # street light draw at full brightness
+
+
 class Device:
     def __init__(self, location):
         self.location = location
@@ -6,12 +14,132 @@ class Device:
     def get_info(self):
         return f"{self.__class__.__name__} at {self.location}"
 
+    def status_fields(self):
+        return self.status, None
+
+
+class EnergyMeter:
+    """
+    Records every power change of the lights attached to it.
+    Per-light and city-wide energy are integrated as changes happen;
+    the city timeline keeps cumulative Wh at each change, so energy over
+    any window is two binary searches and current draw is one lookup.
+    Times are clock() seconds. A long-lived meter can drop history it no
+    longer needs with compact().
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.power = 0.0           # current draw of all attached lights, W
+        self._lights = {}          # light -> [watts, since, Wh before since]
+        self._times = array('d')   # time of each change in city draw
+        self._energy = array('d')  # city Wh used up to that time
+        self._draw = array('d')    # city W from that time on
+        self._horizon = float('-inf')  # earliest time still answerable
+
+    def __len__(self):
+        return len(self._lights)
+
+    def attach(self, light):
+        """Meter the light under any decorators; a light may report to several meters"""
+        while hasattr(light, '_light'):
+            light = light._light
+        if light not in self._lights:
+            self._lights[light] = [0.0, self.clock(), 0.0]
+            light.meters.append(self)
+            self.record(light)
+        return light
+
+    def detach(self, light):
+        self._set_watts(light, 0.0, self.clock())
+        del self._lights[light]
+        light.meters.remove(self)
+
+    def record(self, light):
+        """Called by a light whenever its on/off state or brightness changes"""
+        self._set_watts(light, light.power_draw(), self.clock())
+
+    def _set_watts(self, light, watts, now):
+        state = self._lights[light]
+        old_watts, since, used = state
+        state[:] = [watts, now, used + old_watts * (now - since) / 3600]
+        if watts == old_watts:
+            return
+        self.power += watts - old_watts
+        if self._times and self._times[-1] == now:
+            self._draw[-1] = self.power
+            return
+        self._energy.append(self.energy_wh_at(now))
+        self._times.append(now)
+        self._draw.append(self.power)
+
+    def current_power(self, light=None):
+        if light is None:
+            return self.power
+        return self._lights[light][0]
+
+    def compact(self, until):
+        """Drop timeline entries needed only for windows starting before until"""
+        index = bisect_right(self._times, until) - 1
+        if index > 0:
+            del self._times[:index]
+            del self._energy[:index]
+            del self._draw[:index]
+        self._horizon = max(self._horizon, until)
+
+    def energy_wh_at(self, moment):
+        """City Wh used from the first change up to moment"""
+        if moment < self._horizon:
+            raise ValueError(f"Meter history before {self._horizon} was compacted")
+        index = bisect_right(self._times, moment) - 1
+        if index < 0:
+            return 0.0
+        return self._energy[index] + self._draw[index] * (moment - self._times[index]) / 3600
+
+    def energy_kwh(self, start=None, end=None):
+        """City kWh between start and end (defaults: first change, now)"""
+        if end is None:
+            end = self.clock()
+        if start is None:
+            start = max(self._times[0], self._horizon) if self._times else end
+        return (self.energy_wh_at(end) - self.energy_wh_at(start)) / 1000
+
+    def light_energy_kwh(self, light):
+        watts, since, used = self._lights[light]
+        return (used + watts * (self.clock() - since) / 3600) / 1000
+
 
 class StreetLight(Device):
     def __init__(self, location):
         super().__init__(location)
-        self.is_on = False
-        self.brightness = 100
+        self.meters = []
+        self._is_on = False
+        self._brightness = 100
+
+    @property
+    def is_on(self):
+        return self._is_on
+
+    @is_on.setter
+    def is_on(self, value):
+        self._is_on = value
+        self._changed()
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, level):
+        self._brightness = level
+        self._changed()
+
+    def _changed(self):
+        for meter in self.meters:
+            meter.record(self)
+
+    def power_draw(self):
+        return (self._brightness / 100) * MAX_WATTS if self._is_on else 0.0
 
     def turn_on(self):
         self.is_on = True
@@ -21,6 +149,9 @@ class StreetLight(Device):
         self.is_on = False
         return "Light turned OFF"
 
+    def status_fields(self):
+        return ("on" if self.is_on else "off"), self.brightness
+
     def get_info(self):
         state = "ON" if self.is_on else "OFF"
         return f"💡 Street Light at {self.location} - {state} (Brightness: {self.brightness}%)"
@@ -37,6 +168,25 @@ class LightDecorator(Device):
     def turn_off(self):
         return self._light.turn_off()
 
+    @property
+    def is_on(self):
+        return self._light.is_on
+
+    @is_on.setter
+    def is_on(self, value):
+        self._light.is_on = value
+
+    @property
+    def brightness(self):
+        return self._light.brightness
+
+    @brightness.setter
+    def brightness(self, level):
+        self._light.brightness = level
+
+    def status_fields(self):
+        return self._light.status_fields()
+
     def get_info(self):
         return self._light.get_info()
 
@@ -72,17 +222,21 @@ class DimmingDecorator(LightDecorator):
 
 
 class EnergyMonitorDecorator(LightDecorator):
-    def __init__(self, light):
+    def __init__(self, light, meter=None):
+        # Pass one shared meter for city-wide totals; without one the
+        # monitor gets a private meter that lives as long as it does
         super().__init__(light)
-        self.power_consumption = 0.0
+        self.meter = meter if meter is not None else EnergyMeter()
+        self._metered = self.meter.attach(light)
+        self.power_consumption = self.meter.current_power(self._metered)
 
     def calculate_consumption(self):
-        if self._light.is_on:
-            self.power_consumption = (self._light.brightness / 100) * 50  # 50W max
-        else:
-            self.power_consumption = 0.0
+        self.power_consumption = self.meter.current_power(self._metered)
         return self.power_consumption
 
+    def energy_kwh(self):
+        return self.meter.light_energy_kwh(self._metered)
+
     def get_info(self):
         base_info = self._light.get_info()
         consumption = self.calculate_consumption()
@@ -6,6 +6,9 @@ class Device:
     def get_info(self):
         return f"{self.__class__.__name__} at {self.location}"
 
+    def status_fields(self):
+        return self.status, None
+
 
 class Camera(Device):
     def __init__(self, location):
@@ -26,6 +29,9 @@ class Camera(Device):
             return f"📹 Live feed from {self.location} [{self.resolution}]"
         return "Camera not recording"
 
+    def status_fields(self):
+        return ("recording" if self.is_recording else "standby"), self.resolution
+
     def get_info(self):
         status = "Recording" if self.is_recording else "Standby"
         return f"📷 Camera at {self.location} - {status} ({self.resolution})"
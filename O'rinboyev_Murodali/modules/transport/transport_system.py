@@ -6,6 +6,9 @@ class Device:
     def get_info(self):
         return f"{self.__class__.__name__} at {self.location} ({self.status})"
 
+    def status_fields(self):
+        return self.status, None
+
 
 class TrafficLight(Device):
     def __init__(self, location):
@@ -20,6 +23,9 @@ class TrafficLight(Device):
             return True
         return False
 
+    def status_fields(self):
+        return self.current_state, self.cycle_time
+
     def get_info(self):
         return f"🚦 Traffic Light at {self.location} - State: {self.current_state}"
 
@@ -31,5 +37,8 @@ class PublicTransport(Device):
         self.capacity = 50
         self.current_passengers = 0
 
+    def status_fields(self):
+        return self.status, self.current_passengers
+
     def get_info(self):
         return f"🚌 Public Transport on {self.route} - Passengers: {self.current_passengers}/{self.capacity}"
\ No newline at end of file
@@ -1,6 +1,11 @@
+import io
+import json
+import tracemalloc
+
 from core.controller import SmartCityController
 from core.factories.device_factory import DeviceFactory, AbstractDeviceFactory
-from modules.lighting.lighting_system import StreetLight, MotionSensorDecorator, DimmingDecorator
+from modules.lighting.lighting_system import (StreetLight, MotionSensorDecorator, DimmingDecorator,
+                                              EnergyMonitorDecorator, EnergyMeter)
 from modules.security.security_system import Camera, CameraProxy
 from modules.energy.energy_system import EnergyStationBuilder, EnergyStationDirector
 
@@ -159,6 +164,209 @@ def test_facade_pattern():
     print("\n✅ Facade Pattern works correctly!")
 
 
+def test_device_registry():
+    print("\n" + "=" * 60)
+    print("TEST 8: DEVICE REGISTRY")
+    print("=" * 60)
+
+    controller = SmartCityController()
+
+    specs = [("street_light", f"Harbor - Pier {i}") for i in range(3000)]
+    specs += [("camera", f"Harbor - Gate {i}") for i in range(500)]
+    specs += [("Traffic_Light", "Harbor - Crossing")]
+    created = controller.create_devices(specs)
+    print(f"Created {len(created)} devices in bulk")
+
+    assert len(created) == 3501
+    assert len(controller.find_devices(location_prefix="Harbor - Gate")) == 500
+    assert len(controller.find_devices("camera", location_prefix="Harbor - Pier")) == 0
+    assert controller.find_devices("traffic_light", subsystem="transport",
+                                   location_prefix="Harbor")[0].location == "Harbor - Crossing"
+    assert created[0] in controller._subsystems['lighting']
+
+    before = len(controller._devices)
+    try:
+        controller.create_devices([("camera", "Harbor - Tower"), ("drone", "Harbor - Sky")])
+        assert False, "❌ Unknown device type was accepted!"
+    except ValueError as error:
+        print(f"Rejected invalid batch: {error}")
+    assert len(controller._devices) == before
+
+    controller.create_devices([("camera", f"Zone - {i}") for i in (3, 1, 2)])
+    order = [device.location for device in controller.find_devices(location_prefix="Zone")]
+    controller.create_devices([("camera", f"Zone - Extra {i}") for i in range(70)])
+    grown = [device.location for device in controller.find_devices(location_prefix="Zone")]
+    assert order == grown[:3] == ["Zone - 3", "Zone - 1", "Zone - 2"]
+
+    mixed = controller.create_devices([("camera", "Mixed - A"), ("street_light", "Mixed - B"),
+                                       ("Camera", "Mixed - C")])
+    assert [device.location for device in mixed] == ["Mixed - A", "Mixed - B", "Mixed - C"]
+    assert [device.location for device in controller._devices[-3:]] == [
+        "Mixed - A", "Mixed - B", "Mixed - C"]
+    assert [device.location for device in controller.find_devices("camera", location_prefix="Mixed")] == [
+        "Mixed - A", "Mixed - C"]
+
+    print("\n✅ Device Registry works correctly!")
+
+
+def test_status_streaming():
+    print("\n" + "=" * 60)
+    print("TEST 9: STATUS STREAMING")
+    print("=" * 60)
+
+    controller = SmartCityController()
+    controller.create_devices([("street_light", f"Depot - Lamp {i:03}") for i in range(120)])
+
+    page = controller.status_page(2, 50, device_type="street_light", location_prefix="Depot")
+    assert len(page) == 50
+    assert page[0].location == "Depot - Lamp 050"
+    assert page[0].subsystem == "lighting" and page[0].state == "off"
+    assert len(controller.status_page(3, 50, location_prefix="Depot - Lamp")) == 20
+
+    first = next(controller.iter_status(subsystem="transport"))
+    print(f"First transport status: {first}")
+
+    summary = controller.status_summary()
+    assert sum(summary['lighting'].values()) == len(controller._subsystems['lighting'])
+
+    stream = io.StringIO()
+    written = controller.write_status_ndjson(stream, location_prefix="Depot")
+    lines = stream.getvalue().splitlines()
+    assert written == len(lines) == 120
+    assert json.loads(lines[0])["device_type"] == "street_light"
+
+    controller.get_system_status(summary_only=True)
+    controller.get_system_status(subsystem="transport", page=1, page_size=5)
+
+    print("\n✅ Status Streaming works correctly!")
+
+
+def test_solar_array():
+    print("\n" + "=" * 60)
+    print("TEST 10: SOLAR ARRAY")
+    print("=" * 60)
+
+    station = (EnergyStationBuilder()
+               .set_location("Solar Farm")
+               .add_multiple_panels(10, 400)
+               .add_solar_panel(400, orientation=0)
+               .add_battery_storage(10)
+               .build())
+    bank = station.panel_bank
+    assert len(bank) == len(station.solar_panels) == 11
+
+    panel = station.solar_panels[0]
+    assert abs(station.generate_power(50, per_panel=True)[0] - panel.generate_power(50)) < 1e-9
+    assert abs(station.generate_power(100) - bank.peak_output) < 1e-9
+    north = station.generate_power(100, per_panel=True)[-1]
+    assert north < station.generate_power(100, per_panel=True)[0]
+
+    day = [0] * 6 + [20, 40, 60, 80, 90, 100, 100, 90, 80, 60, 40, 20] + [0] * 6
+    series = station.generate_power(day)
+    assert len(series) == 24 and series[0] == 0 and max(series) == series[11]
+    produced = bank.energy(day)
+    assert abs(produced - sum(series) / 1000) < 1e-9
+    print(f"Daily production: {produced:.1f} kWh")
+
+    run = station.charge_battery(day, load_kw=0.5)
+    assert max(run.levels) == 10
+    assert abs(produced + run.unmet - 0.5 * 24 - run.spilled - run.levels[-1]) < 1e-9
+    assert station.battery_level == run.levels[-1]
+    print(f"Battery end level: {station.battery_level:.1f} kWh, spilled {run.spilled:.1f} kWh")
+
+    print("\n✅ Solar Array works correctly!")
+
+
+def test_panel_flyweight():
+    print("\n" + "=" * 60)
+    print("TEST 11: PANEL FLYWEIGHT")
+    print("=" * 60)
+
+    tracemalloc.start()
+    farm = EnergyStationDirector.build_solar_farm("Desert Farm")
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(farm)
+    print(f"Memory for {len(farm.solar_panels)} panels: {peak_memory / 1024:.1f} KiB")
+    assert len(farm.solar_panels) == 1_000_000
+    assert peak_memory < 100_000
+
+    last = farm.solar_panels[-1]
+    assert last.location == "Desert Farm - Panel 1000000" and last.capacity == 500
+    assert farm.solar_panels[0] is not farm.solar_panels[0]
+
+    healthy = farm.panel_bank.peak_output
+    farm.panel_bank.set_fault(10)
+    custom = farm.panel_bank.detach(11)
+    custom.capacity = 250
+    assert farm.solar_panels[10].status == "fault" and farm.solar_panels[11] is custom
+    assert len(farm.panel_bank.overrides) == 2
+    assert abs(healthy - farm.panel_bank.peak_output - 500 * 0.85 - 250 * 0.85) < 1e-3
+
+    small = EnergyStationBuilder().set_location("Roof").add_multiple_panels(3, 300).build()
+    assert [panel.location for panel in small.solar_panels] == ["Roof - Panel 1", "Roof - Panel 2", "Roof - Panel 3"]
+
+    print("\n✅ Panel Flyweight works correctly!")
+
+
+def test_energy_metering():
+    print("\n" + "=" * 60)
+    print("TEST 12: ENERGY METERING")
+    print("=" * 60)
+
+    now = [0.0]
+    meter = EnergyMeter(clock=lambda: now[0])
+    light = StreetLight("Metered Street")
+    sensor = MotionSensorDecorator(light)
+    dimmer = DimmingDecorator(light)
+    monitor = EnergyMonitorDecorator(light, meter)
+
+    sensor.detect_motion()          # 50W from t=0
+    now[0] = 3600
+    dimmer.set_brightness(50)       # 25W from 1h
+    now[0] = 7200
+    monitor.turn_off()              # off at 2h
+    now[0] = 10800
+
+    assert abs(meter.energy_kwh() - 0.075) < 1e-9
+    assert abs(meter.energy_kwh(1800, 5400) - 0.0375) < 1e-9
+    assert abs(monitor.energy_kwh() - 0.075) < 1e-9
+    assert monitor.calculate_consumption() == 0.0
+    print(f"Energy used: {meter.energy_kwh():.3f} kWh")
+
+    lights = [EnergyMonitorDecorator(StreetLight(f"Grid {i}"), meter) for i in range(1000)]
+    for monitored in lights:
+        monitored.turn_on()
+    assert meter.current_power() == 1000 * 50
+    assert "Energy Monitor (50.0W)" in lights[0].get_info()
+    now[0] = 14400
+    assert abs(meter.energy_kwh(10800, 14400) - 50.0) < 1e-6
+
+    shared = StreetLight("Shared Street")
+    first = EnergyMonitorDecorator(shared, meter)
+    second = EnergyMonitorDecorator(shared, EnergyMeter(clock=lambda: now[0]))
+    shared.is_on = True
+    assert first.calculate_consumption() == second.calculate_consumption() == 50.0
+    assert "Energy Monitor (50.0W)" in first.get_info()
+
+    size = len(meter._times)
+    meter.compact(10800)
+    assert len(meter._times) < size
+    assert abs(meter.energy_kwh(10800, 14400) - 50.0) < 1e-6
+    try:
+        meter.energy_kwh(0, 3600)
+        assert False, "❌ Compacted history was answered!"
+    except ValueError:
+        pass
+
+    private = EnergyMonitorDecorator(StreetLight("Private Street"))
+    private.turn_on()
+    assert private.meter is not EnergyMonitorDecorator(StreetLight("Other Street")).meter
+    assert private.meter.current_power() == 50.0
+
+    print("\n✅ Energy Metering works correctly!")
+
+
 def run_all_tests():
     print("\n" + "=" * 60)
     print("🧪 SMARTCITY SYSTEM - DESIGN PATTERNS TEST SUITE")
@@ -172,6 +380,11 @@ def run_all_tests():
         test_proxy_pattern()
         test_builder_pattern()
         test_facade_pattern()
+        test_device_registry()
+        test_status_streaming()
+        test_solar_array()
+        test_panel_flyweight()
+        test_energy_metering()
 
         print("\n" + "=" * 60)
         print("✅ ALL TESTS PASSED!")
@@ -4,13 +4,54 @@ SmartCity Controller - Central Management System
 Design Patterns Used:
 1. Singleton - Ensures only one controller instance exists
 2. Facade - Provides simplified interface to complex subsystems
+
+Subsystems are built on first access, and their modules are only imported
+then, so a short CLI run pays only for the subsystems it touches.
 """
 
-from modules.lighting.lighting_system import LightingSystem
-from modules.transport.transport_manager import TransportManager
-from modules.security.security_system import SecuritySystem
-from modules.energy.energy_manager import EnergyManager
-from core.factories.district_factory import DistrictFactory
+import importlib
+import threading
+import time
+
+from core.fan_out import FanOut
+from core.snapshot import CitySnapshot, SNAPSHOT_TTL
+from core.factories.district_load import CityLoad
+
+class LazySubsystem:
+    """
+    Descriptor that imports and constructs a subsystem on first access.
+    The instance is then stored on the controller, shadowing the
+    descriptor, so later accesses are plain attribute lookups.
+    Import and construction times are recorded in ``startup_times``.
+    ``configure`` names a controller method called with the new subsystem.
+    """
+    
+    def __init__(self, module_name, class_name, configure=None):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.configure = configure
+        self._lock = threading.Lock()
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, controller, owner=None):
+        if controller is None:
+            return self
+        with self._lock:
+            subsystem = controller.__dict__.get(self.name)
+            if subsystem is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self.module_name)
+                imported = time.perf_counter()
+                subsystem = getattr(module, self.class_name)()
+                built = time.perf_counter()
+                controller.startup_times[self.name] = (
+                    (imported - started) * 1000, (built - imported) * 1000)
+                controller.__dict__[self.name] = subsystem
+                if self.configure is not None:
+                    getattr(controller, self.configure)(subsystem)
+        return subsystem
 
 class SmartCityController:
     """
@@ -23,6 +64,17 @@ class SmartCityController:
     
     _instance = None
     
+    # Subsystems (Facade pattern - hiding complexity), built on first access
+    lighting = LazySubsystem("modules.lighting.lighting_system", "LightingSystem")
+    transport = LazySubsystem("modules.transport.transport_manager", "TransportManager")
+    security = LazySubsystem("modules.security.security_system", "SecuritySystem")
+    energy = LazySubsystem("modules.energy.energy_manager", "EnergyManager",
+                           configure="_apply_load")
+    district_factory = LazySubsystem("core.factories.district_factory", "DistrictFactory")
+    
+    SUBSYSTEMS = ("lighting", "transport", "security", "energy", "district_factory")
+    CITY_SYSTEMS = ("lighting", "transport", "security", "energy")
+    
     def __new__(cls):
         """Singleton implementation - ensures single instance."""
         if cls._instance is None:
@@ -44,16 +96,33 @@ class SmartCityController:
             
         self._initialized = True
         self.districts = []
-        
-        # Initialize subsystems (Facade pattern - hiding complexity)
-        self.lighting = LightingSystem()
-        self.transport = TransportManager()
-        self.security = SecuritySystem()
-        self.energy = EnergyManager()
-        self.district_factory = DistrictFactory()
+        self.city_load = CityLoad()  # summed district load profiles
+        self.startup_times = {}  # subsystem -> (import ms, construction ms)
+        self.fan_out = FanOut()  # per-subsystem deadlines in fan_out.deadlines
+        self.snapshot_ttl = SNAPSHOT_TTL
+        self._snapshot = None
+        self.shards = None  # ShardCoordinator while running sharded
         
         print("🔧 SmartCity Controller initialized (Singleton)")
     
+    def loaded_subsystems(self):
+        """Return the names of subsystems constructed so far."""
+        return [name for name in self.SUBSYSTEMS if name in self.__dict__]
+    
+    def startup_report(self):
+        """Print per-subsystem import and construction times."""
+        print("\n⏱️ STARTUP TIME REPORT")
+        print("-" * 40)
+        total = 0.0
+        for name in self.SUBSYSTEMS:
+            if name not in self.startup_times:
+                print(f"{name:<18} not loaded")
+                continue
+            import_ms, construct_ms = self.startup_times[name]
+            total += import_ms + construct_ms
+            print(f"{name:<18} import {import_ms:7.1f} ms  build {construct_ms:7.1f} ms")
+        print(f"{'total':<18} {total:.1f} ms")
+    
     def initialize_city(self):
         """Initialize the city with default districts."""
         print("🏗️ Building city infrastructure...")
@@ -69,11 +138,96 @@ class SmartCityController:
         """
         Add a new district to the city.
         Uses Factory pattern to create appropriate district type.
+        When sharded, the shard district is created first so a failing
+        shard leaves the local city unchanged.
         """
+        if self.shards is not None:
+            self.shards.add_district(name, district_type)
         district = self.district_factory.create_district(district_type, name)
         self.districts.append(district)
+        self.city_load.add(district)
+        if "energy" in self.__dict__:
+            self._apply_load(self.energy)
+        self._snapshot = None
         print(f"➕ Added district: {district.get_info()}")
     
+    def update_district(self, name):
+        """
+        Re-apply a district's load after its population or buildings
+        changed; the city sums are adjusted in O(24).
+        """
+        district = next((d for d in self.districts if d.name == name), None)
+        if district is None:
+            raise KeyError(f"Unknown district: {name}")
+        district.invalidate_load()
+        self.city_load.update(district)
+        if "energy" in self.__dict__:
+            self._apply_load(self.energy)
+        self._snapshot = None
+        return district.load
+    
+    def _apply_load(self, energy):
+        """Drive energy consumption from the summed district demand."""
+        if self.city_load.district_count:
+            energy.set_demand_profile(self.city_load.demand)
+    
+    def size_infrastructure(self):
+        """
+        Add street lights and buses until the lighting and transit
+        capacity covers the district load model's darkest and busiest hour.
+        
+        Returns:
+            (lights added, buses added)
+        """
+        from modules.transport.transport_manager import BusBuilder, VehicleDirector
+        
+        lights = self.city_load.lights_required() - self.lighting.root.light_count()
+        if lights > 0:
+            block = len(self.lighting.find("Expansion").children) + 1 if (
+                "Expansion" in self.lighting.paths) else 1
+            self.lighting.add_district(f"Expansion/Block {block}", f"EXP{block}", lights)
+        
+        seats = self.city_load.seats_required() - sum(
+            vehicle.capacity for vehicle in self.transport.vehicles)
+        buses = 0
+        if seats > 0:
+            capacity = VehicleDirector(BusBuilder()).construct_prototype().capacity
+            buses = -(-seats // capacity)
+            vehicle_ids = []
+            number = 1
+            while len(vehicle_ids) < buses:
+                if f"B{number:03d}" not in self.transport.vehicles:
+                    vehicle_ids.append(f"B{number:03d}")
+                number += 1
+            self.transport.add_fleet("bus", vehicle_ids)
+        
+        print(f"📐 Sized for {self.city_load.district_count} districts: "
+              f"+{max(lights, 0)} lights, +{buses} buses")
+        return max(lights, 0), buses
+    
+    def start_sharding(self, processes=None):
+        """
+        Switch to sharded mode: every district gets its own lighting,
+        transport and security in one of ``processes`` worker processes
+        (default: one per core). City-wide operations then also run on all
+        shards in parallel with the local systems.
+        """
+        if self.shards is None:
+            from core.sharding import ShardCoordinator
+            
+            self.shards = ShardCoordinator(processes)
+            for district in self.districts:
+                self.shards.add_district(district.name, district.get_type())
+            print(f"🧩 Sharded {len(self.districts)} districts over "
+                  f"{self.shards.processes} processes")
+        return self.shards
+    
+    def stop_sharding(self):
+        """Shut down the district shards and return to single-process mode."""
+        if self.shards is not None:
+            self.shards.close()
+            self.shards = None
+    
     def display_city_status(self):
         """Display comprehensive city status (Facade pattern in action)."""
         print("\n" + "="*60)
@@ -88,17 +242,37 @@ class SmartCityController:
         print(f"🚗 Transport: {self.transport.get_status()}")
         print(f"🔒 Security: {self.security.get_status()}")
         print(f"⚡ Energy: {self.energy.get_status()}")
+        if self.shards is not None:
+            print(f"\n🧩 District shards ({self.shards.processes} processes):")
+            for name, statuses in self.shards.get_status().items():
+                print(f"   • {name}: " + "; ".join(statuses.values()))
         print("="*60)
     
+    def snapshot(self, max_age=None):
+        """
+        Return a CitySnapshot of all subsystem metrics.
+        A snapshot younger than ``max_age`` seconds (default: snapshot_ttl)
+        is reused instead of collecting a new one.
+        """
+        if max_age is None:
+            max_age = self.snapshot_ttl
+        if self._snapshot is None or self._snapshot.age() >= max_age:
+            self._snapshot = CitySnapshot.collect(self)
+        return self._snapshot
+    
     def control_lighting(self, action, value=None):
-        """Control city lighting system."""
+        """Control city lighting system, including the shard districts when sharded."""
         if action == "on":
-            self.lighting.turn_on_all()
+            self.run_on_systems("turn_on_all", ("lighting",), include_shards=True)
         elif action == "off":
-            self.lighting.turn_off_all()
+            self.run_on_systems("turn_off_all", ("lighting",), include_shards=True)
         elif action == "dim" and value is not None:
-            self.lighting.set_brightness(value)
+            self.run_on_systems("set_brightness", ("lighting",), include_shards=True,
+                                args=(value,))
         print(f"💡 Lighting: {self.lighting.get_status()}")
+        if self.shards is not None:
+            for name, statuses in self.shards.get_status(systems=("lighting",)).items():
+                print(f"   🧩 {name}: {statuses['lighting']}")
     
     def manage_traffic(self, action):
         """Manage city traffic."""
@@ -115,9 +289,9 @@ class SmartCityController:
         """Perform security system check."""
         self.security.perform_check()
     
-    def trigger_alarm(self, location):
-        """Trigger security alarm at location."""
-        self.security.trigger_alarm(location)
+    def trigger_alarm(self, location, position=None):
+        """Trigger security alarm at location (optionally at (x, y) metres)."""
+        self.security.trigger_alarm(location, position)
     
     def view_cameras(self):
         """View security camera feeds."""
@@ -136,14 +310,37 @@ class SmartCityController:
         """Switch to different energy source."""
         self.energy.switch_source(source)
     
+    def run_on_systems(self, operation, systems=None, include_shards=False, args=()):
+        """
+        Run ``operation(*args)`` on city systems (default: all of them)
+        concurrently, each bounded by its deadline. Returns a FanOutResult.
+        
+        With ``include_shards`` a running ShardCoordinator is one more
+        target of the same fan-out, so shards and local systems work at
+        the same time; failed shard districts are merged into the
+        failures as "shards/<district>".
+        """
+        if systems is None:
+            systems = self.CITY_SYSTEMS
+        targets = {name: (lambda name=name: getattr(self, name))
+                   for name in systems}
+        shards = self.shards
+        if include_shards and shards is not None:
+            targets["shards"] = lambda: shards
+        outcome = self.fan_out.run(operation, targets, args)
+        shard_outcome = outcome.results.get("shards")
+        if shard_outcome is not None:
+            for district, error in shard_outcome.failures.items():
+                outcome.failures[f"shards/{district}"] = error
+        return outcome
+    
     def emergency_mode(self):
         """Activate emergency protocols across all systems."""
         print("\n🚨 EMERGENCY MODE ACTIVATED")
-        self.lighting.emergency_mode()
-        self.transport.emergency_mode()
-        self.security.emergency_mode()
-        self.energy.emergency_mode()
-        print("✅ All systems in emergency mode")
+        outcome = self.run_on_systems("emergency_mode", include_shards=True)
+        if outcome.ok:
+            print("✅ All systems in emergency mode")
+        return outcome
     
     def generate_report(self):
         """Generate comprehensive system report."""
@@ -151,17 +348,16 @@ class SmartCityController:
         print("="*60)
         self.display_city_status()
         print("\n📈 Detailed Subsystem Reports:")
-        self.lighting.generate_report()
-        self.transport.generate_report()
-        self.security.generate_report()
-        self.energy.generate_report()
+        outcome = self.run_on_systems("generate_report", include_shards=True)
         print("="*60)
+        return outcome
     
     def shutdown(self):
-        """Safely shutdown all city systems."""
+        """Safely shutdown the city systems; ones never built are left unbuilt."""
         print("🔌 Shutting down subsystems...")
-        self.lighting.shutdown()
-        self.transport.shutdown()
-        self.security.shutdown()
-        self.energy.shutdown()
-        print("✅ All subsystems shut down")
\ No newline at end of file
+        loaded = [name for name in self.loaded_subsystems() if name in self.CITY_SYSTEMS]
+        outcome = self.run_on_systems("shutdown", loaded)
+        self.stop_sharding()
+        if outcome.ok:
+            print("✅ All subsystems shut down")
+        return outcome
\ No newline at end of file
@@ -7,6 +7,8 @@ Defines an interface for creating objects, letting subclasses decide which class
 
 from abc import ABC, abstractmethod
 
+from core.factories.district_load import DistrictLoad
+
 class District(ABC):
     """Abstract base class for all district types."""
     
@@ -14,6 +16,18 @@ class District(ABC):
         self.name = name
         self.population = 0
         self.buildings = []
+        self._load = None
+    
+    @property
+    def load(self):
+        """Hourly demand, lighting and transit profiles (computed once)."""
+        if self._load is None:
+            self._load = DistrictLoad(self)
+        return self._load
+    
+    def invalidate_load(self):
+        """Recompute the load profiles after population or buildings change."""
+        self._load = None
     
     @abstractmethod
     def get_type(self):
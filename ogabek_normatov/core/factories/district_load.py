@@ -0,0 +1,139 @@
+"""
+District Load Model - Hourly demand profiles per district
+
+Turns a district's type, population and building mix into three 24-hour
+vectors:
+- electricity demand in kW
+- street lights that need to be on
+- transit trips per hour
+
+Profiles are computed once per district and cached on it. CityLoad keeps
+the city-wide sums and updates them in O(24) when a district is added,
+removed or updated after a change, so energy consumption and lighting
+and fleet sizing follow the districts without recomputing the whole city.
+"""
+
+from array import array
+import math
+
+HOURS = 24
+RUNS_PER_HOUR = 2  # trips a transit vehicle completes per hour
+
+# District type -> (kW per resident, lights per 1000 residents, trips per resident per hour)
+TYPE_RATES = {
+    "Residential": (0.20, 2.0, 0.020),
+    "Commercial": (0.25, 3.0, 0.030),
+    "Industrial": (0.40, 4.0, 0.015),
+    "Mixed-Use": (0.22, 2.5, 0.025),
+}
+
+# Average kW drawn by each building kind
+BUILDING_LOADS = {
+    "Apartment Complex": 60,
+    "Houses": 0,
+    "Parks": 5,
+    "Shopping Mall": 150,
+    "Offices": 100,
+    "Restaurants": 50,
+    "Factory": 300,
+    "Warehouse": 40,
+    "Processing Plant": 200,
+    "Mixed-use Buildings": 80,
+    "Community Center": 30,
+}
+DEFAULT_BUILDING_LOAD = 50
+
+def _peak(hour, center, width):
+    """Gaussian bump around ``center`` on a 24-hour clock."""
+    distance = min(abs(hour - center), HOURS - abs(hour - center))
+    return math.exp(-(distance / width) ** 2)
+
+def _normalized(values):
+    """Scale a profile to mean 1.0."""
+    mean = sum(values) / len(values)
+    return array("d", (value / mean for value in values))
+
+_SHAPES = {
+    "Residential": _normalized([0.5 + _peak(h, 7.5, 1.5) + 1.4 * _peak(h, 20, 2.5)
+                                for h in range(HOURS)]),
+    "Commercial": _normalized([0.2 + (1.0 if 8 <= h < 19 else 0.0) + 0.3 * _peak(h, 13, 2)
+                               for h in range(HOURS)]),
+    "Industrial": _normalized([0.8 + (0.4 if 6 <= h < 22 else 0.0) for h in range(HOURS)]),
+}
+_SHAPES["Mixed-Use"] = _normalized([(residential + commercial) / 2 for residential, commercial
+                                    in zip(_SHAPES["Residential"], _SHAPES["Commercial"])])
+
+# Share of street lights on each hour, and commuting pattern of transit trips
+_DARKNESS = array("d", (1.0 if h < 6 or h >= 19 else (0.5 if h in (6, 18) else 0.0)
+                        for h in range(HOURS)))
+_COMMUTE = _normalized([0.2 + _peak(h, 8, 1.5) + _peak(h, 17.5, 1.5) for h in range(HOURS)])
+
+class DistrictLoad:
+    """Hourly demand, lighting and transit vectors for one district."""
+
+    def __init__(self, district):
+        kw_per_resident, lights_per_thousand, trip_rate = TYPE_RATES.get(
+            district.get_type(), TYPE_RATES["Mixed-Use"])
+        shape = _SHAPES.get(district.get_type(), _SHAPES["Mixed-Use"])
+
+        average = district.population * kw_per_resident + sum(
+            BUILDING_LOADS.get(building, DEFAULT_BUILDING_LOAD)
+            for building in district.buildings)
+        self.demand = array("d", (average * factor for factor in shape))  # kW
+
+        self.lights = math.ceil(district.population / 1000 * lights_per_thousand)
+        self.lighting = array("d", (self.lights * share for share in _DARKNESS))
+
+        trips = district.population * trip_rate
+        self.transit = array("d", (trips * factor for factor in _COMMUTE))  # trips/h
+
+class CityLoad:
+    """Summed load profiles of all districts, maintained incrementally."""
+
+    def __init__(self):
+        self.demand = array("d", [0.0]) * HOURS
+        self.lighting = array("d", [0.0]) * HOURS
+        self.transit = array("d", [0.0]) * HOURS
+        self.lights = 0
+        self.district_count = 0
+        self._added = {}  # district -> the DistrictLoad counted in the sums
+
+    def _apply(self, load, sign):
+        for total, values in ((self.demand, load.demand), (self.lighting, load.lighting),
+                              (self.transit, load.transit)):
+            for hour in range(HOURS):
+                total[hour] += sign * values[hour]
+        self.lights += sign * load.lights
+        self.district_count += sign
+
+    def add(self, district):
+        """Add a district's cached profiles to the city totals."""
+        if district in self._added:
+            raise ValueError(f"District {district.name} is already counted")
+        self._added[district] = district.load
+        self._apply(district.load, 1)
+
+    def remove(self, district):
+        """Subtract the profiles that were added for a district."""
+        self._apply(self._added.pop(district), -1)
+
+    def update(self, district):
+        """Replace a district's counted profiles with its current ones."""
+        self.remove(district)
+        self.add(district)
+
+    @property
+    def average_demand(self):
+        return sum(self.demand) / HOURS
+
+    @property
+    def peak_demand(self):
+        return max(self.demand)
+
+    def lights_required(self):
+        """Street lights needed to cover the darkest hour."""
+        return math.ceil(max(self.lighting))
+
+    def seats_required(self):
+        """Transit seats needed to carry the peak hour's trips."""
+        return math.ceil(max(self.transit) / RUNS_PER_HOUR)
@@ -0,0 +1,152 @@
+"""
+Fan-out Executor - Run one operation across subsystems concurrently
+
+Each subsystem call runs on its own worker thread with its own deadline.
+The caller waits at most for the longest deadline; a subsystem that is
+still running then is reported as timed out and left to finish in the
+background instead of stalling the others.
+
+Console output of the workers is buffered per subsystem and replayed in
+subsystem order, so concurrent reports do not interleave line by line.
+Routing uses a context variable behind one stdout wrapper that is
+installed once and left in place, so other threads and concurrent
+fan-outs keep writing where they did before. Output a timed-out worker
+produces after its deadline is written straight through as it arrives.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import contextvars
+import io
+import sys
+import threading
+import time
+
+DEFAULT_DEADLINE = 5.0  # seconds each subsystem may take
+
+_capture = contextvars.ContextVar("fan_out_capture", default=None)
+_install_lock = threading.Lock()
+
+class _ContextOutput(io.TextIOBase):
+    """stdout wrapper sending writes to the current context's capture, if any."""
+
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, text):
+        capture = _capture.get()
+        if capture is None:
+            return self.target.write(text)
+        return capture.write(text)
+
+    def flush(self):
+        self.target.flush()
+
+def _install_router():
+    """Wrap the current stdout once; returns the wrapper."""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ContextOutput):
+            sys.stdout = _ContextOutput(sys.stdout)
+        return sys.stdout
+
+class _Capture:
+    """Buffer for one worker; after its deadline, writes pass straight through."""
+
+    def __init__(self, target):
+        self.target = target
+        self.buffer = io.StringIO()
+        self.late = False
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        with self._lock:
+            if self.late:
+                return self.target.write(text)
+            return self.buffer.write(text)
+
+    def release(self):
+        """Return what was buffered; later writes go to the target."""
+        with self._lock:
+            self.late = True
+            return self.buffer.getvalue()
+
+class FanOutResult:
+    """Outcome of a fan-out: results, failures and timeouts per subsystem."""
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.results = {}    # subsystem -> return value
+        self.failures = {}   # subsystem -> exception
+        self.timed_out = []  # subsystems still running at their deadline
+        self.durations = {}  # subsystem -> seconds (completed ones only)
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return not self.failures and not self.timed_out
+
+class FanOut:
+    """Runs ``operation`` on several subsystems concurrently."""
+
+    def __init__(self, deadlines=None, default_deadline=DEFAULT_DEADLINE):
+        self.deadlines = deadlines if deadlines is not None else {}
+        self.default_deadline = default_deadline
+
+    def deadline(self, name):
+        return self.deadlines.get(name, self.default_deadline)
+
+    def run(self, operation, targets, args=()):
+        """
+        Call ``operation(*args)`` on every target concurrently.
+
+        Args:
+            operation: method name to call on each subsystem
+            targets: {name: callable returning the subsystem}; resolving the
+                subsystem happens on the worker, so lazy construction is
+                parallel too
+            args: positional arguments passed to every call
+
+        Returns:
+            FanOutResult
+        """
+        result = FanOutResult(operation)
+        if not targets:
+            return result
+        router = _install_router()
+        captures = {name: _Capture(router.target) for name in targets}
+
+        def call(name, resolve):
+            token = _capture.set(captures[name])
+            try:
+                started = time.perf_counter()
+                value = getattr(resolve(), operation)(*args)
+                result.durations[name] = time.perf_counter() - started
+                return value
+            finally:
+                _capture.reset(token)
+
+        started = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=len(targets))
+        try:
+            futures = {name: pool.submit(call, name, resolve)
+                       for name, resolve in targets.items()}
+            # Collect in deadline order so each wait is bounded by its own deadline
+            for name in sorted(futures, key=self.deadline):
+                remaining = started + self.deadline(name) - time.perf_counter()
+                try:
+                    result.results[name] = futures[name].result(timeout=max(remaining, 0))
+                except TimeoutError:
+                    result.timed_out.append(name)
+                except Exception as error:
+                    result.failures[name] = error
+        finally:
+            pool.shutdown(wait=False)
+        result.elapsed = time.perf_counter() - started
+
+        for name in targets:
+            sys.stdout.write(captures[name].release())
+            if name in result.timed_out:
+                print(f"⏱️ {name} did not finish {operation} within "
+                      f"{self.deadline(name):.1f}s; its further output follows as it arrives")
+            elif name in result.failures:
+                print(f"❌ {name} {operation} failed: {result.failures[name]}")
+        return result
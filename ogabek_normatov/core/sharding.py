@@ -0,0 +1,265 @@
+"""
+District Sharding - City subsystems spread over worker processes
+
+Design Pattern: FACADE
+ShardCoordinator offers the controller's city-wide operations while the
+state behind them lives in worker processes.
+
+What a shard owns: each district's own street lights, buses and cameras,
+sized from the district load model (lights for its darkest hour, buses
+for its busiest hour, a camera per RESIDENTS_PER_CAMERA residents). The
+controller keeps its own subsystems for the city-wide infrastructure
+(main roads, central cameras) and keeps energy, which is one shared grid
+already driven by the summed district demand. Nothing is held twice.
+
+Every district lives in exactly one worker process (shard). The
+coordinator routes a district command to the owning shard and broadcasts
+city-wide operations to all shards at once: every request is sent before
+any reply is read, so the shards work in parallel on separate cores.
+Replies are merged per district. Requests are serialized, so a request
+still running after the caller's deadline finishes its exchange on the
+pipes before the next one starts.
+"""
+
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import threading
+
+from core.fan_out import FanOutResult
+
+SYSTEMS = ("lighting", "transport", "security")
+RESIDENTS_PER_CAMERA = 2500
+
+class DistrictState:
+    """The lighting, transport and security one district owns inside a shard."""
+
+    def __init__(self, name, district_type):
+        from core.factories.district_factory import DistrictFactory
+        from core.factories.district_load import RUNS_PER_HOUR
+        from modules.lighting.lighting_system import LightingSystem
+        from modules.security.security_system import SecuritySystem
+        from modules.transport.transport_manager import (BusBuilder, TransportManager,
+                                                         VehicleDirector)
+
+        self.district = DistrictFactory().create_district(district_type, name)
+        load = self.district.load
+        bus_capacity = VehicleDirector(BusBuilder()).construct_prototype().capacity
+        buses = max(1, math.ceil(max(load.transit) / RUNS_PER_HOUR / bus_capacity))
+        cameras = max(1, math.ceil(self.district.population / RESIDENTS_PER_CAMERA))
+
+        self.lighting = LightingSystem(districts=[(name, name, max(load.lights, 1))])
+        self.transport = TransportManager(fleet=[("bus", f"{name}-B", buses)])
+        self.security = SecuritySystem(cameras=[(f"{name}-CAM-{number}", f"{name} {number}")
+                                                for number in range(1, cameras + 1)])
+
+    def call(self, system, operation, args):
+        return getattr(getattr(self, system), operation)(*args)
+
+    def metrics(self):
+        metrics = {system: getattr(self, system).metrics() for system in SYSTEMS}
+        metrics["district"] = {"name": self.district.name,
+                               "type": self.district.get_type(),
+                               "population": self.district.population}
+        return metrics
+
+def _serve(connection):
+    """
+    Worker loop. Requests are tuples (command, *arguments); every reply is
+    (results, failures, outputs) keyed by district name, where outputs is
+    the console text each district printed while handling the request.
+    """
+    districts = {}
+    while True:
+        command, *arguments = connection.recv()
+        if command == "stop":
+            connection.send(({}, {}, {}))
+            break
+        if command == "add":
+            name, district_type = arguments
+            names = [name]
+        else:
+            names, systems, operation, args = arguments
+            if names is None:
+                names = list(districts)
+        results, failures, outputs = {}, {}, {}
+        for name in names:
+            output = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(output):
+                    if command == "add":
+                        districts[name] = DistrictState(name, district_type)
+                        results[name] = districts[name].district.get_info()
+                    elif command == "metrics":
+                        results[name] = districts[name].metrics()
+                    else:
+                        state = districts[name]
+                        results[name] = {system: state.call(system, operation, args)
+                                         for system in systems}
+            except Exception as error:
+                failures[name] = f"{type(error).__name__}: {error}"
+            outputs[name] = output.getvalue()
+        connection.send((results, failures, outputs))
+    connection.close()
+
+class ShardResult(FanOutResult):
+    """Merged replies of the shards, keyed by district."""
+
+    def __init__(self, operation):
+        super().__init__(operation)
+        self.outputs = {}  # district -> console output
+
+class ShardCoordinator:
+    """
+    Pattern: FACADE
+    Owns the shard processes, assigns districts to them and routes commands.
+    """
+
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.owners = {}  # district name -> shard number, in creation order
+        self.loads = [0] * self.processes  # districts per shard
+        self._connections = []
+        self._workers = []
+        self._lock = threading.Lock()
+        for _ in range(self.processes):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+            worker.start()
+            child.close()
+            self._connections.append(parent)
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, shards, request, operation):
+        """Send ``request`` to every shard first, then merge the replies."""
+        outcome = ShardResult(operation)
+        with self._lock:
+            for shard in shards:
+                self._connections[shard].send(request)
+            for shard in shards:
+                results, failures, outputs = self._connections[shard].recv()
+                outcome.results.update(results)
+                outcome.failures.update(failures)
+                outcome.outputs.update(outputs)
+        return outcome
+
+    def _busy_shards(self):
+        return [shard for shard in range(self.processes) if self.loads[shard]]
+
+    def shard_of(self, name):
+        """Return the shard number owning district ``name``."""
+        try:
+            return self.owners[name]
+        except KeyError:
+            raise KeyError(f"District {name} is not assigned to a shard") from None
+
+    def add_district(self, name, district_type="mixed"):
+        """
+        Create a district on the least loaded shard and return the key it
+        is routed by: its name, or "name (2)", "name (3)", ... when the city
+        already has a district of that name.
+        """
+        key = name
+        number = 2
+        while key in self.owners:
+            key = f"{name} ({number})"
+            number += 1
+        shard = min(range(self.processes), key=self.loads.__getitem__)
+        outcome = self._request([shard], ("add", key, district_type), "add_district")
+        if key in outcome.failures:
+            raise RuntimeError(outcome.failures[key])
+        self.owners[key] = shard
+        self.loads[shard] += 1
+        return key
+
+    def call(self, district, system, operation, *args):
+        """Run ``system.operation(*args)`` for one district on its shard."""
+        request = ("call", [district], (system,), operation, args)
+        outcome = self._request([self.shard_of(district)], request, operation)
+        print(outcome.outputs.get(district, ""), end="")
+        if district in outcome.failures:
+            raise RuntimeError(outcome.failures[district])
+        return outcome.results[district][system]
+
+    def broadcast(self, operation, *args, systems=SYSTEMS):
+        """
+        Run ``operation(*args)`` on the given systems of every district,
+        all shards in parallel. Results are {district: {system: value}}.
+        """
+        request = ("call", None, tuple(systems), operation, args)
+        return self._request(self._busy_shards(), request, operation)
+
+    def _print_failures(self, outcome):
+        for name in self.owners:
+            if name in outcome.failures:
+                print(f"❌ {name} {outcome.operation} failed: {outcome.failures[name]}")
+
+    def _print_outputs(self, outcome):
+        for name in self.owners:
+            if outcome.outputs.get(name):
+                print(f"\n🏙️ District: {name}")
+                print(outcome.outputs[name], end="")
+        self._print_failures(outcome)
+
+    def metrics(self):
+        """Return {district: metrics} gathered from all shards."""
+        outcome = self._request(self._busy_shards(), ("metrics", None, (), None, ()),
+                                "metrics")
+        return {name: outcome.results[name] for name in self.owners if name in outcome.results}
+
+    def get_status(self, systems=SYSTEMS):
+        """Return {district: {system: status line}} in district order."""
+        outcome = self.broadcast("get_status", systems=systems)
+        self._print_failures(outcome)
+        return {name: outcome.results[name] for name in self.owners if name in outcome.results}
+
+    def turn_on_all(self):
+        """Switch on the street lights of every district."""
+        outcome = self.broadcast("turn_on_all", systems=("lighting",))
+        self._print_failures(outcome)
+        return outcome
+
+    def turn_off_all(self):
+        """Switch off the street lights of every district."""
+        outcome = self.broadcast("turn_off_all", systems=("lighting",))
+        self._print_failures(outcome)
+        return outcome
+
+    def set_brightness(self, level):
+        """Set the street light brightness of every district."""
+        outcome = self.broadcast("set_brightness", level, systems=("lighting",))
+        self._print_failures(outcome)
+        return outcome
+
+    def emergency_mode(self):
+        """Activate emergency protocols for every system of every district."""
+        outcome = self.broadcast("emergency_mode")
+        self._print_failures(outcome)
+        print(f"🚨 Emergency mode active in {len(outcome.results)} sharded districts")
+        return outcome
+
+    def generate_report(self):
+        """Print every district's subsystem reports in district order."""
+        outcome = self.broadcast("generate_report")
+        print("\n🧩 District Shard Reports:")
+        self._print_outputs(outcome)
+        return outcome
+
+    def close(self):
+        """Shut every district down and stop the worker processes."""
+        if not self._workers:
+            return
+        self.broadcast("shutdown")
+        self._request(range(self.processes), ("stop",), "stop")
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self._connections = []
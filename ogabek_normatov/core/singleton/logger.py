@@ -1,14 +1,205 @@
+import atexit
+import os
+import queue
+import sys
+import threading
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# INFO keeps the original "[LOG]" prefix
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "LOG", WARNING: "WARNING", ERROR: "ERROR"}
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 512
+FLUSH_INTERVAL = 0.1  # seconds the writer waits for more records
+
+class RotatingFile:
+    """
+    File sink that rotates to path.1 ... path.N once it reaches max_bytes
+    """
+    def __init__(self, path, max_bytes=1 << 20, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, text):
+        if self._file.tell() + len(text) > self.max_bytes and self._file.tell():
+            self._rotate()
+        self._file.write(text)
+
+    def _rotate(self):
+        self._file.close()
+        for number in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{number}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{number + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
 class Logger:
     """
     Singleton pattern
     Purpose: ensures only one logger instance exists in the system
+
+    Records are queued by the caller and written in batches by a background
+    thread. Records below the level are dropped before anything is
+    formatted, and "%"-style arguments are only applied by the writer.
+    When the queue is full the "drop" policy discards the record (counted
+    in ``dropped``) and the "block" policy waits for room.
     """
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Logger, cls).__new__(cls)
+            cls._instance._setup()
         return cls._instance
 
-    def log(self, message):
-        print(f"[LOG]: {message}")
+    def _setup(self):
+        self.level = INFO
+        self.policy = "drop"
+        self.batch_size = BATCH_SIZE
+        self.dropped = 0
+        self._sink = None  # None writes to the current sys.stdout
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._writer = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def configure(self, level=None, path=None, max_bytes=1 << 20, backups=3,
+                  queue_size=None, policy=None, batch_size=None):
+        """
+        Change the level, overflow policy, batch size or destination.
+        Passing ``path`` switches output to a rotating file; pending
+        records are written out first.
+        """
+        if policy not in (None, "drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.close()
+        if level is not None:
+            self.level = level
+        if policy is not None:
+            self.policy = policy
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if queue_size is not None:
+            self._queue = queue.Queue(queue_size)
+        if path is not None:
+            if self._sink is not None:
+                self._sink.close()
+            self._sink = RotatingFile(path, max_bytes, backups)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, message, *args, level=INFO):
+        if level < self.level:
+            return
+        if self._writer is None:
+            self._start()
+        record = (level, message, args)
+        if self.policy == "block":
+            self._queue.put(record)
+        else:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    def debug(self, message, *args):
+        self.log(message, *args, level=DEBUG)
+
+    def info(self, message, *args):
+        self.log(message, *args, level=INFO)
+
+    def warning(self, message, *args):
+        self.log(message, *args, level=WARNING)
+
+    def error(self, message, *args):
+        self.log(message, *args, level=ERROR)
+
+    def _start(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        records = self._queue
+        while True:
+            batch = [records.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(records.get(timeout=FLUSH_INTERVAL)
+                                 if len(batch) == 1 else records.get_nowait())
+            except queue.Empty:
+                pass
+            stop = None in batch
+            try:
+                lines = []
+                for record in batch:
+                    if record is None:
+                        continue
+                    try:
+                        lines.append(self._format(record))
+                    except Exception as error:
+                        self._report(f"could not format {record[1]!r}", error)
+                if lines:
+                    sink = self._sink if self._sink is not None else sys.stdout
+                    try:
+                        sink.write("".join(lines))
+                        sink.flush()
+                    except Exception as error:
+                        self._report(f"could not write {len(lines)} records", error)
+            finally:
+                for _ in batch:
+                    records.task_done()
+            if stop:
+                return
+
+    @staticmethod
+    def _report(problem, error):
+        """Writer errors go to stderr so the writer thread keeps running."""
+        try:
+            sys.stderr.write(f"[LOGGER]: {problem}: {type(error).__name__}: {error}\n")
+        except Exception:
+            pass
+
+    @staticmethod
+    def _format(record):
+        level, message, args = record
+        if args:
+            try:
+                message = message % args
+            except (TypeError, ValueError):
+                message = " ".join(map(str, (message,) + args))
+        return f"[{LEVEL_NAMES.get(level, level)}]: {message}\n"
+
+    def flush(self):
+        """Wait until every queued record has been written."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write pending records and stop the writer thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        if self._sink is not None:
+            self._sink.flush()
@@ -0,0 +1,83 @@
+"""
+City Snapshot - Structured city-wide metrics
+
+A CitySnapshot collects the metrics of every subsystem in one pass so
+monitoring can read numbers instead of parsing console reports. It
+serializes to a single JSON document or streams as NDJSON, one record
+per line, for scrapers that process records incrementally. In sharded
+mode the metrics of every shard district are included too.
+"""
+
+import json
+import time
+
+SNAPSHOT_TTL = 1.0  # seconds a collected snapshot is reused by default
+
+class CitySnapshot:
+    """Point-in-time metrics of the districts and all city systems."""
+
+    SECTIONS = ("lighting", "transport", "security", "energy")
+
+    def __init__(self, timestamp, districts, sections, shards=None):
+        self.timestamp = timestamp  # seconds since epoch
+        self.districts = districts  # list of dicts
+        self.sections = sections    # {section: metrics dict}
+        self.shards = shards or {}  # {district: shard metrics dict}
+
+    @classmethod
+    def collect(cls, controller):
+        """Gather metrics from the controller's districts and subsystems."""
+        districts = [{"name": district.name, "type": district.get_type(),
+                      "population": district.population}
+                     for district in controller.districts]
+        sections = {name: getattr(controller, name).metrics() for name in cls.SECTIONS}
+        shards = controller.shards.metrics() if controller.shards is not None else None
+        return cls(time.time(), districts, sections, shards)
+
+    def __getitem__(self, section):
+        return self.sections[section]
+
+    def age(self):
+        return time.time() - self.timestamp
+
+    def to_dict(self):
+        snapshot = {"timestamp": self.timestamp, "districts": self.districts}
+        snapshot.update(self.sections)
+        if self.shards:
+            snapshot["shards"] = self.shards
+        return snapshot
+
+    def to_json(self, **options):
+        """Serialize the whole snapshot as one JSON document."""
+        return json.dumps(self.to_dict(), **options)
+
+    def iter_ndjson(self):
+        """
+        Yield NDJSON lines: one "city" summary record, then one record per
+        district, lighting group, energy source and shard district.
+        """
+        summary = {"record": "city", "timestamp": self.timestamp,
+                   "districts": len(self.districts), "shard_districts": len(self.shards)}
+        for name, metrics in self.sections.items():
+            summary[name] = {key: value for key, value in metrics.items()
+                             if not isinstance(value, list)}
+        yield json.dumps(summary)
+
+        stamp = self.timestamp
+        for district in self.districts:
+            yield json.dumps({"record": "district", "timestamp": stamp, **district})
+        for group in self.sections["lighting"]["groups"]:
+            yield json.dumps({"record": "lighting_group", "timestamp": stamp, **group})
+        for source in self.sections["energy"]["sources"]:
+            yield json.dumps({"record": "energy_source", "timestamp": stamp, **source})
+        for name, metrics in self.shards.items():
+            record = {"record": "shard_district", "timestamp": stamp, "name": name}
+            for system, values in metrics.items():
+                record[system] = {key: value for key, value in values.items()
+                                  if not isinstance(value, list)}
+            yield json.dumps(record)
+
+    def write_ndjson(self, stream):
+        """Write the NDJSON records to a text stream."""
+        for line in self.iter_ndjson():
+            stream.write(line + "\n")
@@ -3,6 +3,8 @@ SmartCity System - Main Entry Point
 Demonstrates the use of multiple design patterns in a cohesive smart city management system.
 """
 
+import sys
+
 from core.controller import SmartCityController
 
 def print_menu():
@@ -30,6 +32,9 @@ def main():
     controller.initialize_city()
     print("✅ System initialized successfully!\n")
     
+    if "--startup-report" in sys.argv:
+        controller.startup_report()
+    
     while True:
         print_menu()
         choice = input("\nEnter your choice: ").strip()
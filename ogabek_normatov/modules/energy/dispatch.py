@@ -0,0 +1,148 @@
+"""
+Economic Dispatch
+
+Computes a least-cost allocation of city demand across the energy
+portfolio for one hour.
+
+MeritOrderSolver stacks sources by cost. ConstrainedDispatchSolver adds
+ramp limits, pooled battery storage and a carbon price. With a single
+balance constraint and per-unit bounds the dispatch LP is solved exactly
+by filling bound increments in cost order, so both solvers share the same
+core: units are sorted once, and every later solve for a new demand is a
+binary search over cumulative capacity.
+"""
+
+from bisect import bisect_left
+
+RAMP_RATES = {"coal": 0.3}  # max change per hour as a share of capacity
+STORAGE_VALUE = 0.07  # $/kWh opportunity cost of discharging stored energy
+
+class DispatchUnit:
+    """A dispatchable unit with output bounds and an effective cost."""
+
+    __slots__ = ("name", "source", "minimum", "maximum", "cost")
+
+    def __init__(self, name, source, minimum, maximum, cost):
+        self.name = name
+        self.source = source
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cost = cost
+
+class DispatchResult:
+    """Dispatch for one demand level."""
+
+    def __init__(self, solver, demand, filled, partial):
+        self.solver = solver
+        self.demand = demand
+        self._filled = filled    # units dispatched to their maximum
+        self._partial = partial  # extra output on the marginal unit
+
+        increments = solver.cumulative[filled - 1] if filled else 0.0
+        self.served = solver.minimum_total + increments + partial
+        self.shortfall = max(demand - self.served, 0.0)
+        self.surplus = max(self.served - demand, 0.0)
+
+        cost = solver.minimum_cost + (solver.cumulative_cost[filled - 1] if filled else 0.0)
+        marginal = solver.units[filled] if filled < len(solver.units) else None
+        if marginal is not None:
+            cost += partial * marginal.cost
+        self.total_cost = cost  # $ per hour
+        self.marginal_unit = marginal if partial > 0 else (
+            solver.units[filled - 1] if filled else None)
+        self.marginal_cost = self.marginal_unit.cost if self.marginal_unit else 0.0
+
+    def outputs(self):
+        """Yield (unit, output kW) for every unit in merit order."""
+        for position, unit in enumerate(self.solver.units):
+            if position < self._filled:
+                yield unit, unit.maximum
+            elif position == self._filled:
+                yield unit, unit.minimum + self._partial
+            else:
+                yield unit, unit.minimum
+
+    def output_by_source(self):
+        """Return {source: output kW} for every dispatched source."""
+        return {unit.source: output for unit, output in self.outputs()}
+
+class MeritOrderSolver:
+    """
+    Least-cost dispatch by merit order.
+    Every unit starts at its minimum; the remaining demand is filled from
+    the cheapest unit upwards.
+    """
+
+    def __init__(self, units):
+        self.units = sorted(units, key=lambda unit: unit.cost)
+        self.minimum_total = sum(unit.minimum for unit in self.units)
+        self.minimum_cost = sum(unit.minimum * unit.cost for unit in self.units)
+
+        self.cumulative = []
+        self.cumulative_cost = []
+        total = cost = 0.0
+        for unit in self.units:
+            increment = unit.maximum - unit.minimum
+            total += increment
+            cost += increment * unit.cost
+            self.cumulative.append(total)
+            self.cumulative_cost.append(cost)
+
+    @classmethod
+    def from_sources(cls, compiled_sources):
+        """Build a solver where every source may run from 0 to its rating."""
+        return cls([DispatchUnit(record.description, record.source, 0.0,
+                                 record.power, record.cost)
+                    for record in compiled_sources])
+
+    @property
+    def capacity(self):
+        return self.minimum_total + (self.cumulative[-1] if self.cumulative else 0.0)
+
+    def solve(self, demand):
+        """Dispatch ``demand`` kW. O(log n) once the solver is built."""
+        residual = demand - self.minimum_total
+        if residual <= 0 or not self.units:
+            return DispatchResult(self, demand, 0, 0.0)
+        if residual >= self.cumulative[-1]:
+            return DispatchResult(self, demand, len(self.units), 0.0)
+        filled = bisect_left(self.cumulative, residual)
+        before = self.cumulative[filled - 1] if filled else 0.0
+        return DispatchResult(self, demand, filled, residual - before)
+
+class ConstrainedDispatchSolver(MeritOrderSolver):
+    """
+    Dispatch with operating constraints:
+    - ramp limits around the previous hour's output (``RAMP_RATES``)
+    - pooled battery storage that can charge or discharge
+    - carbon price added to each unit's cost by its emission factor
+
+    Pass the previous hour's result as ``previous`` to chain hours.
+    """
+
+    def __init__(self, compiled_sources, carbon_price=0.0, previous=None,
+                 storage_level=0.0, storage_value=STORAGE_VALUE):
+        previous_outputs = previous.output_by_source() if previous is not None else {}
+        units = []
+        storage_capacity = 0.0
+        for record in compiled_sources:
+            minimum, maximum = 0.0, record.power
+            ramp = RAMP_RATES.get(record.kind)
+            if ramp is not None and record.source in previous_outputs:
+                last = previous_outputs[record.source]
+                minimum = max(minimum, last - ramp * record.power)
+                maximum = min(maximum, last + ramp * record.power)
+            cost = record.cost + carbon_price * record.emission_factor
+            units.append(DispatchUnit(record.description, record.source,
+                                      minimum, maximum, cost))
+            storage_capacity += record.storage_capacity
+
+        if storage_capacity > 0:
+            # Negative output is charging; one hour at full rate
+            units.append(DispatchUnit("Battery Storage", None,
+                                      -(storage_capacity - storage_level),
+                                      storage_level, storage_value))
+
+        self.carbon_price = carbon_price
+        self.storage_capacity = storage_capacity
+        super().__init__(units)
@@ -3,16 +3,30 @@ Energy Management System
 
 Design Pattern: DECORATOR
 Adds additional features to energy sources dynamically.
+
+A decorated source can be compiled into a flat CompiledSource record so
+that power, cost and description are computed once instead of recursing
+through the decorator stack on every call. Sources also carry structured
+tags (kind, renewable flag, emission factor, applied decorators) which
+EnergyManager indexes for filtering.
 """
 
 from abc import ABC, abstractmethod
 
+from modules.energy.dispatch import ConstrainedDispatchSolver, MeritOrderSolver
+from modules.energy.simulation import simulate_year
+
 class EnergySource(ABC):
     """
     Pattern: DECORATOR
     Abstract component for energy sources.
     """
     
+    kind = "generic"  # generation profile used by the annual simulation
+    renewable = False
+    emission_factor = 0.0  # kg CO2 per kWh
+    decorators = ()  # class names of applied decorators, innermost first
+    
     @abstractmethod
     def generate_power(self):
         """Return power generation amount in kW."""
@@ -27,10 +41,56 @@ class EnergySource(ABC):
     def get_description(self):
         """Return description of the energy source."""
         pass
+    
+    def compile(self):
+        """Flatten this source into a CompiledSource record."""
+        return CompiledSource(self, self.kind, self.generate_power(), self.get_cost(),
+                              self.get_description(), self.emission_factor,
+                              self.renewable)
+
+class CompiledSource:
+    """
+    Flat record of a (possibly decorated) energy source.
+    Decorator effects are folded into power and cost multipliers.
+    """
+    
+    __slots__ = ("source", "kind", "base_power", "base_cost", "power_multiplier",
+                 "cost_multiplier", "power", "cost", "description", "decorators",
+                 "storage_capacity", "emission_factor", "renewable")
+    
+    def __init__(self, source, kind, base_power, base_cost, description,
+                 emission_factor=0.0, renewable=False):
+        self.source = source
+        self.kind = kind
+        self.renewable = renewable
+        self.base_power = base_power
+        self.base_cost = base_cost
+        self.power_multiplier = 1.0
+        self.cost_multiplier = 1.0
+        self.power = base_power
+        self.cost = base_cost
+        self.description = description
+        self.decorators = ()
+        self.storage_capacity = 0  # kWh of battery storage attached
+        self.emission_factor = emission_factor
+    
+    def apply(self, decorator, label, power_factor=1.0, cost_factor=1.0):
+        """Fold one decorator layer into the record."""
+        self.source = decorator
+        self.power_multiplier *= power_factor
+        self.cost_multiplier *= cost_factor
+        self.power = self.base_power * self.power_multiplier
+        self.cost = self.base_cost * self.cost_multiplier
+        self.description = f"{self.description} + {label}"
+        self.decorators += (type(decorator).__name__,)
+        return self
 
 class CoalPowerPlant(EnergySource):
     """Concrete component - basic coal power plant."""
     
+    kind = "coal"
+    emission_factor = 0.95
+    
     def generate_power(self):
         return 1000  # kW
     
@@ -43,6 +103,9 @@ class CoalPowerPlant(EnergySource):
 class SolarPanel(EnergySource):
     """Concrete component - solar panel array."""
     
+    kind = "solar"
+    renewable = True
+    
     def generate_power(self):
         return 500  # kW
     
@@ -55,6 +118,9 @@ class SolarPanel(EnergySource):
 class WindTurbine(EnergySource):
     """Concrete component - wind turbine farm."""
     
+    kind = "wind"
+    renewable = True
+    
     def generate_power(self):
         return 800  # kW
     
@@ -75,6 +141,22 @@ class EnergySourceDecorator(EnergySource):
     def __init__(self, energy_source):
         self._energy_source = energy_source
     
+    @property
+    def kind(self):
+        return self._energy_source.kind
+    
+    @property
+    def renewable(self):
+        return self._energy_source.renewable
+    
+    @property
+    def emission_factor(self):
+        return self._energy_source.emission_factor
+    
+    @property
+    def decorators(self):
+        return self._energy_source.decorators + (type(self).__name__,)
+    
     def generate_power(self):
         return self._energy_source.generate_power()
     
@@ -83,6 +165,24 @@ class EnergySourceDecorator(EnergySource):
     
     def get_description(self):
         return self._energy_source.get_description()
+    
+    def compile(self):
+        record = self._energy_source.compile()
+        if self._changes_output():
+            # A subclass that alters output without its own compile() is
+            # flattened from its methods so the record matches its figures
+            flat = EnergySource.compile(self)
+            flat.decorators = record.decorators + (type(self).__name__,)
+            flat.storage_capacity = record.storage_capacity
+            return flat
+        record.source = self
+        record.decorators += (type(self).__name__,)
+        return record
+    
+    def _changes_output(self):
+        cls = type(self)
+        return any(getattr(cls, name) is not getattr(EnergySourceDecorator, name)
+                   for name in ("generate_power", "get_cost", "get_description"))
 
 class BatteryStorageDecorator(EnergySourceDecorator):
     """
@@ -94,14 +194,21 @@ class BatteryStorageDecorator(EnergySourceDecorator):
         super().__init__(energy_source)
         self.storage_capacity = 200  # kWh
         self.stored_energy = 0
+        # Add 10% more effective power due to storage buffering
+        self.power_boost = 1.1
     
     def generate_power(self):
         base_power = self._energy_source.generate_power()
-        # Add 10% more effective power due to storage buffering
-        return base_power * 1.1
+        return base_power * self.power_boost
     
     def get_description(self):
         return f"{self._energy_source.get_description()} + Battery Storage (200 kWh)"
+    
+    def compile(self):
+        record = self._energy_source.compile().apply(
+            self, "Battery Storage (200 kWh)", power_factor=self.power_boost)
+        record.storage_capacity += self.storage_capacity
+        return record
 
 class SmartGridDecorator(EnergySourceDecorator):
     """
@@ -112,18 +219,24 @@ class SmartGridDecorator(EnergySourceDecorator):
     def __init__(self, energy_source):
         super().__init__(energy_source)
         self.efficiency_boost = 1.15
+        # Smart grid reduces operational costs
+        self.cost_factor = 0.9
     
     def generate_power(self):
         base_power = self._energy_source.generate_power()
         return base_power * self.efficiency_boost
     
     def get_cost(self):
-        # Smart grid reduces operational costs
         base_cost = self._energy_source.get_cost()
-        return base_cost * 0.9
+        return base_cost * self.cost_factor
     
     def get_description(self):
         return f"{self._energy_source.get_description()} + Smart Grid (+15% efficiency)"
+    
+    def compile(self):
+        return self._energy_source.compile().apply(
+            self, "Smart Grid (+15% efficiency)",
+            power_factor=self.efficiency_boost, cost_factor=self.cost_factor)
 
 class CarbonCaptureDecorator(EnergySourceDecorator):
     """
@@ -134,17 +247,71 @@ class CarbonCaptureDecorator(EnergySourceDecorator):
     def __init__(self, energy_source):
         super().__init__(energy_source)
         self.capture_rate = 0.9  # 90% CO2 capture
+        # Carbon capture adds cost
+        self.cost_factor = 1.2
+    
+    @property
+    def emission_factor(self):
+        return self._energy_source.emission_factor * (1 - self.capture_rate)
     
     def get_cost(self):
-        # Carbon capture adds cost
         base_cost = self._energy_source.get_cost()
-        return base_cost * 1.2
+        return base_cost * self.cost_factor
     
     def get_description(self):
         return f"{self._energy_source.get_description()} + Carbon Capture (90% reduction)"
+    
+    def compile(self):
+        record = self._energy_source.compile().apply(
+            self, "Carbon Capture (90% reduction)", cost_factor=self.cost_factor)
+        record.emission_factor *= 1 - self.capture_rate
+        return record
 
 # ENERGY MANAGER
 
+class SourceIndex:
+    """
+    Compiled sources indexed by kind, renewable flag and decorator name.
+    Each bucket maps source -> CompiledSource in insertion order, so a
+    source object may be indexed only once.
+    """
+    
+    def __init__(self):
+        self.by_kind = {}
+        self.by_renewable = {True: {}, False: {}}
+        self.by_decorator = {}
+    
+    def add(self, record):
+        self.by_kind.setdefault(record.kind, {})[record.source] = record
+        self.by_renewable[bool(record.renewable)][record.source] = record
+        for decorator in record.decorators:
+            self.by_decorator.setdefault(decorator, {})[record.source] = record
+    
+    def __contains__(self, source):
+        return any(source in bucket for bucket in self.by_renewable.values())
+    
+    def remove(self, record):
+        self.by_kind[record.kind].pop(record.source, None)
+        self.by_renewable[bool(record.renewable)].pop(record.source, None)
+        for decorator in record.decorators:
+            self.by_decorator[decorator].pop(record.source, None)
+    
+    def find(self, kind=None, renewable=None, decorator=None):
+        """Return compiled records matching every given tag."""
+        buckets = []
+        if kind is not None:
+            buckets.append(self.by_kind.get(kind, {}))
+        if renewable is not None:
+            buckets.append(self.by_renewable[bool(renewable)])
+        if decorator is not None:
+            buckets.append(self.by_decorator.get(decorator, {}))
+        if not buckets:
+            buckets = [self.by_renewable[True], self.by_renewable[False]]
+            return [record for bucket in buckets for record in bucket.values()]
+        smallest = min(buckets, key=len)
+        return [record for source, record in smallest.items()
+                if all(source in bucket for bucket in buckets)]
+
 class EnergyManager:
     """Main energy management system using Decorator pattern."""
     
@@ -159,25 +326,127 @@ class EnergyManager:
         self._setup_enhanced_sources()
         
         self.total_consumption = 2500  # kW
+        self.demand_profile = None  # hourly kW from the district load model
         self.emergency_mode_active = False
     
+    @property
+    def enhanced_sources(self):
+        """Read-only view of the portfolio; change it via add_source/remove_source."""
+        return tuple(self._enhanced_sources)
+    
+    @enhanced_sources.setter
+    def enhanced_sources(self, sources):
+        sources = list(sources)
+        if len({id(source) for source in sources}) != len(sources):
+            raise ValueError("Energy source listed more than once")
+        self._enhanced_sources = sources
+        self._compiled = [source.compile() for source in self._enhanced_sources]
+        self.index = SourceIndex()
+        for record in self._compiled:
+            self.index.add(record)
+        self._invalidate()
+    
+    def _invalidate(self):
+        """Drop totals and the merit order after the portfolio changed."""
+        self._totals = None
+        self._merit_order = None
+    
+    def add_source(self, source):
+        """Add an energy source to the portfolio (each source object once)."""
+        if source in self.index:
+            raise ValueError(f"{source.get_description()} is already in the portfolio")
+        record = source.compile()
+        self._enhanced_sources.append(source)
+        self._compiled.append(record)
+        self.index.add(record)
+        self._invalidate()
+    
+    def remove_source(self, source):
+        """Remove an energy source from the portfolio."""
+        position = self._enhanced_sources.index(source)
+        del self._enhanced_sources[position]
+        record = self._compiled.pop(position)
+        self.index.remove(record)
+        self._invalidate()
+    
+    def compiled_sources(self):
+        """Return the portfolio as flat CompiledSource records."""
+        return self._compiled
+    
+    def find_sources(self, kind=None, renewable=None, decorator=None):
+        """Return sources matching the given tags via the source index."""
+        return [record.source for record in self.index.find(kind, renewable, decorator)]
+    
+    def totals(self):
+        """
+        Return cached portfolio totals as a dict with total_generation,
+        average_cost, source_count, renewable_count and renewable_generation.
+        """
+        if self._totals is None:
+            compiled = self._compiled
+            count = len(compiled)
+            renewables = self.index.by_renewable[True]
+            self._totals = {
+                "total_generation": sum(record.power for record in compiled),
+                "average_cost": (sum(record.cost for record in compiled) / count
+                                 if count else 0.0),
+                "source_count": count,
+                "renewable_count": len(renewables),
+                "renewable_generation": sum(record.power for record in renewables.values()),
+            }
+        return self._totals
+    
+    def dispatch(self, demand=None):
+        """
+        Least-cost merit-order dispatch of ``demand`` kW (defaults to the
+        current city consumption). The sorted merit order is cached, so
+        re-solving for a new consumption level is a binary search.
+        """
+        if self._merit_order is None:
+            self._merit_order = MeritOrderSolver.from_sources(self.compiled_sources())
+        if demand is None:
+            demand = self.total_consumption
+        return self._merit_order.solve(demand)
+    
+    def constrained_dispatch(self, demand=None, carbon_price=0.0, previous=None,
+                             storage_level=0.0):
+        """
+        Dispatch with ramp limits relative to ``previous``, pooled battery
+        storage and a carbon price in $/kg CO2.
+        """
+        solver = ConstrainedDispatchSolver(self.compiled_sources(), carbon_price,
+                                           previous, storage_level)
+        if demand is None:
+            demand = self.total_consumption
+        return solver.solve(demand)
+    
+    def simulate_year(self):
+        """
+        Simulate a year of hourly generation against city demand, using
+        the district demand profile when one is set.
+        Returns an AnnualSimulation with hourly balance, deficit hours,
+        cost and renewable share.
+        """
+        return simulate_year(self.compiled_sources(), self.total_consumption,
+                             self.demand_profile)
+    
     def _setup_enhanced_sources(self):
         """Setup enhanced energy sources using decorators."""
         # Solar with battery storage
         solar = SolarPanel()
         solar_with_battery = BatteryStorageDecorator(solar)
-        self.enhanced_sources.append(solar_with_battery)
+        self.add_source(solar_with_battery)
         
         # Wind with smart grid
         wind = WindTurbine()
         wind_with_grid = SmartGridDecorator(wind)
-        self.enhanced_sources.append(wind_with_grid)
+        self.add_source(wind_with_grid)
         
         # Coal with carbon capture and smart grid
         coal = CoalPowerPlant()
         coal_with_capture = CarbonCaptureDecorator(coal)
         coal_enhanced = SmartGridDecorator(coal_with_capture)
-        self.enhanced_sources.append(coal_enhanced)
+        self.add_source(coal_enhanced)
     
     def display_consumption(self):
         """Display current energy consumption and generation."""
@@ -185,7 +454,7 @@ class EnergyManager:
         print("-" * 50)
         print(f"Total City Consumption: {self.total_consumption} kW")
         
-        total_generation = sum(source.generate_power() for source in self.enhanced_sources)
+        total_generation = self.totals()["total_generation"]
         print(f"Total Generation: {total_generation:.0f} kW")
         
         balance = total_generation - self.total_consumption
@@ -195,20 +464,16 @@ class EnergyManager:
             print(f"⚠️  Energy Balance: {balance:.0f} kW (deficit)")
         
         print("\n📊 Active Energy Sources:")
-        for source in self.enhanced_sources:
-            power = source.generate_power()
-            cost = source.get_cost()
-            print(f"  • {source.get_description()}")
-            print(f"    Power: {power:.0f} kW | Cost: ${cost:.3f}/kWh")
+        for record in self.compiled_sources():
+            print(f"  • {record.description}")
+            print(f"    Power: {record.power:.0f} kW | Cost: ${record.cost:.3f}/kWh")
     
     def switch_source(self, source_type):
         """Switch to a different energy source."""
         if source_type == "renewable":
             print("\n🌱 Switching to renewable energy sources...")
             # Keep only solar and wind
-            self.enhanced_sources = [s for s in self.enhanced_sources 
-                                    if "Solar" in s.get_description() 
-                                    or "Wind" in s.get_description()]
+            self.enhanced_sources = self.find_sources(renewable=True)
             print("✅ Now running on 100% renewable energy")
         elif source_type == "efficient":
             print("\n⚡ Optimizing for maximum efficiency...")
@@ -216,25 +481,39 @@ class EnergyManager:
             print("✅ Efficiency mode activated")
     
     def optimize(self):
-        """Optimize energy distribution and usage."""
+        """Optimize energy distribution using least-cost dispatch."""
         print("\n🔧 OPTIMIZING ENERGY SYSTEM")
         
-        # Calculate current efficiency
-        total_gen = sum(s.generate_power() for s in self.enhanced_sources)
-        efficiency = (min(total_gen, self.total_consumption) / self.total_consumption) * 100
+        result = self.dispatch()
+        efficiency = (min(result.served, self.total_consumption) / self.total_consumption) * 100
         
         print(f"Current Efficiency: {efficiency:.1f}%")
+        print(f"Dispatch Cost: ${result.total_cost:.2f}/h")
+        if result.marginal_unit is not None:
+            print(f"Marginal Source: {result.marginal_unit.name} "
+                  f"(${result.marginal_cost:.3f}/kWh)")
         
-        if efficiency < 100:
+        if result.shortfall > 0:
             print("⚠️  Adding supplementary sources...")
-            # Add another renewable source
-            wind = WindTurbine()
-            wind_enhanced = SmartGridDecorator(wind)
-            self.enhanced_sources.append(wind_enhanced)
-            print(f"✅ Added: {wind_enhanced.get_description()}")
+            # Add renewable sources until the shortfall is covered
+            covered = 0
+            while covered < result.shortfall:
+                wind_enhanced = SmartGridDecorator(WindTurbine())
+                self.add_source(wind_enhanced)
+                covered += wind_enhanced.generate_power()
+                print(f"✅ Added: {wind_enhanced.get_description()}")
         else:
             print("✅ System operating at optimal efficiency")
     
+    def set_demand_profile(self, profile):
+        """
+        Drive consumption from an hourly demand profile in kW; the city
+        consumption becomes its mean (unless in emergency mode).
+        """
+        self.demand_profile = profile
+        if not self.emergency_mode_active:
+            self.total_consumption = round(sum(profile) / len(profile))
+    
     def emergency_mode(self):
         """Activate emergency power protocols."""
         self.emergency_mode_active = True
@@ -244,28 +523,39 @@ class EnergyManager:
     
     def get_status(self):
         """Get energy system status."""
-        total_gen = sum(s.generate_power() for s in self.enhanced_sources)
-        sources_count = len(self.enhanced_sources)
-        return f"{sources_count} sources active, {total_gen:.0f} kW total"
+        totals = self.totals()
+        return f"{totals['source_count']} sources active, {totals['total_generation']:.0f} kW total"
+    
+    def metrics(self):
+        """Return energy metrics for the city snapshot."""
+        totals = self.totals()
+        return {
+            "consumption_kw": self.total_consumption,
+            "generation_kw": totals["total_generation"],
+            "balance_kw": totals["total_generation"] - self.total_consumption,
+            "average_cost": totals["average_cost"],
+            "source_count": totals["source_count"],
+            "renewable_count": totals["renewable_count"],
+            "renewable_generation_kw": totals["renewable_generation"],
+            "emergency": self.emergency_mode_active,
+            "sources": [{"description": record.description, "kind": record.kind,
+                         "power_kw": record.power, "cost": record.cost}
+                        for record in self.compiled_sources()],
+        }
     
     def generate_report(self):
         """Generate comprehensive energy report."""
         print("\n⚡ ENERGY SYSTEM REPORT")
         print("-" * 50)
         
-        total_generation = sum(s.generate_power() for s in self.enhanced_sources)
-        avg_cost = sum(s.get_cost() for s in self.enhanced_sources) / len(self.enhanced_sources)
+        totals = self.totals()
         
-        print(f"Active Sources: {len(self.enhanced_sources)}")
-        print(f"Total Generation: {total_generation:.0f} kW")
-        print(f"Average Cost: ${avg_cost:.3f}/kWh")
+        print(f"Active Sources: {totals['source_count']}")
+        print(f"Total Generation: {totals['total_generation']:.0f} kW")
+        print(f"Average Cost: ${totals['average_cost']:.3f}/kWh")
         print(f"City Consumption: {self.total_consumption} kW")
         
-        renewable_count = sum(1 for s in self.enhanced_sources 
-                            if "Solar" in s.get_description() 
-                            or "Wind" in s.get_description())
-        
-        renewable_pct = (renewable_count / len(self.enhanced_sources)) * 100
+        renewable_pct = (totals['renewable_count'] / totals['source_count']) * 100
         print(f"Renewable Energy: {renewable_pct:.0f}%")
     
     def shutdown(self):
@@ -0,0 +1,172 @@
+"""
+Annual Energy Simulation
+
+Evaluates hourly generation and demand over a full year (8760 hours)
+for a portfolio of compiled energy sources. All sources of one kind share
+a normalised hourly profile, so variable output is built from one array
+per kind scaled by the summed rating of that kind instead of a loop per
+source per hour. Battery storage is pooled and covers deficits first;
+kinds without a profile (coal, generic) are dispatchable and only run,
+cheapest first, against the demand that is still unserved.
+"""
+
+import math
+from array import array
+
+HOURS_PER_YEAR = 8760
+RENEWABLE_KINDS = frozenset({"solar", "wind"})
+STORAGE_EFFICIENCY = 0.9  # round-trip efficiency of battery storage
+
+_profiles = {}
+
+def _solar_factor(hour_of_year):
+    """Irradiance curve: daylight half-sine scaled by season."""
+    day, hour = divmod(hour_of_year, 24)
+    if hour < 6 or hour >= 18:
+        return 0.0
+    daylight = math.sin(math.pi * (hour - 6 + 0.5) / 12)
+    season = 0.75 + 0.25 * math.cos(2 * math.pi * (day - 172) / 365)
+    return daylight * season
+
+def _wind_factor(hour_of_year):
+    """Capacity factor: seasonal and night-time peaks plus weather swings."""
+    day, hour = divmod(hour_of_year, 24)
+    factor = (0.35
+              + 0.12 * math.cos(2 * math.pi * (day - 15) / 365)
+              + 0.08 * math.cos(2 * math.pi * (hour - 3) / 24)
+              + 0.15 * math.sin(2 * math.pi * hour_of_year / 61)
+              * math.sin(2 * math.pi * hour_of_year / 173))
+    return min(max(factor, 0.0), 1.0)
+
+def _demand_factor(hour_of_year):
+    """Relative demand with an evening peak and a winter bump (mean 1.0)."""
+    day, hour = divmod(hour_of_year, 24)
+    return (1.0
+            + 0.2 * math.cos(2 * math.pi * (hour - 19) / 24)
+            + 0.05 * math.cos(2 * math.pi * (day - 15) / 365))
+
+_FACTORS = {
+    "solar": _solar_factor,
+    "wind": _wind_factor,
+    "demand": _demand_factor,
+}
+
+def profile(kind):
+    """
+    Return the hourly capacity factor profile for a source kind.
+    Kinds without a profile (coal, generic) get 1.0, their full rating.
+    Profiles are computed once and cached.
+    """
+    if kind not in _profiles:
+        factor = _FACTORS.get(kind)
+        if factor is None:
+            values = array("d", [1.0]) * HOURS_PER_YEAR
+        else:
+            values = array("d", map(factor, range(HOURS_PER_YEAR)))
+        _profiles[kind] = values
+    return _profiles[kind]
+
+def is_dispatchable(kind):
+    """Kinds without a generation profile follow demand instead."""
+    return kind not in _FACTORS
+
+class AnnualSimulation:
+    """Result of an hourly simulation over one year."""
+
+    def __init__(self, generation, demand, balance, storage_capacity,
+                 total_cost, renewable_generation):
+        self.generation = generation
+        self.demand = demand
+        self.balance = balance
+        self.storage_capacity = storage_capacity
+        self.total_generation = sum(generation)
+        self.total_demand = sum(demand)
+        self.total_cost = total_cost
+        self.deficit_hours = sum(1 for value in balance if value < 0)
+        self.unserved_energy = -sum(value for value in balance if value < 0)
+        self.renewable_share = (renewable_generation / self.total_generation
+                                if self.total_generation else 0.0)
+
+    def summary(self):
+        """Return a one-line summary of the simulated year."""
+        return (f"{self.total_generation / 1000:.0f} MWh generated, "
+                f"{self.deficit_hours} deficit hours, "
+                f"${self.total_cost:,.0f} cost, "
+                f"{self.renewable_share * 100:.0f}% renewable")
+
+def simulate_year(compiled_sources, average_demand, demand_profile=None):
+    """
+    Simulate a year of hourly operation.
+
+    Args:
+        compiled_sources: CompiledSource records of the portfolio
+        average_demand: mean city consumption in kW
+        demand_profile: optional hourly kW for one day, repeated over the
+            year instead of ``average_demand`` times the generic shape
+
+    Returns:
+        AnnualSimulation with hourly generation, demand and balance arrays
+    """
+    ratings = {}
+    weighted_costs = {}
+    storage_capacity = 0
+    for record in compiled_sources:
+        ratings[record.kind] = ratings.get(record.kind, 0.0) + record.power
+        weighted_costs[record.kind] = (weighted_costs.get(record.kind, 0.0)
+                                       + record.power * record.cost)
+        storage_capacity += record.storage_capacity
+
+    if demand_profile:
+        hours = len(demand_profile)
+        demand = [demand_profile[hour % hours] for hour in range(HOURS_PER_YEAR)]
+    else:
+        demand = [average_demand * factor for factor in profile("demand")]
+
+    generation = [0.0] * HOURS_PER_YEAR
+    total_cost = 0.0
+    renewable_generation = 0.0
+    dispatchable = []
+    for kind, rating in ratings.items():
+        if is_dispatchable(kind):
+            dispatchable.append(kind)
+            continue
+        factors = profile(kind)
+        generation = [total + rating * factor for total, factor in zip(generation, factors)]
+        full_load_hours = sum(factors)
+        total_cost += weighted_costs[kind] * full_load_hours
+        if kind in RENEWABLE_KINDS:
+            renewable_generation += rating * full_load_hours
+    # Merit order: cheapest average cost per kWh first
+    dispatchable.sort(key=lambda kind: weighted_costs[kind] / ratings[kind]
+                      if ratings[kind] else 0.0)
+    dispatched = dict.fromkeys(dispatchable, 0.0)
+
+    # Pooled storage charges from surplus and discharges into deficit hours;
+    # dispatchable kinds then cover what is still missing
+    balance = array("d", [0.0]) * HOURS_PER_YEAR
+    stored = 0.0
+    for hour, (generated, needed) in enumerate(zip(generation, demand)):
+        surplus = generated - needed
+        if surplus > 0:
+            charge = min(surplus, (storage_capacity - stored) / STORAGE_EFFICIENCY)
+            stored += charge * STORAGE_EFFICIENCY
+            surplus -= charge
+        elif stored > 0:
+            discharge = min(-surplus, stored)
+            stored -= discharge
+            surplus += discharge
+        for kind in dispatchable:
+            if surplus >= 0:
+                break
+            output = min(-surplus, ratings[kind])
+            dispatched[kind] += output
+            generation[hour] += output
+            surplus += output
+        balance[hour] = surplus
+
+    for kind, energy in dispatched.items():
+        if ratings[kind]:
+            total_cost += weighted_costs[kind] / ratings[kind] * energy
+
+    return AnnualSimulation(array("d", generation), array("d", demand), balance,
+                            storage_capacity, total_cost, renewable_generation)
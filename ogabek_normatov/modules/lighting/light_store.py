@@ -0,0 +1,141 @@
+"""
+Light Store - Columnar state for city street lights
+
+Keeps the state of every light in flat columns instead of one Python
+object per pole, so operations on a block of lights become a single
+slice assignment.
+"""
+
+from array import array
+from bisect import bisect_right
+
+
+class LightStore:
+    """
+    Struct-of-arrays storage for street light state.
+
+    Each light occupies one row: its id in ``light_ids`` and its state in
+    the ``is_on`` byte column and the ``brightness`` double column. Lights that belong to
+    the same district are allocated as one contiguous block, and ``rows``
+    maps every light id to its row.
+
+    Components that keep aggregates over a block register themselves as
+    its owner. Every write reports the change in on-count and summed
+    brightness to the owners of the rows it touched, so their running
+    totals stay current without rescanning the block.
+    """
+
+    def __init__(self):
+        self.light_ids = []
+        self.rows = {}
+        self.is_on = bytearray()
+        self.brightness = array("d")  # levels may be fractional (50.5%)
+        self._owner_starts = []
+        self._owners = []
+
+    def __len__(self):
+        return len(self.light_ids)
+
+    def allocate(self, light_ids):
+        """
+        Append a contiguous block of lights (all OFF).
+
+        Returns:
+            (start, stop) row range of the new block
+
+        Raises:
+            ValueError: if an id is already in the store or repeated
+        """
+        light_ids = list(light_ids)
+        self.check_new(light_ids)
+        start = len(self.light_ids)
+        self.light_ids.extend(light_ids)
+        count = len(self.light_ids) - start
+        for row in range(start, start + count):
+            self.rows[self.light_ids[row]] = row
+        self.is_on.extend(bytes(count))
+        self.brightness.extend(array("d", bytes(count * 8)))
+        return start, start + count
+
+    def check_new(self, light_ids):
+        """Raise ValueError unless every id is unused and listed once."""
+        seen = set()
+        for light_id in light_ids:
+            if light_id in self.rows or light_id in seen:
+                raise ValueError(f"Light id {light_id} already exists")
+            seen.add(light_id)
+
+    def attach(self, owner, start):
+        """Register ``owner`` for the block starting at row ``start``."""
+        position = bisect_right(self._owner_starts, start)
+        self._owner_starts.insert(position, start)
+        self._owners.insert(position, owner)
+
+    def detach(self, owner):
+        """Unregister ``owner`` from the block it was attached to."""
+        position = self._owners.index(owner)
+        del self._owners[position]
+        del self._owner_starts[position]
+
+    def set(self, index, is_on, brightness):
+        """Set the state of a single light."""
+        self.set_rows((index,), is_on, brightness)
+
+    def set_rows(self, rows, is_on, brightness):
+        """Set the same state on an arbitrary collection of rows."""
+        on_flag = 1 if is_on else 0
+        brightness = float(brightness)
+        deltas = {}  # owner position -> [on delta, brightness delta]
+        for row in rows:
+            position = self._owner_position(row)
+            delta = deltas.get(position)
+            if delta is None:
+                delta = deltas[position] = [0, 0.0]
+            delta[0] += on_flag - self.is_on[row]
+            delta[1] += brightness - self.brightness[row]
+            self.is_on[row] = on_flag
+            self.brightness[row] = brightness
+        for position, (on_delta, brightness_delta) in deltas.items():
+            if position >= 0 and (on_delta or brightness_delta):
+                self._owners[position].apply(on_delta, brightness_delta)
+
+    def fill(self, start, stop, is_on, brightness):
+        """Set the same state on every light in [start, stop)."""
+        count = stop - start
+        if count <= 0:
+            return
+        # Build both columns' values first so a bad level changes nothing
+        levels = array("d", (brightness,)) * count
+        on_flag = 1 if is_on else 0
+        changes = []
+        position = max(self._owner_position(start), 0)
+        while position < len(self._owners) and self._owner_starts[position] < stop:
+            low = max(start, self._owner_starts[position])
+            high = min(stop, self._owner_stop(position))
+            if low < high:
+                changes.append((self._owners[position],
+                                on_flag * (high - low) - self.count_on(low, high),
+                                brightness * (high - low) - self.sum_brightness(low, high)))
+            position += 1
+        self.is_on[start:stop] = bytes((on_flag,)) * count
+        self.brightness[start:stop] = levels
+        for owner, on_delta, brightness_delta in changes:
+            if on_delta or brightness_delta:
+                owner.apply(on_delta, brightness_delta)
+
+    def count_on(self, start, stop):
+        """Number of lights switched on in [start, stop)."""
+        return self.is_on.count(1, start, stop)
+
+    def sum_brightness(self, start, stop):
+        """Summed brightness of the lights in [start, stop)."""
+        return sum(self.brightness[start:stop])
+
+    def _owner_position(self, row):
+        """Position in the owner list of the block holding ``row`` (-1 if none)."""
+        return bisect_right(self._owner_starts, row) - 1
+
+    def _owner_stop(self, position):
+        if position + 1 < len(self._owner_starts):
+            return self._owner_starts[position + 1]
+        return len(self.light_ids)
@@ -3,16 +3,65 @@ Lighting System - Manages city lighting infrastructure
 
 Design Pattern: COMPOSITE
 Allows treating individual lights and groups of lights uniformly.
+
+Light state lives in a columnar LightStore; StreetLight is a thin view
+onto one row of it, and groups covering a contiguous block of rows are
+updated with a single slice assignment.
 """
 
 from abc import ABC, abstractmethod
 
+from modules.lighting.light_store import LightStore
+
+WATTS_PER_LIGHT = 150  # LED street light at full brightness
+
+# (path, id prefix, light count) of the districts a new LightingSystem gets
+DEFAULT_DISTRICTS = (("Downtown", "DT", 5), ("Residential", "RES", 8),
+                     ("Industrial", "IND", 3))
+
+_UNKNOWN = object()  # sentinel for a span that has not been computed yet
+
 class LightComponent(ABC):
     """
     Pattern: COMPOSITE
     Abstract component for both individual lights and light groups.
+    
+    Every component exposes aggregates (light count, lights on, summed
+    brightness). Blocks keep running totals that every store write
+    updates, and groups add the same change to their cached sums, so a
+    write costs O(depth) and a status read O(1).
     """
     
+    __slots__ = ()
+    
+    @property
+    def span(self):
+        """(store, start, stop) if all lights are contiguous in one store."""
+        return None
+    
+    @abstractmethod
+    def aggregates(self):
+        """Return (light_count, on_count, brightness_sum)."""
+        pass
+    
+    def apply(self, on_delta, brightness_delta):
+        """Add a change in on-count and brightness to the totals up to the root."""
+        if self.parent is not None:
+            self.parent.apply(on_delta, brightness_delta)
+    
+    def light_count(self):
+        return self.aggregates()[0]
+    
+    def on_count(self):
+        return self.aggregates()[1]
+    
+    def brightness_sum(self):
+        return self.aggregates()[2]
+    
+    def wattage(self):
+        """Estimated draw in watts at the current brightness levels."""
+        return self.aggregates()[2] * WATTS_PER_LIGHT / 100
+    
     @abstractmethod
     def turn_on(self):
         pass
@@ -30,25 +79,50 @@ class LightComponent(ABC):
         pass
 
 class StreetLight(LightComponent):
-    """Leaf component - individual street light."""
+    """
+    Leaf component - individual street light.
+    Thin view onto one row of a LightStore; a light created on its own
+    gets a private single-row store.
+    """
+    
+    __slots__ = ("light_id", "parent", "_store", "_index")
     
-    def __init__(self, light_id):
+    def __init__(self, light_id, store=None, index=None):
         self.light_id = light_id
-        self.is_on = False
-        self.brightness = 0
+        self.parent = None
+        if store is None:
+            store = LightStore()
+            index, _ = store.allocate([light_id])
+            store.attach(self, index)
+        self._store = store
+        self._index = index
+    
+    @property
+    def is_on(self):
+        return self._store.is_on[self._index] == 1
+    
+    @property
+    def brightness(self):
+        level = self._store.brightness[self._index]
+        return int(level) if level.is_integer() else level
+    
+    @property
+    def span(self):
+        return self._store, self._index, self._index + 1
+    
+    def aggregates(self):
+        brightness = self._store.brightness[self._index]
+        return 1, self._store.is_on[self._index], brightness
     
     def turn_on(self):
-        self.is_on = True
-        self.brightness = 100
+        self._store.set(self._index, True, 100)
     
     def turn_off(self):
-        self.is_on = False
-        self.brightness = 0
+        self._store.set(self._index, False, 0)
     
     def set_brightness(self, level):
         if 0 <= level <= 100:
-            self.brightness = level
-            self.is_on = level > 0
+            self._store.set(self._index, level > 0, level)
     
     def get_status(self):
         status = "ON" if self.is_on else "OFF"
@@ -63,59 +137,322 @@ class LightGroup(LightComponent):
     def __init__(self, name):
         self.name = name
         self.children = []
+        self.parent = None
+        self._aggregates = None
+        self._span = _UNKNOWN
     
     def add(self, component):
+        component.parent = self
         self.children.append(component)
+        self._structure_changed()
     
     def remove(self, component):
         self.children.remove(component)
+        component.parent = None
+        self._structure_changed()
+    
+    def _structure_changed(self):
+        """Drop cached spans and aggregates after children were added or removed."""
+        group = self
+        while group is not None:
+            group._span = _UNKNOWN
+            group._aggregates = None
+            group = group.parent
+    
+    def apply(self, on_delta, brightness_delta):
+        # An uncached group's ancestors are uncached too, so stop early
+        if self._aggregates is None:
+            return
+        count, on, brightness = self._aggregates
+        self._aggregates = (count, on + on_delta, brightness + brightness_delta)
+        if self.parent is not None:
+            self.parent.apply(on_delta, brightness_delta)
+    
+    def aggregates(self):
+        if self._aggregates is None:
+            count = on = brightness = 0
+            for child in self.children:
+                child_count, child_on, child_brightness = child.aggregates()
+                count += child_count
+                on += child_on
+                brightness += child_brightness
+            self._aggregates = (count, on, brightness)
+        return self._aggregates
+    
+    @property
+    def span(self):
+        if self._span is _UNKNOWN:
+            self._span = self._compute_span()
+        return self._span
+    
+    def _compute_span(self):
+        store = start = stop = None
+        for child in self.children:
+            child_span = child.span
+            if child_span is None:
+                return None
+            if store is None:
+                store, start, stop = child_span
+            elif child_span[0] is store and child_span[1] == stop:
+                stop = child_span[2]
+            else:
+                return None
+        if store is None:
+            return None
+        return store, start, stop
     
     def turn_on(self):
+        span = self.span
+        if span is not None:
+            span[0].fill(span[1], span[2], True, 100)
+            return
         for child in self.children:
             child.turn_on()
     
     def turn_off(self):
+        span = self.span
+        if span is not None:
+            span[0].fill(span[1], span[2], False, 0)
+            return
         for child in self.children:
             child.turn_off()
     
     def set_brightness(self, level):
+        if not 0 <= level <= 100:
+            return
+        span = self.span
+        if span is not None:
+            span[0].fill(span[1], span[2], level > 0, level)
+            return
         for child in self.children:
             child.set_brightness(level)
     
     def get_status(self):
-        statuses = [child.get_status() for child in self.children]
-        return f"{self.name}: {len(self.children)} lights managed"
+        count, on, _ = self.aggregates()
+        return (f"{self.name}: {count} lights managed "
+                f"({on} ON, {self.wattage() / 1000:.1f} kW)")
+
+class LightBlock(LightComponent):
+    """
+    Composite component - a contiguous block of lights in a LightStore.
+    Holds no per-light objects; StreetLight views are created on demand.
+    """
+    
+    def __init__(self, name, store, start, stop):
+        self.name = name
+        self.store = store
+        self.start = start
+        self.stop = stop
+        self.parent = None
+        self._on = store.count_on(start, stop)
+        self._brightness = store.sum_brightness(start, stop)
+        store.attach(self, start)
+    
+    def __len__(self):
+        return self.stop - self.start
+    
+    @property
+    def span(self):
+        return self.store, self.start, self.stop
+    
+    @property
+    def children(self):
+        """StreetLight views for every light in the block."""
+        return [self.light(i) for i in range(len(self))]
+    
+    def light(self, offset):
+        """Return a StreetLight view for the light at ``offset`` in the block."""
+        index = self.start + offset
+        if not self.start <= index < self.stop:
+            raise IndexError("light offset out of range")
+        return StreetLight(self.store.light_ids[index], self.store, index)
+    
+    def apply(self, on_delta, brightness_delta):
+        self._on += on_delta
+        self._brightness += brightness_delta
+        if self.parent is not None:
+            self.parent.apply(on_delta, brightness_delta)
+    
+    def aggregates(self):
+        return len(self), self._on, self._brightness
+    
+    def turn_on(self):
+        self.store.fill(self.start, self.stop, True, 100)
+    
+    def turn_off(self):
+        self.store.fill(self.start, self.stop, False, 0)
+    
+    def set_brightness(self, level):
+        if 0 <= level <= 100:
+            self.store.fill(self.start, self.stop, level > 0, level)
+    
+    def get_status(self):
+        count, on, _ = self.aggregates()
+        return (f"{self.name}: {count} lights managed "
+                f"({on} ON, {self.wattage() / 1000:.1f} kW)")
 
 class LightingSystem:
     """Main lighting system controller using Composite pattern."""
     
-    def __init__(self):
+    def __init__(self, districts=DEFAULT_DISTRICTS):
+        # Columnar state shared by every light in the city
+        self.store = LightStore()
+        
         # Create root composite
         self.root = LightGroup("City Lighting")
         self.emergency_active = False
         
+        # Path index: "District/Group" -> component
+        self.paths = {"": self.root}
+        
         # Create district groups
-        self._setup_districts()
+        self._setup_districts(districts)
     
-    def _setup_districts(self):
+    def _setup_districts(self, districts):
         """Initialize lighting structure with districts and lights."""
-        # Downtown district
-        downtown = LightGroup("Downtown")
-        for i in range(1, 6):
-            downtown.add(StreetLight(f"DT-{i}"))
-        self.root.add(downtown)
+        for path, prefix, count in districts:
+            self.add_district(path, prefix, count)
+    
+    def add_district(self, path, prefix, count):
+        """
+        Add a district of ``count`` lights named ``{prefix}-1`` onwards.
+        The lights are allocated as one contiguous block in the store.
+        
+        ``path`` may be nested ("Residential/North"); missing parent
+        groups are created on the way. Light ids must be new to the city.
+        """
+        light_ids = [f"{prefix}-{i}" for i in range(1, count + 1)]
+        self.store.check_new(light_ids)
+        parent_path, _, name = path.rpartition("/")
+        parent = self._get_or_create_group(parent_path)
+        start, stop = self.store.allocate(light_ids)
+        district = LightBlock(name, self.store, start, stop)
+        parent.add(district)
+        self.paths[path] = district
+        return district
+    
+    def split_block(self, path, parts):
+        """
+        Split the block at ``path`` into named sub-blocks, keeping its rows.
+        
+        ``parts`` is a list of (name, light_count) pairs covering the block
+        in order, e.g. split_block("Residential", [("North", 4), ("South", 4)])
+        makes "Residential/North" and "Residential/South" addressable.
+        
+        Returns:
+            The LightGroup that replaces the block
+        """
+        block = self.paths.get(path)
+        if not isinstance(block, LightBlock):
+            raise ValueError(f"'{path}' is not a block of lights")
+        if sum(count for _, count in parts) != len(block):
+            raise ValueError(f"Parts must cover all {len(block)} lights of '{path}'")
+        if len({name for name, _ in parts}) != len(parts):
+            raise ValueError("Part names must be unique")
         
-        # Residential district
-        residential = LightGroup("Residential")
-        for i in range(1, 9):
-            residential.add(StreetLight(f"RES-{i}"))
-        self.root.add(residential)
+        parent = block.parent
+        group = LightGroup(block.name)
+        group.parent = parent
+        parent.children[parent.children.index(block)] = group
+        block.parent = None
+        self.store.detach(block)
+        self.paths[path] = group
         
-        # Industrial district
-        industrial = LightGroup("Industrial")
-        for i in range(1, 4):
-            industrial.add(StreetLight(f"IND-{i}"))
-        self.root.add(industrial)
+        start = block.start
+        for name, count in parts:
+            part = LightBlock(name, self.store, start, start + count)
+            group.add(part)
+            self.paths[f"{path}/{name}"] = part
+            start += count
+        parent._structure_changed()
+        return group
+    
+    def _get_or_create_group(self, path):
+        """Return the group at ``path``, creating missing groups."""
+        group = self.paths.get(path)
+        if group is None:
+            parent_path, _, name = path.rpartition("/")
+            parent = self._get_or_create_group(parent_path)
+            group = LightGroup(name)
+            parent.add(group)
+            self.paths[path] = group
+        if not isinstance(group, LightGroup):
+            raise ValueError(f"'{path}' is a block of lights, not a group")
+        return group
+    
+    def get_light(self, light_id):
+        """Return a StreetLight view for ``light_id`` or None if unknown."""
+        row = self.store.rows.get(light_id)
+        if row is None:
+            return None
+        return StreetLight(light_id, self.store, row)
+    
+    def find(self, path):
+        """
+        Return the component at ``path`` or None if unknown.
+        The last path segment may be a light id ("Downtown/DT-3").
+        """
+        component = self.paths.get(path)
+        if component is None:
+            parent_path, _, light_id = path.rpartition("/")
+            parent = self.paths.get(parent_path)
+            row = self.store.rows.get(light_id)
+            if row is not None and parent is not None and self._holds(parent, row):
+                component = StreetLight(light_id, self.store, row)
+        return component
+    
+    def _holds(self, component, row):
+        """Whether store ``row`` is one of the lights under ``component``."""
+        span = component.span
+        if span is not None:
+            return span[0] is self.store and span[1] <= row < span[2]
+        # Not contiguous: only groups lack a span, so check their children
+        return any(self._holds(child, row) for child in component.children)
+    
+    def _rows(self, light_ids):
+        rows = self.store.rows
+        return [rows[light_id] for light_id in light_ids if light_id in rows]
+    
+    def turn_on_lights(self, light_ids):
+        """Turn on the given lights. Returns the number of lights found."""
+        rows = self._rows(light_ids)
+        self.store.set_rows(rows, True, 100)
+        return len(rows)
+    
+    def turn_off_lights(self, light_ids):
+        """Turn off the given lights. Returns the number of lights found."""
+        rows = self._rows(light_ids)
+        self.store.set_rows(rows, False, 0)
+        return len(rows)
+    
+    def set_lights_brightness(self, light_ids, level):
+        """Set brightness on the given lights. Returns the number of lights found."""
+        if not 0 <= level <= 100:
+            return 0
+        rows = self._rows(light_ids)
+        self.store.set_rows(rows, level > 0, level)
+        return len(rows)
+    
+    def set_brightness_at(self, path, level):
+        """Set brightness on everything under ``path`` ("Residential/North")."""
+        component = self.find(path)
+        if component is None:
+            raise KeyError(f"Unknown lighting path: {path}")
+        component.set_brightness(level)
+        return component.light_count()
+    
+    def set_range_brightness(self, first_id, last_id, level):
+        """
+        Set brightness on the contiguous block of lights from ``first_id``
+        to ``last_id`` inclusive ("RES-3" .. "RES-7").
+        """
+        start = self.store.rows[first_id]
+        stop = self.store.rows[last_id] + 1
+        if stop <= start:
+            raise ValueError(f"{last_id} comes before {first_id}")
+        if 0 <= level <= 100:
+            self.store.fill(start, stop, level > 0, level)
+        return stop - start
     
     def turn_on_all(self):
         """Turn on all city lights."""
@@ -136,6 +473,20 @@ class LightingSystem:
         """Get overall lighting status."""
         return self.root.get_status()
     
+    def metrics(self):
+        """Return lighting metrics for the city snapshot."""
+        count, on, brightness = self.root.aggregates()
+        return {
+            "lights": count,
+            "on": on,
+            "wattage_kw": self.root.wattage() / 1000,
+            "average_brightness": brightness / count if count else 0.0,
+            "emergency": self.emergency_active,
+            "groups": [{"name": group.name, "lights": group.light_count(),
+                        "on": group.on_count(), "wattage_kw": group.wattage() / 1000}
+                       for group in self.root.children],
+        }
+    
     def emergency_mode(self):
         """Activate emergency lighting (full brightness)."""
         self.emergency_active = True
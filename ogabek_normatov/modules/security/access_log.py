@@ -0,0 +1,163 @@
+"""
+Camera Access Log - Bounded ring buffer with batched persistence
+
+Accesses are recorded as compact (timestamp, action code, camera index)
+rows in fixed-size columns; nothing is formatted until the log is read.
+An optional background flusher appends new rows in batches to a binary
+segment file that can be queried by camera and time range batch by batch.
+
+Segment file layout, repeated per batch (little-endian):
+    header:  count (uint32), first timestamp (int64), last timestamp (int64)
+    columns: timestamps (int64 x count), cameras (uint32 x count),
+             actions (uint8 x count)
+"""
+
+from array import array
+import os
+import struct
+import threading
+import time
+
+ACTIONS = ("feed_requested", "recording_started")
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+DEFAULT_CAPACITY = 4096
+FLUSH_INTERVAL = 1.0  # seconds between background flushes
+
+_HEADER = struct.Struct("<Iqq")
+
+class AccessLog:
+    """
+    Fixed-size ring buffer of camera access records.
+    Cameras register once and are referred to by their index afterwards.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, path=None, flush_interval=FLUSH_INTERVAL):
+        self.capacity = capacity
+        self.timestamps = array("q", [0]) * capacity  # ms since epoch
+        self.cameras = array("I", [0]) * capacity
+        self.actions = array("B", [0]) * capacity
+        self.camera_ids = []
+        self.path = path
+        self.dropped = 0  # records overwritten before they were flushed
+
+        self._written = 0  # total records ever appended
+        self._flushed = 0  # total records persisted to the segment file
+        self._lock = threading.Lock()        # guards the ring
+        self._flush_lock = threading.Lock()  # guards the segment file and _flushed
+        self._stop = threading.Event()
+        self._flusher = None
+        if path is not None:
+            self._flusher = threading.Thread(target=self._run_flusher, args=(flush_interval,),
+                                             daemon=True)
+            self._flusher.start()
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+    def register(self, camera_id):
+        """Register a camera and return its index."""
+        self.camera_ids.append(camera_id)
+        return len(self.camera_ids) - 1
+
+    def append(self, camera_index, action):
+        """Record one access. O(1), no formatting."""
+        timestamp = time.time_ns() // 1_000_000
+        with self._lock:
+            slot = self._written % self.capacity
+            self.timestamps[slot] = timestamp
+            self.cameras[slot] = camera_index
+            self.actions[slot] = ACTION_CODES[action]
+            self._written += 1
+
+    def _rows(self, first, last):
+        """Yield ring rows for absolute record numbers [first, last)."""
+        first = max(first, self._written - self.capacity)
+        for number in range(first, last):
+            slot = number % self.capacity
+            yield self.timestamps[slot], self.cameras[slot], self.actions[slot]
+
+    def entries(self, camera_index):
+        """Formatted "HH:MM:SS - action" lines for one camera still in the ring."""
+        with self._lock:
+            rows = [row for row in self._rows(0, self._written) if row[1] == camera_index]
+        return [f"{time.strftime('%H:%M:%S', time.localtime(stamp / 1000))} - "
+                f"{ACTIONS[action]}" for stamp, _, action in rows]
+
+    def flush(self):
+        """Append all unflushed records to the segment file as one batch."""
+        if self.path is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                oldest = self._written - self.capacity
+                if self._flushed < oldest:
+                    self.dropped += oldest - self._flushed
+                    self._flushed = oldest
+                rows = list(self._rows(self._flushed, self._written))
+                written = self._written
+            if rows:
+                timestamps, cameras, actions = zip(*rows)
+                with open(self.path, "ab") as segment:
+                    segment.write(_HEADER.pack(len(rows), min(timestamps), max(timestamps)))
+                    segment.write(array("q", timestamps).tobytes())
+                    segment.write(array("I", cameras).tobytes())
+                    segment.write(array("B", actions).tobytes())
+            self._flushed = written
+        return len(rows)
+
+    def _run_flusher(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def close(self):
+        """Stop the background flusher and persist the remaining records."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def query(self, camera_id=None, start=None, end=None):
+        """
+        Yield (timestamp_ms, camera_id, action) for records matching the
+        camera and the inclusive [start, end] ms range. Persisted batches
+        outside the range are skipped by their header without being read.
+        """
+        camera_index = self.camera_ids.index(camera_id) if camera_id is not None else None
+        low = start if start is not None else -(1 << 63)
+        high = end if end is not None else (1 << 63) - 1
+
+        def matches(stamp, camera):
+            return low <= stamp <= high and (camera_index is None or camera == camera_index)
+
+        # Snapshot how far the file goes so a concurrent flush is not read twice
+        with self._flush_lock:
+            first_unflushed = self._flushed
+            persisted = (os.path.getsize(self.path)
+                         if self.path is not None and os.path.exists(self.path) else 0)
+
+        if persisted:
+            with open(self.path, "rb") as segment:
+                while segment.tell() < persisted:
+                    header = segment.read(_HEADER.size)
+                    if len(header) < _HEADER.size:
+                        break
+                    count, first, last = _HEADER.unpack(header)
+                    size = count * (8 + 4 + 1)
+                    if last < low or first > high:
+                        segment.seek(size, 1)
+                        continue
+                    timestamps = array("q")
+                    timestamps.frombytes(segment.read(8 * count))
+                    cameras = array("I")
+                    cameras.frombytes(segment.read(4 * count))
+                    actions = segment.read(count)
+                    for stamp, camera, action in zip(timestamps, cameras, actions):
+                        if matches(stamp, camera):
+                            yield stamp, self.camera_ids[camera], ACTIONS[action]
+
+        with self._lock:
+            rows = list(self._rows(first_unflushed, self._written))
+        for stamp, camera, action in rows:
+            if matches(stamp, camera):
+                yield stamp, self.camera_ids[camera], ACTIONS[action]
@@ -0,0 +1,108 @@
+"""
+Camera Location Index - Fast alarm-to-camera matching
+
+Cameras are indexed two ways:
+- by name: an inverted index from lowercase location words to cameras.
+  A query matches a camera when every query word is a prefix of one of
+  the camera's location words ("park" -> "Park Entrance"); a query
+  without words matches every camera. Results of the MATCH_CACHE_SIZE
+  most recent queries are cached until the next camera is added.
+- by position: an optional (x, y) in metres placed in a uniform grid, so
+  "cameras within 300 m" only inspects the grid cells the circle covers.
+"""
+
+from bisect import bisect_left
+from collections import OrderedDict
+import math
+import re
+
+GRID_CELL_M = 300.0  # grid cell edge, matched to the default alarm radius
+MATCH_CACHE_SIZE = 256  # cached match() queries, least recently used evicted
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text):
+    """Split a location name into lowercase words."""
+    return _WORD.findall(text.lower())
+
+class CameraIndex:
+    """Inverted word index and spatial grid over camera positions in a list."""
+
+    def __init__(self, cell_size=GRID_CELL_M):
+        self.cell_size = cell_size
+        self._postings = {}  # word -> list of camera positions in insertion order
+        self._words = []     # sorted distinct words, for prefix lookups
+        self._cells = {}     # (cell x, cell y) -> list of (position, x, y)
+        self._positions = []  # every indexed position, for queries without words
+        self._matches = OrderedDict()  # cached query -> positions, LRU order
+
+    def add(self, position, location, coordinates=None):
+        """Index the camera stored at ``position`` of the owner's list."""
+        for word in set(tokenize(location)):
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = []
+                self._words.insert(bisect_left(self._words, word), word)
+            postings.append(position)
+        if coordinates is not None:
+            x, y = coordinates
+            self._cells.setdefault(self._cell(x, y), []).append((position, x, y))
+        self._positions.append(position)
+        self._matches.clear()
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _prefixed(self, prefix):
+        """Positions of cameras having a location word that starts with ``prefix``."""
+        positions = set()
+        start = bisect_left(self._words, prefix)
+        for word in self._words[start:]:
+            if not word.startswith(prefix):
+                break
+            positions.update(self._postings[word])
+        return positions
+
+    def match(self, location):
+        """Return sorted positions of cameras whose location matches the query."""
+        key = location.lower()
+        cached = self._matches.get(key)
+        if cached is not None:
+            self._matches.move_to_end(key)
+            return cached
+        words = tokenize(key)
+        if not words:
+            positions = self._positions
+        else:
+            positions = None
+            for word in words:
+                found = self._prefixed(word)
+                positions = found if positions is None else positions & found
+                if not positions:
+                    break
+        cached = self._matches[key] = sorted(positions or ())
+        if len(self._matches) > MATCH_CACHE_SIZE:
+            self._matches.popitem(last=False)
+        return cached
+
+    def within(self, x, y, radius):
+        """Return positions of cameras within ``radius`` metres, nearest first."""
+        low_x, low_y = self._cell(x - radius, y - radius)
+        high_x, high_y = self._cell(x + radius, y + radius)
+        limit = radius * radius
+        if (high_x - low_x + 1) * (high_y - low_y + 1) > len(self._cells):
+            # Huge radius: walking the occupied cells is cheaper
+            cells = [entries for (cell_x, cell_y), entries in self._cells.items()
+                     if low_x <= cell_x <= high_x and low_y <= cell_y <= high_y]
+        else:
+            cells = [self._cells.get((cell_x, cell_y), ())
+                     for cell_x in range(low_x, high_x + 1)
+                     for cell_y in range(low_y, high_y + 1)]
+        found = []
+        for entries in cells:
+            for position, camera_x, camera_y in entries:
+                distance = (camera_x - x) ** 2 + (camera_y - y) ** 2
+                if distance <= limit:
+                    found.append((distance, position))
+        found.sort()
+        return [position for _, position in found]
@@ -6,8 +6,25 @@ Controls access to security cameras and provides lazy loading.
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import time
 
+from modules.security.access_log import AccessLog
+from modules.security.camera_index import CameraIndex
+
+WARMUP_CONCURRENCY = 32  # cameras initialized in parallel by default
+ALARM_RADIUS_M = 300     # cameras recorded around a positioned alarm
+
+# (camera id, location) of the cameras a new SecuritySystem gets
+DEFAULT_CAMERAS = (
+    ("CAM-001", "Main Square"),
+    ("CAM-002", "Park Entrance"),
+    ("CAM-003", "Shopping District"),
+    ("CAM-004", "Residential North"),
+    ("CAM-005", "Industrial Gate"),
+)
+
 class SecurityCamera(ABC):
     """
     Pattern: PROXY
@@ -51,18 +68,35 @@ class SecurityCameraProxy(SecurityCamera):
     Implements lazy initialization and access control.
     """
     
-    def __init__(self, camera_id, location):
+    def __init__(self, camera_id, location, access_log=None, position=None):
         self.camera_id = camera_id
         self.location = location
+        self.position = position  # optional (x, y) in metres
         self._real_camera = None
-        self.access_log = []
+        self._init_lock = threading.Lock()
+        # Accesses go to a shared ring buffer; a standalone proxy gets its own
+        self._access_log = access_log if access_log is not None else AccessLog()
+        self._camera_index = self._access_log.register(camera_id)
+        self.access_count = 0
+    
+    @property
+    def access_log(self):
+        """Formatted access entries for this camera still held in the log."""
+        return self._access_log.entries(self._camera_index)
     
     def _get_real_camera(self):
-        """Lazy initialization of the real camera."""
+        """Lazy initialization of the real camera (safe across threads)."""
         if self._real_camera is None:
-            self._real_camera = RealSecurityCamera(self.camera_id, self.location)
+            with self._init_lock:
+                if self._real_camera is None:
+                    self._real_camera = RealSecurityCamera(self.camera_id, self.location)
         return self._real_camera
     
+    def warm_up(self):
+        """Initialize the real camera ahead of the first access."""
+        self._get_real_camera()
+        return self
+    
     def get_feed(self):
         """Get camera feed with access logging."""
         self._log_access("feed_requested")
@@ -85,25 +119,103 @@ class SecurityCameraProxy(SecurityCamera):
         return True  # Simplified - always allow
     
     def _log_access(self, action):
-        """Log access attempts."""
-        timestamp = time.strftime("%H:%M:%S")
-        self.access_log.append(f"{timestamp} - {action}")
+        """Log access attempts (formatted only when read)."""
+        self._access_log.append(self._camera_index, action)
+        self.access_count += 1
 
 class SecuritySystem:
     """Main security system managing cameras and alarms."""
     
-    def __init__(self):
+    def __init__(self, prewarm=0, access_counts=None, log_path=None, cameras=DEFAULT_CAMERAS):
+        # All cameras share one bounded access log, persisted if log_path is set
+        self.access_log = AccessLog(path=log_path)
+        
         # Use Proxy pattern for cameras - they won't be initialized until accessed
-        self.cameras = [
-            SecurityCameraProxy("CAM-001", "Main Square"),
-            SecurityCameraProxy("CAM-002", "Park Entrance"),
-            SecurityCameraProxy("CAM-003", "Shopping District"),
-            SecurityCameraProxy("CAM-004", "Residential North"),
-            SecurityCameraProxy("CAM-005", "Industrial Gate")
-        ]
+        self.cameras = []
+        self.index = CameraIndex()
+        for camera_id, location in cameras:
+            self.add_camera(camera_id, location)
         
         self.alarms_active = []
         self.security_level = "Normal"
+        
+        if prewarm:
+            self.prewarm(prewarm, access_counts)
+    
+    def add_camera(self, camera_id, location, position=None):
+        """
+        Deploy a camera proxy and index it by location name and position.
+        
+        Args:
+            camera_id: unique camera id
+            location: location name, e.g. "Main Square"
+            position: optional (x, y) coordinates in metres
+        """
+        camera = SecurityCameraProxy(camera_id, location, self.access_log, position)
+        self.index.add(len(self.cameras), location, position)
+        self.cameras.append(camera)
+        return camera
+    
+    def find_cameras(self, location=None, position=None, radius=ALARM_RADIUS_M):
+        """
+        Return cameras matching a location name and/or lying within
+        ``radius`` metres of ``position``; nearest cameras come first.
+        """
+        positions = []
+        if position is not None:
+            positions = self.index.within(position[0], position[1], radius)
+        if location is not None:
+            seen = set(positions)
+            positions = positions + [found for found in self.index.match(location)
+                                     if found not in seen]
+        return [self.cameras[found] for found in positions]
+    
+    def warm_up(self, cameras=None, max_workers=WARMUP_CONCURRENCY, progress=None):
+        """
+        Initialize camera proxies concurrently.
+        
+        Args:
+            cameras: proxies in priority order (defaults to all cameras)
+            max_workers: maximum number of cameras initializing at once
+            progress: optional callback(done, total) after each camera
+            
+        Returns:
+            Number of cameras that were initialized
+        """
+        if cameras is None:
+            cameras = self.cameras
+        pending = [camera for camera in cameras if camera._real_camera is None]
+        if not pending:
+            return 0
+        
+        # The pool takes work in submission order, so priority is preserved
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            futures = [pool.submit(camera.warm_up) for camera in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress is not None:
+                    progress(done, len(pending))
+        return len(pending)
+    
+    def prewarm(self, count, access_counts=None):
+        """
+        Warm up the ``count`` most-accessed cameras.
+        ``access_counts`` maps camera ids to counts from earlier runs;
+        cameras missing from it fall back to their in-process access count.
+        """
+        access_counts = access_counts or {}
+        ranked = sorted(self.cameras, reverse=True,
+                        key=lambda camera: access_counts.get(camera.camera_id,
+                                                             camera.access_count))
+        return self.warm_up(ranked[:count])
+    
+    def _prioritize(self, location):
+        """Order cameras so those near ``location`` come first."""
+        if not location:
+            return list(self.cameras)
+        near = self.find_cameras(location)
+        near_ids = {id(camera) for camera in near}
+        return near + [camera for camera in self.cameras if id(camera) not in near_ids]
     
     def perform_check(self):
         """Perform security system check."""
@@ -133,8 +245,12 @@ class SecuritySystem:
         
         print("\n💡 Note: Other cameras remain in standby (not initialized)")
     
-    def trigger_alarm(self, location):
-        """Trigger security alarm at specific location."""
+    def trigger_alarm(self, location, position=None, radius=ALARM_RADIUS_M):
+        """
+        Trigger security alarm at specific location.
+        Cameras named after the location record, and with a ``position``
+        so does every camera within ``radius`` metres of it.
+        """
         alarm = f"🚨 ALARM at {location} - {time.strftime('%H:%M:%S')}"
         self.alarms_active.append(alarm)
         self.security_level = "Alert"
@@ -143,23 +259,47 @@ class SecuritySystem:
         print("📹 Starting recording on nearby cameras...")
         
         # Start recording on relevant cameras
-        for camera in self.cameras:
-            if location.lower() in camera.location.lower():
-                print(camera.record())
+        for camera in self.find_cameras(location, position, radius):
+            print(camera.record())
     
-    def emergency_mode(self):
-        """Activate emergency security protocols."""
+    def emergency_mode(self, location=None, max_workers=WARMUP_CONCURRENCY, progress=None):
+        """
+        Activate emergency security protocols.
+        Cameras are warmed up in parallel, nearest to ``location`` first.
+        """
         self.security_level = "Emergency"
         print("🚨 Emergency security mode: All cameras active, alarms armed")
         
         # Initialize all cameras in emergency
+        started = time.perf_counter()
+        initialized = self.warm_up(self._prioritize(location), max_workers, progress)
         for camera in self.cameras:
             camera.record()
+        if initialized:
+            print(f"📹 {initialized} cameras initialized in "
+                  f"{time.perf_counter() - started:.2f}s")
+    
+    def query_access(self, camera_id=None, start=None, end=None):
+        """
+        Return access records as (timestamp_ms, camera_id, action) tuples,
+        filtered by camera and an inclusive millisecond time range.
+        """
+        return list(self.access_log.query(camera_id, start, end))
     
     def get_status(self):
         """Get security system status."""
         return f"Level: {self.security_level}, Alarms: {len(self.alarms_active)}"
     
+    def metrics(self):
+        """Return security metrics for the city snapshot."""
+        return {
+            "level": self.security_level,
+            "cameras": len(self.cameras),
+            "active_cameras": sum(1 for cam in self.cameras if cam._real_camera is not None),
+            "alarms": len(self.alarms_active),
+            "logged_accesses": len(self.access_log),
+        }
+    
     def generate_report(self):
         """Generate security report."""
         print("\n🔒 SECURITY SYSTEM REPORT")
@@ -177,4 +317,5 @@ class SecuritySystem:
         """Shutdown security system."""
         self.alarms_active.clear()
         self.security_level = "Offline"
+        self.access_log.close()
         print("🔒 Security system shutdown")
\ No newline at end of file
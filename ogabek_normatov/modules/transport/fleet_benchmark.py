@@ -0,0 +1,48 @@
+"""
+Fleet Construction Benchmark
+
+Compares building a fleet one vehicle at a time through a new builder and
+director per vehicle (the original path) with the bulk prototype path.
+
+    python -m modules.transport.fleet_benchmark [count]
+"""
+
+import sys
+import time
+
+from modules.transport.transport_manager import (BusBuilder, FleetRegistry,
+                                                 VehicleDirector, fleet_ids)
+
+def build_with_director(vehicle_ids):
+    """Original path: a builder, a director and five steps per vehicle."""
+    registry = FleetRegistry()
+    for vehicle_id in vehicle_ids:
+        registry.add(VehicleDirector(BusBuilder()).construct_vehicle(vehicle_id))
+    return registry
+
+def build_from_prototype(vehicle_ids):
+    """Bulk path: one prototype, stamped once per id, registered in one batch."""
+    registry = FleetRegistry()
+    registry.add_many(VehicleDirector(BusBuilder()).construct_fleet(vehicle_ids))
+    return registry
+
+def run(count=50000, repeat=3):
+    """Return {path: best seconds} for building ``count`` buses."""
+    vehicle_ids = fleet_ids("B", count)
+    timings = {}
+    for build in (build_with_director, build_from_prototype):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            build(vehicle_ids)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[build.__name__] = best
+    return timings
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    timings = run(count)
+    for name, seconds in timings.items():
+        print(f"{name:<22} {seconds * 1000:8.1f} ms  ({seconds / count * 1e6:.2f} µs/vehicle)")
+    print(f"speedup: {timings['build_with_director'] / timings['build_from_prototype']:.1f}x")
@@ -0,0 +1,269 @@
+"""
+Road Network - Routing over the city road graph
+
+Shortest (by length) and fastest (by congested travel time) routes are
+found with A* guided by ALT landmark bounds. Landmark distances are
+computed once on free-flow travel times; congestion only ever slows an
+edge down, so the bounds stay valid after every traffic update and no
+re-preprocessing is needed before rerouting the fleet.
+"""
+
+import heapq
+from array import array
+
+UNREACHABLE = 1e18  # finite "infinity" keeps landmark arithmetic NaN-free
+TREE_THRESHOLD = 8  # requests sharing a destination that justify a full tree
+
+# Travel-time multiplier for the legacy congestion levels 0-5
+CONGESTION_FACTORS = {0: 1.0, 1: 1.0, 2: 1.2, 3: 1.5, 4: 2.0, 5: 4.0}
+
+def congestion_factor(level):
+    """Return the travel-time multiplier for a congestion level."""
+    return CONGESTION_FACTORS.get(level, CONGESTION_FACTORS[5])
+
+class RoadNetwork:
+    """
+    Directed road graph with per-edge length, free-flow time and congestion.
+    Nodes may be any hashable id; they are mapped to dense ints internally.
+    """
+
+    METRICS = ("shortest", "fastest")
+
+    def __init__(self):
+        self.node_ids = []
+        self._index = {}
+        self._out = []  # node -> outgoing edge ids
+        self._in = []   # node -> incoming edge ids
+        self.edge_from = array("l")
+        self.edge_to = array("l")
+        self.edge_length = array("d")     # km
+        self.edge_free_time = array("d")  # hours at the speed limit
+        self.congestion = array("d")      # travel-time multiplier >= 1
+        self._landmarks = {}
+        self._fastest = None  # cached congested travel times
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_to)
+
+    @classmethod
+    def grid(cls, rows, cols, block_km=0.2, speed_kmh=50):
+        """Build a ``rows`` x ``cols`` street grid with (row, col) node ids."""
+        network = cls()
+        for row in range(rows):
+            for col in range(cols):
+                if col + 1 < cols:
+                    network.add_road((row, col), (row, col + 1), block_km, speed_kmh)
+                if row + 1 < rows:
+                    network.add_road((row, col), (row + 1, col), block_km, speed_kmh)
+        return network
+
+    def add_node(self, node_id):
+        """Register a node and return its internal index."""
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self.node_ids)
+            self._index[node_id] = index
+            self.node_ids.append(node_id)
+            self._out.append([])
+            self._in.append([])
+        return index
+
+    def add_road(self, start, end, length_km, speed_kmh=50, bidirectional=True):
+        """Add a road segment; returns the list of created edge ids."""
+        edges = [self._add_edge(start, end, length_km, speed_kmh)]
+        if bidirectional:
+            edges.append(self._add_edge(end, start, length_km, speed_kmh))
+        self._landmarks.clear()
+        self._fastest = None
+        return edges
+
+    def _add_edge(self, start, end, length_km, speed_kmh):
+        source = self.add_node(start)
+        target = self.add_node(end)
+        edge = len(self.edge_to)
+        self.edge_from.append(source)
+        self.edge_to.append(target)
+        self.edge_length.append(length_km)
+        self.edge_free_time.append(length_km / speed_kmh)
+        self.congestion.append(1.0)
+        self._out[source].append(edge)
+        self._in[target].append(edge)
+        return edge
+
+    def edges_between(self, start, end):
+        """Return the ids of edges leading from ``start`` to ``end``."""
+        target = self._index[end]
+        return [edge for edge in self._out[self._index[start]]
+                if self.edge_to[edge] == target]
+
+    def set_congestion(self, edges, factor):
+        """Set the travel-time multiplier on the given edges (never below 1)."""
+        factor = max(factor, 1.0)
+        for edge in edges:
+            self.congestion[edge] = factor
+            if self._fastest is not None:
+                self._fastest[edge] = self.edge_free_time[edge] * factor
+
+    def apply_traffic(self, sensor_states, sensor_edges):
+        """
+        Update congestion from adapter sensor states.
+
+        Args:
+            sensor_states: {sensor_id: {"congestion_level": int, ...}}
+            sensor_edges: {sensor_id: [edge ids covered by the sensor]}
+        """
+        for sensor_id, edges in sensor_edges.items():
+            state = sensor_states.get(sensor_id)
+            if state is not None:
+                self.set_congestion(edges, congestion_factor(state["congestion_level"]))
+
+    def _weights(self, metric):
+        """Per-edge weights for a metric ("shortest" or "fastest")."""
+        if metric == "shortest":
+            return self.edge_length
+        if metric == "fastest":
+            if self._fastest is None:
+                self._fastest = array("d", map(float.__mul__, self.edge_free_time,
+                                               self.congestion))
+            return self._fastest
+        raise ValueError(f"Unknown routing metric: {metric}")
+
+    def _dijkstra(self, origin, weights, reverse=False):
+        """Distances from ``origin`` (to ``origin`` if ``reverse``) and tree parents."""
+        distance = array("d", [UNREACHABLE]) * len(self.node_ids)
+        parent_edge = array("l", [-1]) * len(self.node_ids)
+        adjacency = self._in if reverse else self._out
+        endpoint = self.edge_from if reverse else self.edge_to
+        distance[origin] = 0.0
+        heap = [(0.0, origin)]
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if dist > distance[node]:
+                continue
+            for edge in adjacency[node]:
+                neighbor = endpoint[edge]
+                candidate = dist + weights[edge]
+                if candidate < distance[neighbor]:
+                    distance[neighbor] = candidate
+                    parent_edge[neighbor] = edge
+                    heapq.heappush(heap, (candidate, neighbor))
+        return distance, parent_edge
+
+    def preprocess(self, landmark_count=8):
+        """
+        Select landmarks by farthest-point sampling and store forward and
+        backward landmark distances for both metrics.
+        """
+        if not self.node_ids:
+            return
+        bases = {"shortest": self.edge_length, "fastest": self.edge_free_time}
+        for metric, weights in bases.items():
+            landmarks = []
+            forward = []
+            backward = []
+            closest = array("d", [UNREACHABLE]) * len(self.node_ids)
+            candidate = 0
+            for _ in range(min(landmark_count, len(self.node_ids))):
+                landmarks.append(candidate)
+                from_landmark, _ = self._dijkstra(candidate, weights)
+                to_landmark, _ = self._dijkstra(candidate, weights, reverse=True)
+                forward.append(from_landmark)
+                backward.append(to_landmark)
+                closest = array("d", map(min, closest, from_landmark))
+                # Next landmark: reachable node farthest from all chosen ones
+                candidate = max(range(len(closest)), key=lambda node: (
+                    closest[node] if closest[node] < UNREACHABLE else -1.0))
+            self._landmarks[metric] = (landmarks, forward, backward)
+
+    def route(self, origin, destination, metric="fastest"):
+        """
+        Find a route with A* + ALT bounds.
+
+        Returns:
+            (cost, [node ids]) or None if ``destination`` is unreachable.
+            Cost is km for "shortest" and hours for "fastest".
+        """
+        weights = self._weights(metric)
+        return self._astar(self._index[origin], self._index[destination], weights, metric)
+
+    def _astar(self, source, target, weights, metric):
+        landmarks = self._landmarks.get(metric)
+        if landmarks is None:
+            bound = lambda node: 0.0
+        else:
+            _, forward, backward = landmarks
+            tables = [(table_from, table_from[target], table_to, table_to[target])
+                      for table_from, table_to in zip(forward, backward)]
+
+            def bound(node):
+                best = 0.0
+                for table_from, from_target, table_to, to_target in tables:
+                    estimate = from_target - table_from[node]
+                    if estimate > best:
+                        best = estimate
+                    estimate = table_to[node] - to_target
+                    if estimate > best:
+                        best = estimate
+                return best
+
+        distance = {source: 0.0}
+        parent_edge = {}
+        heap = [(bound(source), 0.0, source)]
+        while heap:
+            _, dist, node = heapq.heappop(heap)
+            if node == target:
+                return dist, self._path(parent_edge, source, target)
+            if dist > distance[node]:
+                continue
+            for edge in self._out[node]:
+                neighbor = self.edge_to[edge]
+                candidate = dist + weights[edge]
+                if candidate < distance.get(neighbor, UNREACHABLE):
+                    distance[neighbor] = candidate
+                    parent_edge[neighbor] = edge
+                    heapq.heappush(heap, (candidate + bound(neighbor), candidate, neighbor))
+        return None
+
+    def _path(self, parent_edge, source, target):
+        nodes = [target]
+        while nodes[-1] != source:
+            nodes.append(self.edge_from[parent_edge[nodes[-1]]])
+        nodes.reverse()
+        return [self.node_ids[node] for node in nodes]
+
+    def route_many(self, requests, metric="fastest"):
+        """
+        Route many (origin, destination) pairs.
+        Destinations shared by at least ``TREE_THRESHOLD`` requests get one
+        reverse shortest-path tree; the rest use A* individually.
+
+        Returns:
+            list of (cost, [node ids]) or None, in request order
+        """
+        weights = self._weights(metric)
+        by_destination = {}
+        for position, (_, destination) in enumerate(requests):
+            by_destination.setdefault(destination, []).append(position)
+
+        results = [None] * len(requests)
+        for destination, positions in by_destination.items():
+            target = self._index[destination]
+            if len(positions) >= TREE_THRESHOLD:
+                distance, next_edge = self._dijkstra(target, weights, reverse=True)
+                for position in positions:
+                    source = self._index[requests[position][0]]
+                    if distance[source] < UNREACHABLE:
+                        nodes = [source]
+                        while nodes[-1] != target:
+                            nodes.append(self.edge_to[next_edge[nodes[-1]]])
+                        results[position] = (distance[source],
+                                             [self.node_ids[node] for node in nodes])
+            else:
+                for position in positions:
+                    source = self._index[requests[position][0]]
+                    results[position] = self._astar(source, target, weights, metric)
+        return results
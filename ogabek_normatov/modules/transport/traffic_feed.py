@@ -0,0 +1,125 @@
+"""
+Traffic Feed Decoder - Bulk ingestion of legacy traffic records
+
+The legacy traffic system emits pipe-delimited records, one per line:
+
+    TRAFFIC|<congestion>|<average_speed>|<incidents>|<sensor_id>|<timestamp>
+
+Plain ``TRAFFIC|c|s|i`` records (no sensor or timestamp) are accepted too.
+Chunks of well-formed records are decoded column-wise: the whole chunk is
+split once and every column is converted with a single ``map(int, ...)``
+into a compact array, instead of splitting and converting line by line.
+"""
+
+from array import array
+from operator import le
+
+RECORD_FIELDS = 6
+DEFAULT_SENSOR = b"default"
+CHUNK_SIZE = 1 << 20  # bytes read per batch when streaming
+
+class TrafficBatch:
+    """Columnar batch of decoded traffic records."""
+
+    def __init__(self, sensor_ids, timestamps, congestion, average_speed,
+                 incidents, rejected=0):
+        self.sensor_ids = sensor_ids        # list of bytes
+        self.timestamps = timestamps        # array('q')
+        self.congestion = congestion        # array('B')
+        self.average_speed = average_speed  # array('H')
+        self.incidents = incidents          # array('H')
+        self.rejected = rejected            # malformed lines skipped
+
+    def __len__(self):
+        return len(self.sensor_ids)
+
+    def latest_rows(self):
+        """
+        Return {sensor_id: row} of each sensor's newest record in the batch,
+        by timestamp; of equal timestamps the later row wins.
+        """
+        timestamps = self.timestamps
+        if all(map(le, timestamps, timestamps[1:])):
+            # In time order, later rows overwrite earlier ones in dict construction
+            return dict(zip(self.sensor_ids, range(len(self.sensor_ids))))
+        rows = {}
+        newest = {}
+        for row, (sensor, timestamp) in enumerate(zip(self.sensor_ids, timestamps)):
+            if newest.get(sensor, timestamp) <= timestamp:
+                newest[sensor] = timestamp
+                rows[sensor] = row
+        return rows
+
+    def congestion_histogram(self):
+        """Return {congestion_level: record_count} for the batch."""
+        raw = self.congestion.tobytes()
+        return {level: raw.count(bytes((level,))) for level in set(raw)}
+
+def decode_records(data):
+    """Decode a buffer of complete lines into a TrafficBatch."""
+    data = data.strip()
+    if not data:
+        return _empty_batch()
+    fields = data.replace(b"\r", b"").replace(b"\n", b"|").split(b"|")
+    count, remainder = divmod(len(fields), RECORD_FIELDS)
+    if remainder == 0 and fields[0::RECORD_FIELDS].count(b"TRAFFIC") == count:
+        try:
+            return TrafficBatch(fields[4::RECORD_FIELDS],
+                                array("q", map(int, fields[5::RECORD_FIELDS])),
+                                array("B", map(int, fields[1::RECORD_FIELDS])),
+                                array("H", map(int, fields[2::RECORD_FIELDS])),
+                                array("H", map(int, fields[3::RECORD_FIELDS])))
+        except (ValueError, OverflowError):
+            pass
+    return _decode_lines(data)
+
+def _decode_lines(data):
+    """Slow path: decode line by line, skipping malformed records."""
+    batch = _empty_batch()
+    for line in data.splitlines():
+        parts = line.strip().split(b"|")
+        if len(parts) == 4:
+            parts += [DEFAULT_SENSOR, b"0"]
+        if len(parts) != RECORD_FIELDS or parts[0] != b"TRAFFIC":
+            if line.strip():
+                batch.rejected += 1
+            continue
+        try:
+            timestamp, congestion, speed, incidents = (
+                int(parts[5]), int(parts[1]), int(parts[2]), int(parts[3]))
+        except ValueError:
+            batch.rejected += 1
+            continue
+        if not (0 <= congestion <= 0xFF and 0 <= speed <= 0xFFFF
+                and 0 <= incidents <= 0xFFFF):
+            batch.rejected += 1
+            continue
+        batch.sensor_ids.append(parts[4])
+        batch.timestamps.append(timestamp)
+        batch.congestion.append(congestion)
+        batch.average_speed.append(speed)
+        batch.incidents.append(incidents)
+    return batch
+
+def _empty_batch():
+    return TrafficBatch([], array("q"), array("B"), array("H"), array("H"))
+
+def iter_batches(stream, chunk_size=CHUNK_SIZE):
+    """
+    Stream a binary file object as TrafficBatch chunks.
+    Each chunk is cut at the last newline; the tail is carried over.
+    """
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        chunk = pending + chunk
+        cut = chunk.rfind(b"\n")
+        if cut < 0:
+            pending = chunk
+            continue
+        pending = chunk[cut + 1:]
+        yield decode_records(chunk[:cut])
+    if pending.strip():
+        yield decode_records(pending)
@@ -6,13 +6,22 @@ Design Patterns:
 2. ADAPTER - Integration with external traffic system
 """
 
+import copy
 from abc import ABC, abstractmethod
+from collections import Counter
+from operator import attrgetter
+
+from modules.transport.traffic_feed import decode_records, iter_batches
 
 # BUILDER PATTERN
 
 class Vehicle:
     """Complex vehicle object built step by step."""
     
+    # Slots keep per-vehicle memory small for large fleets
+    __slots__ = ("vehicle_type", "vehicle_id", "capacity", "fuel_type",
+                 "gps_enabled", "route")
+    
     def __init__(self):
         self.vehicle_type = None
         self.vehicle_id = None
@@ -21,6 +30,17 @@ class Vehicle:
         self.gps_enabled = False
         self.route = None
     
+    def clone(self, vehicle_id):
+        """Return a copy of this vehicle with a new id."""
+        vehicle = Vehicle.__new__(Vehicle)
+        vehicle.vehicle_type = self.vehicle_type
+        vehicle.vehicle_id = vehicle_id
+        vehicle.capacity = self.capacity
+        vehicle.fuel_type = self.fuel_type
+        vehicle.gps_enabled = self.gps_enabled
+        vehicle.route = list(self.route) if self.route is not None else None
+        return vehicle
+    
     def __str__(self):
         return (f"{self.vehicle_type} {self.vehicle_id} "
                 f"(Capacity: {self.capacity}, Fuel: {self.fuel_type}, "
@@ -118,6 +138,117 @@ class VehicleDirector:
                 .set_fuel_type()
                 .set_gps()
                 .build())
+    
+    def construct_prototype(self):
+        """
+        Run the construction steps once on a copy of this director's
+        builder, so pre-set fields such as a route carry over while the
+        builder itself is left untouched. The id is left unset.
+        """
+        builder = copy.copy(self.builder)
+        builder.vehicle = self.builder.vehicle.clone(None)
+        return VehicleDirector(builder).construct_vehicle(None)
+    
+    def construct_fleet(self, vehicle_ids):
+        """
+        Construct one vehicle per id by stamping copies of a single
+        prototype, so per-vehicle work is only the copy and the id.
+        """
+        prototype = self.construct_prototype()
+        if prototype.route is not None:
+            return [prototype.clone(vehicle_id) for vehicle_id in vehicle_ids]
+        new = Vehicle.__new__
+        vehicle_type = prototype.vehicle_type
+        capacity = prototype.capacity
+        fuel_type = prototype.fuel_type
+        gps_enabled = prototype.gps_enabled
+        fleet = []
+        append = fleet.append
+        for vehicle_id in vehicle_ids:
+            vehicle = new(Vehicle)
+            vehicle.vehicle_type = vehicle_type
+            vehicle.vehicle_id = vehicle_id
+            vehicle.capacity = capacity
+            vehicle.fuel_type = fuel_type
+            vehicle.gps_enabled = gps_enabled
+            vehicle.route = None
+            append(vehicle)
+        return fleet
+
+BUILDERS = {"bus": BusBuilder, "car": CarBuilder, "tram": TramBuilder}
+
+def fleet_ids(prefix, count, start=1, width=None):
+    """
+    Sequential ids such as B00001..B50000 (``width`` defaults to the
+    digits of the last number).
+    """
+    last = start + count - 1
+    width = width or len(str(last))
+    return [f"{prefix}{number:0{width}d}" for number in range(start, last + 1)]
+
+# FLEET REGISTRY
+
+class FleetRegistry:
+    """
+    Registry of fleet vehicles indexed by id.
+    Per-type and per-fuel counters are maintained on every add and remove,
+    so fleet summaries never iterate the vehicles.
+    """
+    
+    def __init__(self):
+        self._by_id = {}
+        self.type_counts = {}
+        self.fuel_counts = {}
+    
+    def __len__(self):
+        return len(self._by_id)
+    
+    def __iter__(self):
+        return iter(self._by_id.values())
+    
+    def __contains__(self, vehicle_id):
+        return vehicle_id in self._by_id
+    
+    def get(self, vehicle_id):
+        """Return the vehicle with ``vehicle_id`` or None."""
+        return self._by_id.get(vehicle_id)
+    
+    def add(self, vehicle):
+        """Register a vehicle. Raises ValueError if the id is taken."""
+        if vehicle.vehicle_id in self._by_id:
+            raise ValueError(f"Vehicle ID already registered: {vehicle.vehicle_id}")
+        self._by_id[vehicle.vehicle_id] = vehicle
+        self.type_counts[vehicle.vehicle_type] = self.type_counts.get(vehicle.vehicle_type, 0) + 1
+        self.fuel_counts[vehicle.fuel_type] = self.fuel_counts.get(vehicle.fuel_type, 0) + 1
+    
+    def add_many(self, vehicles):
+        """
+        Register a list of vehicles at once. Raises ValueError, adding
+        nothing, if any id is taken or repeated within the list.
+        """
+        added = {vehicle.vehicle_id: vehicle for vehicle in vehicles}
+        if len(added) != len(vehicles):
+            raise ValueError("Duplicate vehicle IDs in batch")
+        if not self._by_id.keys().isdisjoint(added):
+            taken = [vehicle_id for vehicle_id in added if vehicle_id in self._by_id]
+            raise ValueError(f"Vehicle IDs already registered: {', '.join(taken[:5])}")
+        self._by_id.update(added)
+        for counts, field in ((self.type_counts, "vehicle_type"), (self.fuel_counts, "fuel_type")):
+            for key, count in Counter(map(attrgetter(field), vehicles)).items():
+                counts[key] = counts.get(key, 0) + count
+    
+    def remove(self, vehicle_id):
+        """Unregister and return the vehicle with ``vehicle_id``."""
+        vehicle = self._by_id.pop(vehicle_id)
+        self._decrement(self.type_counts, vehicle.vehicle_type)
+        self._decrement(self.fuel_counts, vehicle.fuel_type)
+        return vehicle
+    
+    @staticmethod
+    def _decrement(counts, key):
+        counts[key] -= 1
+        if counts[key] == 0:
+            del counts[key]
 
 # ADAPTER PATTERN
 
@@ -146,19 +277,68 @@ class TrafficSystemAdapter:
     
     def __init__(self, legacy_system):
         self.legacy_system = legacy_system
+        
+        # Latest state per sensor and record counts per status from bulk feeds
+        self.sensors = {}
+        self.status_counts = {"Light": 0, "Moderate": 0, "Heavy": 0}
+        self.rejected_records = 0
     
     def get_traffic_status(self):
         """Converts legacy format to modern dictionary format."""
         raw_data = self.legacy_system.get_traffic_info()
         parts = raw_data.split("|")
+        congestion = int(parts[1])
         
         return {
-            "congestion_level": int(parts[1]),
+            "congestion_level": congestion,
             "average_speed": int(parts[2]),
             "incidents": int(parts[3]),
-            "status": self._interpret_congestion(int(parts[1]))
+            "status": self._interpret_congestion(congestion)
         }
     
+    def ingest(self, source):
+        """
+        Ingest a legacy feed in bulk.
+        
+        Args:
+            source: bytes buffer, path to a feed file, or binary file object
+            
+        Returns:
+            Number of records ingested
+        """
+        if isinstance(source, (bytes, bytearray)):
+            return self._apply_batch(decode_records(bytes(source)))
+        if isinstance(source, str):
+            with open(source, "rb") as stream:
+                return self.ingest(stream)
+        return sum(self._apply_batch(batch) for batch in iter_batches(source))
+    
+    def _apply_batch(self, batch):
+        """Fold a decoded batch into per-sensor state and status counts."""
+        for level, count in batch.congestion_histogram().items():
+            self.status_counts[self._interpret_congestion(level)] += count
+        self.rejected_records += batch.rejected
+        
+        for sensor, row in batch.latest_rows().items():
+            sensor_id = sensor.decode()
+            timestamp = batch.timestamps[row]
+            current = self.sensors.get(sensor_id)
+            if current is not None and current["timestamp"] > timestamp:
+                continue
+            congestion = batch.congestion[row]
+            self.sensors[sensor_id] = {
+                "timestamp": timestamp,
+                "congestion_level": congestion,
+                "average_speed": batch.average_speed[row],
+                "incidents": batch.incidents[row],
+                "status": self._interpret_congestion(congestion)
+            }
+        return len(batch)
+    
+    def get_sensor_status(self, sensor_id):
+        """Latest ingested state of one sensor, or None."""
+        return self.sensors.get(sensor_id)
+    
     def _interpret_congestion(self, level):
         """Convert numeric level to human-readable status."""
         if level <= 2:
@@ -170,52 +350,119 @@ class TrafficSystemAdapter:
 
 # TRANSPORT MANAGER
 
+# (vehicle type, id prefix, count) of the fleet a new TransportManager gets
+DEFAULT_FLEET = (("bus", "B", 3), ("tram", "T", 2))
+
 class TransportManager:
     """Main transport management system."""
     
-    def __init__(self):
-        self.vehicles = []
+    def __init__(self, fleet=DEFAULT_FLEET):
+        self.vehicles = FleetRegistry()
+        
+        # Optional road graph for routing; trips map vehicle id -> (origin, destination)
+        self.road_network = None
+        self.sensor_edges = {}
+        self.trips = {}
         
         # Setup adapter for legacy traffic system
         legacy_system = LegacyTrafficSystem()
         self.traffic_adapter = TrafficSystemAdapter(legacy_system)
         
         # Initialize with some default vehicles
-        self._initialize_fleet()
+        self._initialize_fleet(fleet)
     
-    def _initialize_fleet(self):
+    def _initialize_fleet(self, fleet):
         """Initialize the vehicle fleet using Builder pattern."""
-        # Create buses
-        for i in range(1, 4):
-            director = VehicleDirector(BusBuilder())
-            bus = director.construct_vehicle(f"B{i:03d}")
-            self.vehicles.append(bus)
-        
-        # Create trams
-        for i in range(1, 3):
-            director = VehicleDirector(TramBuilder())
-            tram = director.construct_vehicle(f"T{i:03d}")
-            self.vehicles.append(tram)
+        for vehicle_type, prefix, count in fleet:
+            director = VehicleDirector(BUILDERS[vehicle_type]())
+            self.vehicles.add_many(director.construct_fleet(fleet_ids(prefix, count, width=3)))
     
     def add_vehicle(self, vehicle_type, vehicle_id):
         """Add a new vehicle using Builder pattern."""
-        builder = None
-        
-        if vehicle_type.lower() == "bus":
-            builder = BusBuilder()
-        elif vehicle_type.lower() == "car":
-            builder = CarBuilder()
-        elif vehicle_type.lower() == "tram":
-            builder = TramBuilder()
-        else:
+        builder_class = BUILDERS.get(vehicle_type.lower())
+        if builder_class is None:
             print(f"❌ Unknown vehicle type: {vehicle_type}")
             return
+        builder = builder_class()
+        
+        if vehicle_id in self.vehicles:
+            print(f"❌ Vehicle ID already exists: {vehicle_id}")
+            return
         
         director = VehicleDirector(builder)
         vehicle = director.construct_vehicle(vehicle_id)
-        self.vehicles.append(vehicle)
+        self.vehicles.add(vehicle)
         print(f"✅ Added vehicle: {vehicle}")
     
+    def add_fleet(self, vehicle_type, vehicle_ids):
+        """
+        Add many vehicles of one type, stamped from a single prototype.
+        Returns the number of vehicles added.
+        """
+        builder_class = BUILDERS.get(vehicle_type.lower())
+        if builder_class is None:
+            print(f"❌ Unknown vehicle type: {vehicle_type}")
+            return 0
+        fleet = VehicleDirector(builder_class()).construct_fleet(vehicle_ids)
+        try:
+            self.vehicles.add_many(fleet)
+        except ValueError as error:
+            print(f"❌ {error}")
+            return 0
+        print(f"✅ Added {len(fleet)} {fleet[0].vehicle_type if fleet else vehicle_type} vehicles")
+        return len(fleet)
+    
+    def get_vehicle(self, vehicle_id):
+        """Look up a vehicle by id."""
+        return self.vehicles.get(vehicle_id)
+    
+    def remove_vehicle(self, vehicle_id):
+        """Remove a vehicle from the fleet."""
+        if vehicle_id not in self.vehicles:
+            print(f"❌ Unknown vehicle ID: {vehicle_id}")
+            return
+        vehicle = self.vehicles.remove(vehicle_id)
+        print(f"✅ Removed vehicle: {vehicle}")
+    
+    def set_road_network(self, network, sensor_edges=None):
+        """
+        Attach a RoadNetwork for routing.
+        ``sensor_edges`` maps traffic sensor ids to the edges they observe.
+        """
+        self.road_network = network
+        self.sensor_edges = sensor_edges or {}
+        network.preprocess()
+    
+    def plan_trip(self, vehicle_id, origin, destination, metric="fastest"):
+        """Route a vehicle between two road network nodes."""
+        vehicle = self.vehicles.get(vehicle_id)
+        if vehicle is None or self.road_network is None:
+            print(f"❌ Cannot route vehicle {vehicle_id}")
+            return None
+        result = self.road_network.route(origin, destination, metric)
+        self.trips[vehicle_id] = (origin, destination)
+        vehicle.route = result[1] if result else None
+        return result
+    
+    def reroute_fleet(self, metric="fastest"):
+        """
+        Feed adapter congestion into the road network and re-plan every trip.
+        Returns the number of vehicles whose route changed.
+        """
+        if self.road_network is None or not self.trips:
+            return 0
+        self.road_network.apply_traffic(self.traffic_adapter.sensors, self.sensor_edges)
+        vehicle_ids = list(self.trips)
+        results = self.road_network.route_many([self.trips[v] for v in vehicle_ids], metric)
+        changed = 0
+        for vehicle_id, result in zip(vehicle_ids, results):
+            vehicle = self.vehicles.get(vehicle_id)
+            route = result[1] if result else None
+            if vehicle is not None and vehicle.route != route:
+                vehicle.route = route
+                changed += 1
+        return changed
+    
     def optimize_traffic(self):
         """Optimize traffic flow using adapted traffic data."""
         traffic_status = self.traffic_adapter.get_traffic_status()
@@ -228,6 +475,8 @@ class TransportManager:
         
         if traffic_status['congestion_level'] > 3:
             print("⚠️  High congestion detected - rerouting vehicles")
+            if self.road_network is not None:
+                print(f"🔀 Rerouted {self.reroute_fleet()} of {len(self.trips)} vehicles")
         else:
             print("✅ Traffic flow is optimal")
     
@@ -235,20 +484,30 @@ class TransportManager:
         """Get transport system status."""
         return f"{len(self.vehicles)} vehicles active"
     
+    def metrics(self):
+        """Return transport metrics for the city snapshot."""
+        traffic = self.traffic_adapter.get_traffic_status()
+        return {
+            "vehicles": len(self.vehicles),
+            "by_type": dict(self.vehicles.type_counts),
+            "by_fuel": dict(self.vehicles.fuel_counts),
+            "traffic_status": traffic["status"],
+            "congestion_level": traffic["congestion_level"],
+            "sensors": len(self.traffic_adapter.sensors),
+        }
+    
     def generate_report(self):
         """Generate transport report."""
         print("\n🚗 TRANSPORT SYSTEM REPORT")
         print("-" * 40)
         print(f"Total Vehicles: {len(self.vehicles)}")
         
-        vehicle_types = {}
-        for vehicle in self.vehicles:
-            v_type = vehicle.vehicle_type
-            vehicle_types[v_type] = vehicle_types.get(v_type, 0) + 1
-        
-        for v_type, count in vehicle_types.items():
+        for v_type, count in self.vehicles.type_counts.items():
             print(f"  • {v_type}s: {count}")
         
+        fuels = ", ".join(f"{fuel}: {count}" for fuel, count in self.vehicles.fuel_counts.items())
+        print(f"Fuel Mix: {fuels}")
+        
         # Show traffic status via adapter
         traffic = self.traffic_adapter.get_traffic_status()
         print(f"\nTraffic Status: {traffic['status']}")
@@ -61,6 +61,88 @@ class TestFactoryPattern(unittest.TestCase):
         district = self.factory.create_district("unknown", "Unknown Area")
         self.assertEqual(district.get_type(), "Mixed-Use")
 
+class TestDistrictLoad(unittest.TestCase):
+    """Test the district load model and the sizing it drives."""
+    
+    def setUp(self):
+        self.factory = DistrictFactory()
+    
+    def test_profiles_cached_per_district(self):
+        """Test that hourly profiles are computed once and scale with population."""
+        district = self.factory.create_district("residential", "North")
+        load = district.load
+        
+        self.assertIs(district.load, load)
+        self.assertEqual(len(load.demand), 24)
+        self.assertAlmostEqual(sum(load.demand) / 24, 5000 * 0.20 + 65)
+        self.assertGreater(max(load.transit[7:10]), load.transit[3])
+        
+        district.population *= 2
+        district.invalidate_load()
+        self.assertEqual(district.load.lights, 2 * load.lights)
+    
+    def test_city_load_incremental(self):
+        """Test that adding and removing districts updates the sums in place."""
+        from core.factories.district_load import CityLoad
+        
+        districts = [self.factory.create_district(kind, kind)
+                     for kind in ("residential", "commercial", "industrial")]
+        city = CityLoad()
+        for district in districts:
+            city.add(district)
+        
+        expected = sum(sum(district.load.demand) for district in districts) / 24
+        self.assertAlmostEqual(city.average_demand, expected)
+        self.assertEqual(city.lights_required(), 18)
+        
+        city.remove(districts[0])
+        self.assertEqual(city.district_count, 2)
+        self.assertEqual(city.lights_required(), 8)
+    
+    def test_remove_after_invalidation(self):
+        """Test that removal subtracts the profiles that were added."""
+        from core.factories.district_load import CityLoad
+        
+        district = self.factory.create_district("residential", "North")
+        city = CityLoad()
+        city.add(district)
+        district.population *= 2
+        district.invalidate_load()
+        
+        city.update(district)
+        self.assertEqual(city.lights, district.load.lights)
+        city.remove(district)
+        self.assertEqual(city.lights, 0)
+        self.assertEqual(max(abs(value) for value in city.demand), 0)
+    
+    def test_controller_sizing(self):
+        """Test that districts drive energy consumption and infrastructure sizing."""
+        singleton = SmartCityController._instance
+        SmartCityController._instance = None
+        try:
+            controller = SmartCityController.get_instance()
+            controller.initialize_city()
+            self.assertEqual(controller.energy.total_consumption,
+                             round(controller.city_load.average_demand))
+            
+            controller.add_district("Harbor", "industrial")
+            self.assertEqual(controller.energy.total_consumption,
+                             round(controller.city_load.average_demand))
+            
+            controller.size_infrastructure()
+            self.assertEqual(controller.lighting.root.light_count(),
+                             controller.city_load.lights_required())
+            self.assertEqual(controller.size_infrastructure(), (0, 0))
+            
+            harbor = controller.districts[-1]
+            harbor.population *= 3
+            controller.update_district("Harbor")
+            self.assertEqual(controller.energy.total_consumption,
+                             round(controller.city_load.average_demand))
+            self.assertEqual(controller.city_load.district_count, 4)
+        finally:
+            SmartCityController._instance = singleton
+
 class TestCompositePattern(unittest.TestCase):
     """Test Composite pattern in lighting system."""
     
@@ -102,6 +184,180 @@ class TestCompositePattern(unittest.TestCase):
         main_group.turn_on()
         self.assertTrue(light3.is_on)
 
+class TestLightStore(unittest.TestCase):
+    """Test columnar light storage behind the lighting composite."""
+    
+    def setUp(self):
+        self.lighting = LightingSystem()
+    
+    def test_district_is_contiguous_block(self):
+        """Test that city-wide operations resolve to one store slice."""
+        store, start, stop = self.lighting.root.span
+        self.assertIs(store, self.lighting.store)
+        self.assertEqual((start, stop), (0, 16))
+    
+    def test_block_operations_update_views(self):
+        """Test that block updates are visible through StreetLight views."""
+        downtown = self.lighting.root.children[0]
+        downtown.set_brightness(40)
+        
+        light = downtown.light(2)
+        self.assertEqual(light.light_id, "DT-3")
+        self.assertTrue(light.is_on)
+        self.assertEqual(light.brightness, 40)
+        self.assertEqual(self.lighting.store.count_on(0, 16), 5)
+    
+    def test_view_writes_through_to_store(self):
+        """Test that a single-light view writes into the shared columns."""
+        residential = self.lighting.root.children[1]
+        residential.light(0).turn_on()
+        
+        self.assertEqual(self.lighting.store.brightness[5], 100)
+        self.assertFalse(residential.light(1).is_on)
+    
+    def test_fractional_brightness(self):
+        """Test that non-integer levels are stored as given."""
+        light = StreetLight("SL-FR")
+        light.set_brightness(50.5)
+        self.assertEqual(light.brightness, 50.5)
+        
+        self.lighting.set_brightness(75.5)
+        self.assertEqual(self.lighting.get_light("DT-1").brightness, 75.5)
+        self.assertEqual(self.lighting.root.brightness_sum(), 16 * 75.5)
+        
+        with self.assertRaises(TypeError):
+            self.lighting.store.fill(0, 5, True, "bright")
+        self.assertEqual(self.lighting.root.on_count(), 16)
+
+class TestLightAggregates(unittest.TestCase):
+    """Test cached aggregates on the lighting composite."""
+    
+    def setUp(self):
+        self.lighting = LightingSystem()
+        self.root = self.lighting.root
+    
+    def test_aggregates_after_group_operation(self):
+        """Test counts and wattage after a city-wide operation."""
+        self.lighting.set_brightness(50)
+        
+        self.assertEqual(self.root.light_count(), 16)
+        self.assertEqual(self.root.on_count(), 16)
+        self.assertEqual(self.root.brightness_sum(), 800)
+        self.assertAlmostEqual(self.root.wattage(), 16 * 150 * 0.5)
+    
+    def test_leaf_change_propagates_to_root(self):
+        """Test that a single light change reaches its ancestors."""
+        self.assertEqual(self.root.on_count(), 0)
+        
+        self.root.children[2].light(1).turn_on()
+        
+        self.assertEqual(self.root.children[2].on_count(), 1)
+        self.assertEqual(self.root.on_count(), 1)
+        self.assertEqual(self.root.brightness_sum(), 100)
+    
+    def test_standalone_lights_in_nested_groups(self):
+        """Test aggregates over object-backed lights and nested groups."""
+        light = StreetLight("L1")
+        sub_group = LightGroup("Sub")
+        main_group = LightGroup("Main")
+        sub_group.add(light)
+        sub_group.add(StreetLight("L2"))
+        main_group.add(sub_group)
+        
+        self.assertEqual(main_group.on_count(), 0)
+        light.set_brightness(30)
+        self.assertEqual(main_group.on_count(), 1)
+        self.assertEqual(main_group.brightness_sum(), 30)
+        
+        sub_group.remove(light)
+        self.assertEqual(main_group.light_count(), 1)
+        self.assertEqual(main_group.on_count(), 0)
+    
+    def test_running_totals_match_store(self):
+        """Test that incremental totals equal a full recount after mixed writes."""
+        store = self.lighting.store
+        self.root.aggregates()
+        self.lighting.turn_on_lights(["DT-2", "RES-4", "IND-3", "missing"])
+        self.lighting.set_range_brightness("DT-4", "RES-3", 40)
+        self.lighting.get_light("RES-8").set_brightness(12.5)
+        self.lighting.set_lights_brightness(["DT-2", "RES-1"], 0)
+        
+        self.assertEqual(self.root.on_count(), store.count_on(0, len(store)))
+        self.assertEqual(self.root.brightness_sum(), store.sum_brightness(0, len(store)))
+        for block in self.root.children:
+            self.assertEqual(block.aggregates()[1:],
+                             (store.count_on(block.start, block.stop),
+                              store.sum_brightness(block.start, block.stop)))
+
+class TestLightIndex(unittest.TestCase):
+    """Test id and path addressing in the lighting system."""
+    
+    def setUp(self):
+        self.lighting = LightingSystem()
+        self.lighting.add_district("Suburbs/North", "SN", 4)
+        self.lighting.add_district("Suburbs/South", "SS", 4)
+    
+    def test_get_light_by_id(self):
+        """Test O(1) lookup of a single light by id."""
+        light = self.lighting.get_light("RES-7")
+        light.turn_on()
+        
+        self.assertEqual(light.light_id, "RES-7")
+        self.assertTrue(self.lighting.get_light("RES-7").is_on)
+        self.assertIsNone(self.lighting.get_light("NOPE-1"))
+    
+    def test_turn_on_list_of_ids(self):
+        """Test switching on a list of lights by id."""
+        found = self.lighting.turn_on_lights(["DT-1", "IND-2", "NOPE-1"])
+        
+        self.assertEqual(found, 2)
+        self.assertEqual(self.lighting.root.on_count(), 2)
+    
+    def test_dim_subtree_by_path(self):
+        """Test dimming everything under a nested path."""
+        self.lighting.set_brightness_at("Suburbs/North", 30)
+        
+        self.assertEqual(self.lighting.find("Suburbs").on_count(), 4)
+        self.assertEqual(self.lighting.find("Suburbs/North/SN-2").brightness, 30)
+        self.assertFalse(self.lighting.get_light("SS-1").is_on)
+    
+    def test_split_default_district(self):
+        """Test splitting a flat district so its parts can be addressed."""
+        self.lighting.split_block("Residential", [("North", 3), ("South", 5)])
+        self.lighting.set_brightness_at("Residential/North", 20)
+        
+        self.assertEqual(self.lighting.find("Residential").on_count(), 3)
+        self.assertEqual(self.lighting.get_light("RES-3").brightness, 20)
+        self.assertFalse(self.lighting.get_light("RES-4").is_on)
+        self.assertEqual(self.lighting.root.brightness_sum(), 60)
+        
+        self.lighting.add_district("Residential/East", "RE", 2)
+        self.assertEqual(self.lighting.find("Residential").light_count(), 10)
+        self.assertIsNone(self.lighting.find("Residential").span)
+        self.assertEqual(self.lighting.find("Residential/RES-4").brightness, 0)
+        self.assertEqual(self.lighting.find("Residential/RE-2").light_id, "RE-2")
+        self.assertIsNone(self.lighting.find("Residential/DT-1"))
+        with self.assertRaises(ValueError):
+            self.lighting.split_block("Residential/South", [("A", 1)])
+    
+    def test_duplicate_light_ids_rejected(self):
+        """Test that reusing a light id leaves the original reachable."""
+        with self.assertRaises(ValueError):
+            self.lighting.add_district("Extra", "DT", 2)
+        
+        self.assertIsNone(self.lighting.find("Extra"))
+        self.assertEqual(self.lighting.store.rows["DT-1"], 0)
+        self.assertEqual(self.lighting.turn_on_lights(["DT-1"]), 1)
+        self.assertTrue(self.lighting.find("Downtown/DT-1").is_on)
+    
+    def test_range_over_contiguous_ids(self):
+        """Test setting brightness on a contiguous block of ids."""
+        count = self.lighting.set_range_brightness("RES-3", "RES-7", 60)
+        
+        self.assertEqual(count, 5)
+        self.assertEqual(self.lighting.find("Residential").on_count(), 5)
+        self.assertFalse(self.lighting.get_light("RES-8").is_on)
+
 class TestBuilderPattern(unittest.TestCase):
     """Test Builder pattern in vehicle construction."""
     
@@ -129,6 +385,87 @@ class TestBuilderPattern(unittest.TestCase):
         self.assertGreater(vehicle.capacity, 0)
         self.assertIsNotNone(vehicle.fuel_type)
 
+class TestFleetRegistry(unittest.TestCase):
+    """Test the indexed fleet registry in the transport system."""
+    
+    def setUp(self):
+        self.transport = TransportManager()
+    
+    def test_lookup_and_counters(self):
+        """Test id lookup and maintained per-type and per-fuel counters."""
+        self.transport.add_vehicle("car", "C001")
+        
+        self.assertEqual(self.transport.get_vehicle("C001").vehicle_type, "Car")
+        self.assertEqual(self.transport.vehicles.type_counts, {"Bus": 3, "Tram": 2, "Car": 1})
+        self.assertEqual(self.transport.vehicles.fuel_counts, {"Diesel": 3, "Electric": 3})
+    
+    def test_duplicate_and_removal(self):
+        """Test that duplicate ids are rejected and removal updates counters."""
+        self.transport.add_vehicle("bus", "B001")
+        self.assertEqual(len(self.transport.vehicles), 5)
+        
+        self.transport.remove_vehicle("T001")
+        self.transport.remove_vehicle("T002")
+        
+        self.assertIsNone(self.transport.get_vehicle("T001"))
+        self.assertNotIn("Tram", self.transport.vehicles.type_counts)
+        self.assertEqual(self.transport.get_status(), "3 vehicles active")
+
+class TestBulkFleet(unittest.TestCase):
+    """Test bulk vehicle construction from a builder prototype."""
+    
+    def test_fleet_matches_director_output(self):
+        """Test that stamped vehicles equal director-built ones."""
+        from modules.transport.transport_manager import fleet_ids
+        
+        ids = fleet_ids("B", 50000)
+        self.assertEqual((ids[0], ids[-1]), ("B00001", "B50000"))
+        
+        fleet = VehicleDirector(BusBuilder()).construct_fleet(ids[:100])
+        built = VehicleDirector(BusBuilder()).construct_vehicle("B00100")
+        self.assertEqual(str(fleet[-1]), str(built))
+        self.assertIsNot(fleet[0], fleet[1])
+    
+    def test_fleet_uses_directors_builder(self):
+        """Test that a pre-set route on the builder reaches every clone."""
+        class ShuttleBuilder(BusBuilder):
+            def __init__(self, capacity):
+                super().__init__()
+                self.shuttle_capacity = capacity
+            
+            def set_capacity(self):
+                self.vehicle.capacity = self.shuttle_capacity
+                return self
+        
+        builder = ShuttleBuilder(20).set_route(["A", "B"])
+        director = VehicleDirector(builder)
+        fleet = director.construct_fleet(["S1", "S2"])
+        
+        self.assertEqual([vehicle.route for vehicle in fleet], [["A", "B"], ["A", "B"]])
+        self.assertIsNot(fleet[0].route, fleet[1].route)
+        self.assertEqual(fleet[0].capacity, 20)
+        self.assertIsNone(builder.vehicle.vehicle_id)
+        self.assertEqual(str(fleet[1]), str(director.construct_vehicle("S2")))
+    
+    def test_add_fleet_is_atomic(self):
+        """Test bulk registration counters and duplicate rejection."""
+        from modules.transport.transport_manager import fleet_ids
+        
+        transport = TransportManager()
+        self.assertEqual(transport.add_fleet("tram", fleet_ids("T", 1000)), 1000)
+        self.assertEqual(transport.vehicles.type_counts["Tram"], 1002)
+        
+        self.assertEqual(transport.add_fleet("bus", ["B900", "B001"]), 0)
+        self.assertNotIn("B900", transport.vehicles)
+        self.assertEqual(len(transport.vehicles), 1005)
+    
+    def test_benchmark_runs_both_paths(self):
+        """Test the benchmark harness on a small fleet."""
+        from modules.transport.fleet_benchmark import run
+        
+        self.assertEqual(set(run(count=200, repeat=1)),
+                         {"build_with_director", "build_from_prototype"})
+
 class TestProxyPattern(unittest.TestCase):
     """Test Proxy pattern in security cameras."""
     
@@ -157,6 +494,118 @@ class TestProxyPattern(unittest.TestCase):
         self.assertTrue(any("feed_requested" in log for log in proxy.access_log))
         self.assertTrue(any("recording_started" in log for log in proxy.access_log))
 
+class TestCameraWarmUp(unittest.TestCase):
+    """Test concurrent camera initialization in the security system."""
+    
+    def test_parallel_warm_up_with_progress(self):
+        """Test that warm-up initializes cameras concurrently and reports progress."""
+        import time
+        
+        security = SecuritySystem()
+        progress = []
+        started = time.perf_counter()
+        count = security.warm_up(max_workers=5,
+                                 progress=lambda done, total: progress.append((done, total)))
+        
+        self.assertEqual(count, 5)
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(progress[-1], (5, 5))
+        self.assertTrue(all(camera._real_camera for camera in security.cameras))
+    
+    def test_prioritize_alarm_location(self):
+        """Test that cameras near the alarm location are warmed first."""
+        security = SecuritySystem()
+        ordered = security._prioritize("park")
+        
+        self.assertEqual(ordered[0].camera_id, "CAM-002")
+        self.assertEqual(len(ordered), 5)
+    
+    def test_prewarm_most_accessed(self):
+        """Test pre-warming the most-accessed cameras at startup."""
+        security = SecuritySystem(prewarm=2, access_counts={"CAM-004": 9, "CAM-005": 3})
+        active = {camera.camera_id for camera in security.cameras
+                  if camera._real_camera is not None}
+        
+        self.assertEqual(active, {"CAM-004", "CAM-005"})
+
+class TestAccessLog(unittest.TestCase):
+    """Test the bounded camera access log and its persisted segments."""
+    
+    def test_ring_buffer_is_bounded(self):
+        """Test that the ring keeps only the newest records."""
+        from modules.security.access_log import AccessLog
+        
+        log = AccessLog(capacity=4)
+        camera = log.register("CAM-TEST")
+        for _ in range(3):
+            log.append(camera, "feed_requested")
+        for _ in range(3):
+            log.append(camera, "recording_started")
+        
+        self.assertEqual(len(log), 4)
+        entries = log.entries(camera)
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(sum("feed_requested" in entry for entry in entries), 1)
+    
+    def test_flush_and_query_by_camera_and_time(self):
+        """Test batched persistence and queries across file and ring."""
+        import os
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "access.log")
+            security = SecuritySystem(log_path=path)
+            security.cameras[0].get_feed()
+            security.cameras[1].record()
+            self.assertEqual(security.access_log.flush(), 2)
+            security.cameras[0].record()
+            
+            records = security.query_access("CAM-001")
+            self.assertEqual([action for _, _, action in records],
+                             ["feed_requested", "recording_started"])
+            self.assertEqual(len(security.query_access()), 3)
+            self.assertEqual(security.query_access(start=records[-1][0] + 1), [])
+            
+            security.shutdown()
+            self.assertGreater(os.path.getsize(path), 0)
+            self.assertEqual(len(security.query_access("CAM-001")), 2)
+
+class TestCameraIndex(unittest.TestCase):
+    """Test alarm-to-camera matching by location name and distance."""
+    
+    def setUp(self):
+        self.security = SecuritySystem()
+        self.security.add_camera("CAM-100", "Park Lane", position=(0, 0))
+        self.security.add_camera("CAM-101", "River Bridge", position=(250, 100))
+        self.security.add_camera("CAM-102", "Airport", position=(900, 0))
+    
+    def test_match_by_location_words(self):
+        """Test that every query word must prefix a location word."""
+        found = [camera.camera_id for camera in self.security.find_cameras("park")]
+        
+        self.assertEqual(found, ["CAM-002", "CAM-100"])
+        self.assertEqual(self.security.find_cameras("Main Sq")[0].camera_id, "CAM-001")
+        self.assertEqual(self.security.find_cameras("park square"), [])
+        self.assertEqual(len(self.security.find_cameras("")), len(self.security.cameras))
+    
+    def test_match_cache_is_bounded(self):
+        """Test that old queries are evicted from the match cache."""
+        from modules.security.camera_index import MATCH_CACHE_SIZE
+        
+        for number in range(MATCH_CACHE_SIZE + 10):
+            self.security.find_cameras(f"street {number}")
+        self.assertEqual(len(self.security.index._matches), MATCH_CACHE_SIZE)
+    
+    def test_range_query_nearest_first(self):
+        """Test that positioned alarms record cameras within the radius."""
+        found = self.security.find_cameras(position=(200, 50), radius=300)
+        self.assertEqual([camera.camera_id for camera in found], ["CAM-101", "CAM-100"])
+        
+        self.security.trigger_alarm("Airport", position=(0, 10))
+        recording = {camera.camera_id for camera in self.security.cameras
+                     if camera.access_count}
+        self.assertEqual(recording, {"CAM-100", "CAM-101", "CAM-102"})
+
 class TestDecoratorPattern(unittest.TestCase):
     """Test Decorator pattern in energy system."""
     
@@ -194,6 +643,204 @@ class TestDecoratorPattern(unittest.TestCase):
         self.assertIn("Battery Storage", description)
         self.assertIn("Smart Grid", description)
 
+class TestCompiledSources(unittest.TestCase):
+    """Test compiled decorator chains and cached energy totals."""
+    
+    def test_compiled_matches_decorator_chain(self):
+        """Test that a compiled record matches the recursive results."""
+        from modules.energy.energy_manager import (CoalPowerPlant, CarbonCaptureDecorator,
+                                                   SmartGridDecorator)
+        
+        source = SmartGridDecorator(CarbonCaptureDecorator(CoalPowerPlant()))
+        record = source.compile()
+        
+        self.assertIs(record.source, source)
+        self.assertAlmostEqual(record.power, source.generate_power())
+        self.assertAlmostEqual(record.cost, source.get_cost())
+        self.assertEqual(record.description, source.get_description())
+        self.assertAlmostEqual(record.cost_multiplier, 1.2 * 0.9)
+        self.assertEqual(record.decorators, ("CarbonCaptureDecorator", "SmartGridDecorator"))
+    
+    def test_totals_invalidated_on_change(self):
+        """Test that cached totals follow portfolio changes."""
+        manager = EnergyManager()
+        before = manager.totals()["total_generation"]
+        
+        extra = BatteryStorageDecorator(SolarPanel())
+        manager.add_source(extra)
+        self.assertAlmostEqual(manager.totals()["total_generation"], before + 550)
+        
+        manager.remove_source(extra)
+        self.assertAlmostEqual(manager.totals()["total_generation"], before)
+        self.assertEqual(manager.totals()["source_count"], 3)
+    
+    def test_decorator_without_compile_uses_its_methods(self):
+        """Test that a decorator overriding only its methods compiles to its figures."""
+        from modules.energy.energy_manager import EnergySourceDecorator, SmartGridDecorator
+        
+        class Derated(EnergySourceDecorator):
+            def generate_power(self):
+                return self._energy_source.generate_power() * 0.5
+            
+            def get_description(self):
+                return f"{self._energy_source.get_description()} + Derated"
+        
+        source = SmartGridDecorator(Derated(BatteryStorageDecorator(SolarPanel())))
+        record = source.compile()
+        
+        self.assertAlmostEqual(record.power, source.generate_power())
+        self.assertEqual(record.description, source.get_description())
+        self.assertEqual(record.storage_capacity, 200)
+        self.assertEqual(record.decorators,
+                         ("BatteryStorageDecorator", "Derated", "SmartGridDecorator"))
+    
+    def test_portfolio_view_is_read_only(self):
+        """Test that the portfolio can only change through add/remove."""
+        manager = EnergyManager()
+        
+        self.assertIsInstance(manager.enhanced_sources, tuple)
+        with self.assertRaises(AttributeError):
+            manager.enhanced_sources.append(SolarPanel())
+        self.assertEqual(manager.totals()["source_count"], len(manager.enhanced_sources))
+
+class TestAnnualSimulation(unittest.TestCase):
+    """Test the hourly annual energy simulation."""
+    
+    def test_hourly_arrays_cover_year(self):
+        """Test that every hour of the year is simulated."""
+        result = EnergyManager().simulate_year()
+        
+        self.assertEqual(len(result.generation), 8760)
+        self.assertEqual(len(result.balance), 8760)
+        self.assertAlmostEqual(result.total_demand, 2500 * 8760, delta=2500)
+        self.assertGreater(result.renewable_share, 0)
+        self.assertLess(result.renewable_share, 1)
+    
+    def test_solar_only_produces_in_daylight(self):
+        """Test that solar output follows the daily irradiance curve."""
+        from modules.energy.simulation import simulate_year
+        
+        result = simulate_year([SolarPanel().compile()], 0)
+        
+        self.assertEqual(result.generation[0], 0)  # midnight
+        self.assertGreater(result.generation[12], 0)  # noon
+        self.assertAlmostEqual(result.renewable_share, 1)
+    
+    def test_battery_reduces_deficit(self):
+        """Test that battery storage shifts surplus into deficit hours."""
+        from modules.energy.simulation import simulate_year
+        
+        plain = simulate_year([SolarPanel().compile()], 100)
+        stored = simulate_year([BatteryStorageDecorator(SolarPanel()).compile()], 100)
+        
+        self.assertEqual(stored.storage_capacity, 200)
+        self.assertLess(stored.unserved_energy, plain.unserved_energy)
+    
+    def test_dispatchable_sources_follow_residual_demand(self):
+        """Test that coal only covers the demand left over and is billed for it."""
+        from modules.energy.simulation import simulate_year
+        from modules.energy.energy_manager import CoalPowerPlant
+        
+        coal = simulate_year([CoalPowerPlant().compile()], 400)
+        self.assertEqual(coal.deficit_hours, 0)
+        self.assertAlmostEqual(coal.total_generation, coal.total_demand)
+        self.assertAlmostEqual(coal.total_cost, 0.08 * coal.total_demand)
+        
+        mixed = simulate_year([CoalPowerPlant().compile(), SolarPanel().compile()], 400)
+        self.assertLess(mixed.generation[12], 1000 + SolarPanel().generate_power())
+        self.assertLess(mixed.total_cost, coal.total_cost)
+        
+        energy = EnergyManager()
+        energy.set_demand_profile([100.0] * 12 + [300.0] * 12)
+        result = energy.simulate_year()
+        self.assertEqual(result.demand[5], 100.0)
+        self.assertEqual(result.demand[24 + 15], 300.0)
+        self.assertAlmostEqual(result.total_demand, 200.0 * 8760)
+
+class TestEconomicDispatch(unittest.TestCase):
+    """Test least-cost dispatch of the energy portfolio."""
+    
+    def setUp(self):
+        self.manager = EnergyManager()
+    
+    def test_merit_order_uses_cheapest_first(self):
+        """Test that demand is filled from the cheapest source upwards."""
+        result = self.manager.dispatch(1000)
+        outputs = {unit.name: output for unit, output in result.outputs()}
+        
+        self.assertAlmostEqual(outputs["Solar Panel Array + Battery Storage (200 kWh)"], 550)
+        self.assertAlmostEqual(outputs["Wind Turbine Farm + Smart Grid (+15% efficiency)"], 450)
+        self.assertEqual(result.shortfall, 0)
+        self.assertAlmostEqual(result.total_cost, 550 * 0.05 + 450 * 0.054)
+    
+    def test_resolve_for_new_consumption(self):
+        """Test re-solving when consumption exceeds capacity."""
+        self.assertEqual(self.manager.dispatch().shortfall, 0)
+        self.assertAlmostEqual(self.manager.dispatch(3000).shortfall, 380)
+    
+    def test_ramp_limits(self):
+        """Test that ramp limits bound how fast coal output can drop."""
+        previous = self.manager.constrained_dispatch(2500)
+        ramped = self.manager.constrained_dispatch(300, previous=previous)
+        coal = [output for unit, output in ramped.outputs() if "Coal" in unit.name][0]
+        
+        # Coal ran at 1030 kW and may only drop 30% of 1150 kW per hour
+        self.assertAlmostEqual(coal, 1030 - 0.3 * 1150)
+        self.assertGreater(ramped.surplus, 0)
+    
+    def test_carbon_price_uses_captured_emissions(self):
+        """Test that the carbon price applies to emissions left after capture."""
+        result = self.manager.constrained_dispatch(2500, carbon_price=0.1)
+        coal = [unit for unit, _ in result.outputs() if "Coal" in unit.name][0]
+        
+        self.assertAlmostEqual(coal.cost, 0.08 * 1.2 * 0.9 + 0.1 * 0.95 * 0.1)
+
+class TestSourceTags(unittest.TestCase):
+    """Test structured source tags and the energy source index."""
+    
+    def test_tags_pass_through_decorators(self):
+        """Test that decorators expose the wrapped source's tags."""
+        from modules.energy.energy_manager import (CoalPowerPlant, CarbonCaptureDecorator,
+                                                   SmartGridDecorator)
+        
+        source = SmartGridDecorator(CarbonCaptureDecorator(CoalPowerPlant()))
+        
+        self.assertEqual(source.kind, "coal")
+        self.assertFalse(source.renewable)
+        self.assertAlmostEqual(source.emission_factor, 0.95 * 0.1)
+        self.assertEqual(source.decorators, ("CarbonCaptureDecorator", "SmartGridDecorator"))
+        self.assertTrue(BatteryStorageDecorator(SolarPanel()).renewable)
+    
+    def test_index_follows_portfolio_changes(self):
+        """Test filtering by tags as sources are added and removed."""
+        from modules.energy.energy_manager import SmartGridDecorator
+        
+        manager = EnergyManager()
+        self.assertEqual(len(manager.find_sources(renewable=True)), 2)
+        self.assertEqual(len(manager.find_sources(decorator="SmartGridDecorator")), 2)
+        
+        extra = SolarPanel()
+        manager.add_source(extra)
+        self.assertEqual(manager.totals()["renewable_count"], 3)
+        self.assertEqual(manager.find_sources(kind="solar", decorator="SmartGridDecorator"), [])
+        
+        manager.remove_source(extra)
+        manager.switch_source("renewable")
+        self.assertEqual(manager.find_sources(kind="coal"), [])
+        self.assertEqual(manager.totals()["source_count"], 2)
+    
+    def test_duplicate_source_rejected(self):
+        """Test that one source object cannot be indexed twice."""
+        manager = EnergyManager()
+        existing = manager.enhanced_sources[0]
+        
+        with self.assertRaises(ValueError):
+            manager.add_source(existing)
+        with self.assertRaises(ValueError):
+            manager.enhanced_sources = [existing, existing]
+        self.assertEqual(manager.totals()["source_count"], 3)
+        self.assertEqual(manager.totals()["renewable_count"], 2)
+
 class TestAdapterPattern(unittest.TestCase):
     """Test Adapter pattern in transport system."""
     
@@ -216,6 +863,102 @@ class TestAdapterPattern(unittest.TestCase):
         self.assertIsInstance(traffic_data["congestion_level"], int)
         self.assertIsInstance(traffic_data["status"], str)
 
+class TestTrafficFeed(unittest.TestCase):
+    """Test bulk ingestion of legacy traffic feeds through the adapter."""
+    
+    def setUp(self):
+        from modules.transport.transport_manager import LegacyTrafficSystem, TrafficSystemAdapter
+        
+        self.adapter = TrafficSystemAdapter(LegacyTrafficSystem())
+    
+    def test_bulk_decode_keeps_latest_state(self):
+        """Test columnar decoding and per-sensor latest state."""
+        feed = (b"TRAFFIC|1|60|0|S1|100\n"
+                b"TRAFFIC|5|10|2|S2|100\n"
+                b"TRAFFIC|4|25|1|S1|160\n")
+        
+        self.assertEqual(self.adapter.ingest(feed), 3)
+        self.assertEqual(self.adapter.get_sensor_status("S1")["congestion_level"], 4)
+        self.assertEqual(self.adapter.get_sensor_status("S2")["status"], "Heavy")
+        self.assertEqual(self.adapter.status_counts, {"Light": 1, "Moderate": 1, "Heavy": 1})
+    
+    def test_out_of_order_record_in_batch(self):
+        """Test that a late-arriving older record does not replace a newer one."""
+        feed = (b"TRAFFIC|4|25|1|S1|160\n"
+                b"TRAFFIC|5|10|2|S2|100\n"
+                b"TRAFFIC|1|60|0|S1|100\n")
+        
+        self.adapter.ingest(feed)
+        self.assertEqual(self.adapter.get_sensor_status("S1")["timestamp"], 160)
+        self.assertEqual(self.adapter.get_sensor_status("S1")["congestion_level"], 4)
+    
+    def test_streaming_with_legacy_and_malformed_lines(self):
+        """Test streaming chunks that mix legacy records and bad lines."""
+        import io
+        
+        feed = b"TRAFFIC|3|45|2\nGARBAGE\n" + b"TRAFFIC|2|50|0|S9|5\n" * 50
+        count = self.adapter.ingest(io.BytesIO(feed))
+        
+        self.assertEqual(count, 51)
+        self.assertEqual(self.adapter.rejected_records, 1)
+        self.assertEqual(self.adapter.get_sensor_status("default")["average_speed"], 45)
+        self.assertEqual(self.adapter.status_counts["Light"], 50)
+    
+    def test_chunk_boundaries(self):
+        """Test that records split across read chunks are reassembled."""
+        import io
+        from modules.transport.traffic_feed import iter_batches
+        
+        feed = b"TRAFFIC|2|50|0|S9|5\n" * 20 + b"TRAFFIC|1|70|0|S9|6"
+        batches = list(iter_batches(io.BytesIO(feed), chunk_size=7))
+        
+        self.assertEqual(sum(len(batch) for batch in batches), 21)
+        self.assertEqual(sum(batch.rejected for batch in batches), 0)
+
+class TestRoadRouting(unittest.TestCase):
+    """Test road graph routing and congestion rerouting."""
+    
+    def setUp(self):
+        from modules.transport.road_network import RoadNetwork
+        
+        self.network = RoadNetwork.grid(6, 6)
+        self.network.preprocess(landmark_count=3)
+    
+    def test_alt_route_matches_plain_dijkstra(self):
+        """Test that landmark-guided A* finds the optimal route."""
+        cost, path = self.network.route((0, 0), (5, 4), metric="shortest")
+        
+        self.assertAlmostEqual(cost, 9 * 0.2)
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], (5, 4))
+        self.assertEqual(len(path), 10)
+    
+    def test_route_many_uses_congested_times(self):
+        """Test batch routing against congested edges."""
+        edges = self.network.edges_between((0, 0), (0, 1))
+        self.network.set_congestion(edges, 4.0)
+        
+        requests = [((0, 0), (0, 1))] * 10 + [((0, 0), (0, 1))]
+        results = self.network.route_many(requests)
+        
+        # Going around the congested block (3 blocks) beats 4x one block
+        for cost, path in results:
+            self.assertEqual(len(path), 4)
+            self.assertAlmostEqual(cost, 3 * 0.2 / 50)
+    
+    def test_transport_manager_reroutes_on_congestion(self):
+        """Test that adapter congestion data reroutes planned trips."""
+        transport = TransportManager()
+        sensor_edges = {"S1": self.network.edges_between((0, 0), (0, 1))}
+        transport.set_road_network(self.network, sensor_edges)
+        transport.plan_trip("B001", (0, 0), (0, 1))
+        self.assertEqual(transport.get_vehicle("B001").route, [(0, 0), (0, 1)])
+        
+        transport.traffic_adapter.ingest(b"TRAFFIC|5|5|1|S1|10\n")
+        
+        self.assertEqual(transport.reroute_fleet(), 1)
+        self.assertEqual(len(transport.get_vehicle("B001").route), 4)
+
 class TestFacadePattern(unittest.TestCase):
     """Test Facade pattern in SmartCityController."""
     
@@ -245,6 +988,306 @@ class TestFacadePattern(unittest.TestCase):
         self.assertIsNotNone(lighting_status)
         self.assertIsNotNone(transport_status)
 
+class TestLazySubsystems(unittest.TestCase):
+    """Test on-demand subsystem construction in the controller."""
+    
+    def setUp(self):
+        self.singleton = SmartCityController._instance
+        SmartCityController._instance = None
+    
+    def tearDown(self):
+        SmartCityController._instance = self.singleton
+    
+    def test_subsystems_built_on_first_access(self):
+        """Test that only touched subsystems are built and timed."""
+        controller = SmartCityController.get_instance()
+        self.assertEqual(controller.loaded_subsystems(), [])
+        
+        controller.check_energy()
+        
+        self.assertEqual(controller.loaded_subsystems(), ["energy"])
+        self.assertEqual(list(controller.startup_times), ["energy"])
+        self.assertIs(controller.energy, controller.energy)
+    
+    def test_shutdown_leaves_unused_subsystems_unbuilt(self):
+        """Test that shutting down only touches subsystems already built."""
+        controller = SmartCityController.get_instance()
+        controller.check_energy()
+        
+        outcome = controller.shutdown()
+        
+        self.assertEqual(list(outcome.results), ["energy"])
+        self.assertEqual(controller.loaded_subsystems(), ["energy"])
+
+class TestFanOut(unittest.TestCase):
+    """Test concurrent subsystem operations with deadlines."""
+    
+    def test_concurrent_calls_collect_failures_and_timeouts(self):
+        """Test that slow or failing subsystems do not stall the others."""
+        import time
+        from core.fan_out import FanOut
+        
+        class Subsystem:
+            def __init__(self, delay=0.0, error=None):
+                self.delay = delay
+                self.error = error
+            
+            def shutdown(self):
+                time.sleep(self.delay)
+                if self.error:
+                    raise self.error
+                return "done"
+        
+        systems = {"fast": Subsystem(0.05), "slow": Subsystem(1.0),
+                   "broken": Subsystem(error=RuntimeError("jammed")),
+                   "steady": Subsystem(0.05)}
+        fan_out = FanOut(deadlines={"slow": 0.2}, default_deadline=1.0)
+        outcome = fan_out.run("shutdown", {name: (lambda system=system: system)
+                                           for name, system in systems.items()})
+        
+        self.assertEqual(outcome.results, {"fast": "done", "steady": "done"})
+        self.assertEqual(outcome.timed_out, ["slow"])
+        self.assertIsInstance(outcome.failures["broken"], RuntimeError)
+        self.assertLess(outcome.elapsed, 0.5)
+        self.assertFalse(outcome.ok)
+    
+    def test_concurrent_fan_outs_keep_their_output(self):
+        """Test that parallel fan-outs replay whole blocks and late output is kept."""
+        import io
+        import threading
+        import time
+        from contextlib import redirect_stdout
+        from core.fan_out import FanOut
+        
+        class Subsystem:
+            def __init__(self, name, delay=0.0):
+                self.name = name
+                self.delay = delay
+            
+            def get_status(self):
+                for line in range(20):
+                    print(f"{self.name}:{line}")
+                    time.sleep(0.001)
+                time.sleep(self.delay)
+                print(f"{self.name}:late")
+        
+        def fan_out(prefix, delay=0.0):
+            FanOut(default_deadline=0.2).run("get_status", {
+                name: (lambda name=name: Subsystem(name, delay))
+                for name in (f"{prefix}1", f"{prefix}2")})
+        
+        stream = io.StringIO()
+        with redirect_stdout(stream):
+            runs = [threading.Thread(target=fan_out, args=("a",)),
+                    threading.Thread(target=fan_out, args=("b",))]
+            for run in runs:
+                run.start()
+            for run in runs:
+                run.join()
+            fan_out("slow", delay=0.4)
+            time.sleep(0.4)
+        
+        lines = stream.getvalue().splitlines()
+        for name in ("a1", "a2", "b1", "b2"):
+            block = [line for line in lines if line.startswith(f"{name}:")]
+            start = lines.index(block[0])
+            self.assertEqual(lines[start:start + len(block)], block)
+            self.assertEqual(len(block), 21)
+        self.assertIn("slow1:late", lines)
+        self.assertIn("slow2:late", lines)
+
+class TestCitySnapshot(unittest.TestCase):
+    """Test structured city metrics and their export."""
+    
+    def test_snapshot_cached_and_exported(self):
+        """Test TTL caching and JSON / NDJSON serialization."""
+        import io
+        import json
+        
+        controller = SmartCityController.get_instance()
+        snapshot = controller.snapshot()
+        
+        self.assertIs(controller.snapshot(), snapshot)
+        self.assertIsNot(controller.snapshot(max_age=0), snapshot)
+        
+        data = json.loads(snapshot.to_json())
+        self.assertEqual(data["lighting"]["lights"], controller.lighting.root.light_count())
+        self.assertEqual(data["energy"]["source_count"], len(controller.energy.enhanced_sources))
+        
+        stream = io.StringIO()
+        snapshot.write_ndjson(stream)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(records[0]["record"], "city")
+        self.assertEqual(sum(record["record"] == "energy_source" for record in records),
+                         data["energy"]["source_count"])
+
+class TestDistrictSharding(unittest.TestCase):
+    """Test district shards in worker processes behind a coordinator."""
+    
+    def test_route_and_merge_across_shards(self):
+        """Test routing to the owning shard and merging city-wide results."""
+        from core.sharding import ShardCoordinator
+        
+        with ShardCoordinator(processes=2) as shards:
+            for name in ("North", "South", "East"):
+                shards.add_district(name, "residential")
+            
+            self.assertEqual(sorted(shards.loads), [1, 2])
+            self.assertEqual(shards.call("South", "transport", "get_status"),
+                             "3 vehicles active")
+            
+            shards.call("East", "lighting", "turn_on_all")
+            metrics = shards.metrics()
+            lights = DistrictFactory().create_district("residential", "East").load.lights
+            self.assertEqual(list(metrics), ["North", "South", "East"])
+            self.assertEqual(metrics["East"]["lighting"]["on"], lights)
+            self.assertEqual(metrics["North"]["lighting"]["lights"], lights)
+            self.assertEqual(metrics["North"]["lighting"]["on"], 0)
+            self.assertNotIn("energy", metrics["North"])
+            
+            outcome = shards.broadcast("get_status", systems=("security",))
+            self.assertEqual(len(outcome.results), 3)
+            self.assertTrue(outcome.ok)
+            with self.assertRaises(KeyError):
+                shards.call("West", "lighting", "get_status")
+    
+    def test_controller_runs_shards_with_local_systems(self):
+        """Test that city-wide operations include shard districts in one outcome."""
+        import io
+        from contextlib import redirect_stdout
+        
+        singleton = SmartCityController._instance
+        SmartCityController._instance = None
+        try:
+            controller = SmartCityController.get_instance()
+            controller.initialize_city()
+            controller.start_sharding(processes=2)
+            try:
+                outcome = controller.emergency_mode()
+                self.assertTrue(outcome.ok)
+                self.assertEqual(sorted(outcome.results["shards"].results),
+                                 sorted(district.name for district in controller.districts))
+                
+                snapshot = controller.snapshot(max_age=0)
+                self.assertEqual(list(snapshot.shards), ["Downtown", "Residential Area",
+                                                         "Industrial Zone"])
+                self.assertIn('"shard_district"', list(snapshot.iter_ndjson())[-1])
+                
+                controller.add_district("Downtown", "commercial")
+                self.assertEqual(len(controller.districts), 4)
+                self.assertEqual(controller.city_load.district_count, 4)
+                self.assertEqual(list(controller.shards.owners)[-1], "Downtown (2)")
+                metrics = controller.shards.metrics()
+                self.assertEqual(metrics["Downtown (2)"]["lighting"]["lights"],
+                                 metrics["Downtown"]["lighting"]["lights"])
+                
+                controller.control_lighting("off")
+                self.assertEqual({name: district["lighting"]["on"] for name, district
+                                  in controller.shards.metrics().items()},
+                                 dict.fromkeys(controller.shards.owners, 0))
+                controller.control_lighting("dim", 40)
+                self.assertTrue(all(district["lighting"]["on"] == district["lighting"]["lights"]
+                                    for district in controller.shards.metrics().values()))
+                
+                stream = io.StringIO()
+                with redirect_stdout(stream):
+                    controller.display_city_status()
+                self.assertIn("• Downtown (2): ", stream.getvalue())
+            finally:
+                controller.stop_sharding()
+        finally:
+            SmartCityController._instance = singleton
+
+class TestAsyncLogger(unittest.TestCase):
+    """Test the queued, batched Logger backend."""
+    
+    def tearDown(self):
+        from core.singleton.logger import Logger
+        
+        Logger._instance = None
+    
+    def test_level_filter_skips_formatting(self):
+        """Test that filtered records are never formatted or queued."""
+        import io
+        from contextlib import redirect_stdout
+        from core.singleton.logger import Logger, WARNING
+        
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted a filtered record")
+        
+        logger = Logger()
+        logger.configure(level=WARNING)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            logger.debug("value %s", Exploding())
+            logger.info("vehicle %s built", "B001")
+            logger.warning("camera %s offline", "CAM-002")
+            logger.flush()
+        
+        self.assertEqual(output.getvalue(), "[WARNING]: camera CAM-002 offline\n")
+        logger.close()
+    
+    def test_drop_policy_and_rotation(self):
+        """Test overflow dropping and rotating file output."""
+        import os
+        import tempfile
+        import threading
+        from core.singleton.logger import Logger
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "city.log")
+            logger = Logger()
+            logger.configure(path=path, max_bytes=200, backups=2, queue_size=10)
+            
+            # Hold the writer inside formatting so the queue fills up
+            started, release = threading.Event(), threading.Event()
+            
+            class Stall:
+                def __str__(self):
+                    started.set()
+                    release.wait()
+                    return "stall"
+            
+            logger.log("record %s", Stall())
+            started.wait()
+            for number in range(15):
+                logger.log("record %d", number)
+            self.assertEqual(logger.dropped, 5)
+            
+            release.set()
+            logger.configure(policy="block")
+            for number in range(40):
+                logger.log("record %d", number)
+            logger.close()
+            logger._sink.close()
+            
+            self.assertTrue(os.path.exists(path + ".1"))
+            self.assertFalse(os.path.exists(path + ".3"))
+            self.assertLessEqual(os.path.getsize(path), 200)
+    
+    def test_writer_survives_errors(self):
+        """Test that a failing record is reported and later records still flush."""
+        import io
+        from contextlib import redirect_stderr, redirect_stdout
+        from core.singleton.logger import Logger
+        
+        class Broken:
+            def __str__(self):
+                raise RuntimeError("no text")
+        
+        logger = Logger()
+        output, errors = io.StringIO(), io.StringIO()
+        with redirect_stdout(output), redirect_stderr(errors):
+            logger.info("bad %s", Broken())
+            logger.flush()
+            logger.info("good %s", "record")
+            logger.flush()
+        
+        self.assertEqual(output.getvalue(), "[LOG]: good record\n")
+        self.assertIn("RuntimeError: no text", errors.getvalue())
+        logger.close()
+
 class TestIntegration(unittest.TestCase):
     """Integration tests for the complete system."""
     
@@ -280,12 +1323,32 @@ def run_tests():
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestSingletonPattern))
     suite.addTests(loader.loadTestsFromTestCase(TestFactoryPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestDistrictLoad))
     suite.addTests(loader.loadTestsFromTestCase(TestCompositePattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestLightStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestLightAggregates))
+    suite.addTests(loader.loadTestsFromTestCase(TestLightIndex))
     suite.addTests(loader.loadTestsFromTestCase(TestBuilderPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestFleetRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestBulkFleet))
     suite.addTests(loader.loadTestsFromTestCase(TestProxyPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestCameraWarmUp))
+    suite.addTests(loader.loadTestsFromTestCase(TestAccessLog))
+    suite.addTests(loader.loadTestsFromTestCase(TestCameraIndex))
     suite.addTests(loader.loadTestsFromTestCase(TestDecoratorPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestCompiledSources))
+    suite.addTests(loader.loadTestsFromTestCase(TestAnnualSimulation))
+    suite.addTests(loader.loadTestsFromTestCase(TestEconomicDispatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestSourceTags))
     suite.addTests(loader.loadTestsFromTestCase(TestAdapterPattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestTrafficFeed))
+    suite.addTests(loader.loadTestsFromTestCase(TestRoadRouting))
     suite.addTests(loader.loadTestsFromTestCase(TestFacadePattern))
+    suite.addTests(loader.loadTestsFromTestCase(TestLazySubsystems))
+    suite.addTests(loader.loadTestsFromTestCase(TestFanOut))
+    suite.addTests(loader.loadTestsFromTestCase(TestCitySnapshot))
+    suite.addTests(loader.loadTestsFromTestCase(TestDistrictSharding))
+    suite.addTests(loader.loadTestsFromTestCase(TestAsyncLogger))
     suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
     
     # Run tests with verbose output